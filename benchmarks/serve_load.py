@@ -0,0 +1,125 @@
+"""Load test of the lookup server: many concurrent clients send single character lookups, and the latency
+percentiles and requests per second are reported. A server is started for the test, unless --port or --unix is given.
+Run it from the project root with the package installed (pip install -e .):
+"python benchmarks/serve_load.py [--clients 16] [--requests 20000] [--method ucd_info]"
+"""
+import sys
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from unilyze.client import AsyncClient, DEFAULT_HOST
+
+CHARS = (
+    "abcdefghijklmnopqrstuvwxyzæøå ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    " 0123456789 .,;:!?- αβγδεζηθ абвгдежз"
+)
+
+
+def free_port():
+    """
+    Returns:
+        int: A TCP port that is free right now
+    """
+    with socket.socket() as sock:
+        sock.bind((DEFAULT_HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port, timeout=30):
+    """Waits until a freshly started server answers
+
+    Args:
+        port (int): Port of the server
+        timeout (float, optional): Seconds to wait
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            client = await AsyncClient.connect(port=port)
+            await client.call("ping")
+            await client.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run_client(connect, method, requests, latencies):
+    """One client sending its requests one after the other
+
+    Args:
+        connect (dict): Arguments of AsyncClient.connect
+        method (str): "ucd_info" or "lng_usage"
+        requests (int): Number of requests to send
+        latencies (list): Seconds of each request are appended here
+    """
+    client = await AsyncClient.connect(**connect)
+    for char in random.choices(CHARS, k=requests):
+        start = time.perf_counter()
+        await client.call(method, char=char)
+        latencies.append(time.perf_counter() - start)
+    await client.close()
+
+
+def percentile(values, share):
+    """
+    Args:
+        values (list): Sorted values
+        share (float): Eg: 0.99
+
+    Returns:
+        float: The value below which the share of the values are
+    """
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+async def load_test(connect, clients, requests, method):
+    """
+    Args:
+        connect (dict): Arguments of AsyncClient.connect
+        clients (int): Number of concurrent clients, each with its own connection
+        requests (int): Total number of requests
+        method (str): "ucd_info" or "lng_usage"
+    """
+    latencies = []
+    await run_client(connect, method, 100, [])  # Warm up: loads the databases in the server
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(connect, method, requests // clients, latencies) for _ in range(clients)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    p50, p99 = percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+    print("{:<10} {:>8} {:>10} {:>10} {:>10}".format("method", "clients", "req/s", "p50 ms", "p99 ms"))
+    print("{:<10} {:>8} {:>10.0f} {:>10.2f} {:>10.2f}".format(method, clients, len(latencies) / seconds, p50, p99))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the unilyze lookup server")
+    parser.add_argument("--port", type=int, help="Port of a running server. Default: start one")
+    parser.add_argument("--unix", help="Unix socket of a running server")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--method", default="ucd_info", choices=["ucd_info", "lng_usage"])
+    args = parser.parse_args()
+
+    server = None
+    if args.unix:
+        connect = {"unix": args.unix}
+    elif args.port:
+        connect = {"port": args.port}
+    else:
+        port = free_port()
+        server = subprocess.Popen([sys.executable, "-m", "unilyze.serve", "--port", str(port)])
+        connect = {"port": port}
+    try:
+        if server:
+            asyncio.run(wait_for_server(connect["port"]))
+        asyncio.run(load_test(connect, args.clients, args.requests, args.method))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,57 @@
+"""Compares cold-start time and memory of loading the codepoint database from json and from the binary format.
+Every measurement runs in a fresh python process, so nothing is cached between runs.
+Run it from the project root with the package installed (pip install -e .) and the databases built:
+"python benchmarks/ucd_load.py"
+"""
+import sys
+import json
+import subprocess
+
+RUNS = 5
+
+# Each loader is (setup, load). Only the load part is timed.
+LOADERS = {
+    "json": (
+        "import json",
+        "with open('unilyze/db/ucd_codepoints.json', encoding='utf-8') as fp: db = json.load(fp)\n"
+        "info = db['chars'].get('A')",
+    ),
+    "binary": (
+        "from unilyze.ucd_binary import UcdBinary",
+        "db = UcdBinary('unilyze/db/ucd_codepoints.bin')\ninfo = db.lookup('A')",
+    ),
+}
+
+MEASURE = """
+import time, resource, json
+{setup}
+rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{loader}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before_kb
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb}}))
+"""
+
+
+def measure(setup, loader):
+    """Runs a loader in a fresh interpreter
+
+    Args:
+        setup (str): Python code that runs before the timing starts
+        loader (str): Python code that loads the database
+
+    Returns:
+        dict: {"seconds": load time, "rss_kb": growth of peak resident memory while loading}
+    """
+    output = subprocess.check_output([sys.executable, "-c", MEASURE.format(setup=setup, loader=loader)])
+    return json.loads(output)
+
+
+if __name__ == "__main__":
+    print("{:<8} {:>12} {:>12}".format("format", "load ms", "rss growth MB"))
+    for name, (setup, loader) in LOADERS.items():
+        results = [measure(setup, loader) for _ in range(RUNS)]
+        seconds = min(result["seconds"] for result in results)
+        rss_kb = min(result["rss_kb"] for result in results)
+        print("{:<8} {:>12.1f} {:>12.1f}".format(name, seconds * 1000, rss_kb / 1024))
@@ -0,0 +1,62 @@
+"""Compares the memory of the json codepoint database as plain dicts, and in the compact form Unichar uses when
+the binary database hasn't been built. Every measurement runs in a fresh python process.
+Run it from the project root with the package installed (pip install -e .) and the databases built:
+"python benchmarks/ucd_memory.py"
+"""
+import sys
+import json
+import subprocess
+
+# Each layout is (setup, load). Only the load part is measured. The json text is read in the setup, so both
+# layouts are measured from the same starting point
+LAYOUTS = {
+    "json dicts": (
+        "import json",
+        "db = json.loads(raw)",
+    ),
+    "compact": (
+        "import json\nfrom unilyze.ucd_compact import CompactUcdDb",
+        "db = CompactUcdDb(json.loads(raw))",
+    ),
+}
+
+MEASURE = """
+import gc, json, resource, tracemalloc
+{setup}
+with open("unilyze/db/ucd_codepoints.json", encoding="utf-8") as fp:
+    raw = fp.read()
+rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+tracemalloc.start()
+{loader}
+gc.collect()
+retained, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before_kb
+print(json.dumps({{"retained": retained, "peak": peak, "rss_kb": rss_kb}}))
+"""
+
+
+def measure(setup, loader):
+    """Runs a loader in a fresh interpreter
+
+    Args:
+        setup (str): Python code that runs before the measurement starts
+        loader (str): Python code that loads the database into "db"
+
+    Returns:
+        dict: {"retained": bytes kept after loading, "peak": peak bytes while loading,
+               "rss_kb": growth of peak resident memory while loading}
+    """
+    output = subprocess.check_output([sys.executable, "-c", MEASURE.format(setup=setup, loader=loader)])
+    return json.loads(output)
+
+
+if __name__ == "__main__":
+    print("{:<12} {:>12} {:>12} {:>12}".format("layout", "retained MB", "peak MB", "rss growth MB"))
+    for name, (setup, loader) in LAYOUTS.items():
+        result = measure(setup, loader)
+        print(
+            "{:<12} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+                name, result["retained"] / (1 << 20), result["peak"] / (1 << 20), result["rss_kb"] / 1024
+            )
+        )
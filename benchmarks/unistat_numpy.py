@@ -0,0 +1,39 @@
+"""Compares Unistat with the NumPy backend on a generated text. Needs numpy.
+Run it from the project root with the package installed (pip install -e .) and the databases built:
+"python benchmarks/unistat_numpy.py"
+"""
+import time
+import random
+from unilyze import Unistat
+from unilyze.unistat_numpy import NumpyUnistat
+
+TEXT_LENGTH = 5_000_000
+ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzæøå ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    " 0123456789 .,;:!?- αβγδεζηθ абвгдежз"
+)
+
+
+def run(unistat, text):
+    """Times adding a text and computing the statistics
+
+    Args:
+        unistat (Unistat): The instance to benchmark
+        text (str): The text to add
+
+    Returns:
+        (float, float): Seconds spent in "add_text" and in "unistat"
+    """
+    start = time.perf_counter()
+    unistat.add_text(text)
+    added = time.perf_counter()
+    unistat.unistat()
+    return added - start, time.perf_counter() - added
+
+
+if __name__ == "__main__":
+    text = "".join(random.choices(ALPHABET, k=TEXT_LENGTH))
+    print("{:<14} {:>12} {:>12}".format("backend", "add_text s", "unistat s"))
+    for name, cls in (("python", Unistat), ("numpy", NumpyUnistat)):
+        add_seconds, stat_seconds = run(cls(), text)
+        print("{:<14} {:>12.3f} {:>12.3f}".format(name, add_seconds, stat_seconds))
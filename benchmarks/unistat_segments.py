@@ -0,0 +1,44 @@
+"""Measures the throughput of "Unistat.add_text" in MB/s with and without segment counting.
+Run it from the project root with the package installed (pip install -e .):
+"python benchmarks/unistat_segments.py [size in MB]"
+"""
+import sys
+import time
+import random
+from unilyze import Unistat
+
+WORDS = [
+    "the", "quick", "brown", "fox", "can't", "jump", "3.14", "1,000", "e-mail", "café", "café",
+    "naïve", "αβγ", "абвгд", "foo_bar", "😀", "👩‍💻", "🇩🇰", "\r\n", ".", ",", "!",
+]  # fmt: skip
+CHUNK_CHARS = 1 << 16
+
+
+def create_text(size_mb):
+    """Creates random text of words and separators
+
+    Args:
+        size_mb (int): Approximate size of the UTF-8 encoded text in MB
+
+    Returns:
+        str: The text
+    """
+    block = " ".join(random.choices(WORDS, k=1 << 16))
+    repeat = max(1, (size_mb << 20) // len(block.encode("utf-8")))
+    return block * repeat
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    text = create_text(size_mb)
+    megabytes = len(text.encode("utf-8")) / (1 << 20)
+
+    print("{:<16} {:>10} {:>10}".format("segments", "seconds", "MB/s"))
+    for segments in [(), ("grapheme",), ("word",), ("grapheme", "word")]:
+        unistat = Unistat(segments=segments)
+        unistat.add_text("")  # Loads the break classes before the clock starts
+        start = time.perf_counter()
+        for idx in range(0, len(text), CHUNK_CHARS):
+            unistat.add_text(text[idx : idx + CHUNK_CHARS])
+        seconds = time.perf_counter() - start
+        print("{:<16} {:>10.2f} {:>10.1f}".format("+".join(segments) or "none", seconds, megabytes / seconds))
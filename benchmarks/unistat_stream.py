@@ -0,0 +1,58 @@
+"""Measures the throughput of "Unistat.add_file" in MB/s on a generated UTF-8 file.
+Run it from the project root with the package installed (pip install -e .):
+"python benchmarks/unistat_stream.py [size in MB]"
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from unilyze import Unistat
+
+ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzæøå ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    " 0123456789 .,;:!?- αβγδεζηθ абвгдежз 😀€\n"
+)
+
+
+def create_file(size_mb):
+    """Writes a file of random text
+
+    Args:
+        size_mb (int): Approximate size of the file in MB
+
+    Returns:
+        str: Filename of the temporary file
+    """
+    block = "".join(random.choices(ALPHABET, k=1 << 20)).encode("utf-8")
+    fd, filename = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "wb") as fp:
+        written = 0
+        while written < size_mb << 20:
+            fp.write(block)
+            written += len(block)
+    return filename
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    filename = create_file(size_mb)
+    try:
+        backends = [("python", Unistat)]
+        try:
+            from unilyze.unistat_numpy import NumpyUnistat
+
+            backends.append(("numpy", NumpyUnistat))
+        except ImportError:
+            pass
+
+        megabytes = os.path.getsize(filename) / (1 << 20)
+        print("{:<10} {:>10} {:>10}".format("backend", "seconds", "MB/s"))
+        for name, cls in backends:
+            unistat = cls()
+            start = time.perf_counter()
+            unistat.add_file(filename)
+            seconds = time.perf_counter() - start
+            print("{:<10} {:>10.2f} {:>10.1f}".format(name, seconds, megabytes / seconds))
+    finally:
+        os.remove(filename)
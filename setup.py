@@ -43,4 +43,5 @@ setuptools.setup(
         "Source": "https://github.com/x821938/unilyze",
     },
     install_requires=[],
+    extras_require={"numpy": ["numpy"]},
 )
@@ -0,0 +1,38 @@
+import os
+from zipfile import ZipFile
+from unilyze.build_cache import BuildManifest, fetch_archive, content_hash
+
+
+def test_fetch_archive(tmp_path):
+    archive = str(tmp_path / "core.zip")
+    with ZipFile(archive, "w") as zf:
+        zf.writestr("common/main/en.xml", "<ldml/>")
+    assert fetch_archive(archive) == archive  # Local files are used as they are
+
+    cache_dir = str(tmp_path / "cache")
+    cached = fetch_archive("file://" + archive, cache_dir)
+    assert os.path.dirname(cached) == cache_dir
+    os.remove(archive)
+    assert fetch_archive("file://" + archive, cache_dir) == cached  # Not downloaded again
+
+
+def test_build_manifest(tmp_path):
+    db_dir = str(tmp_path)
+    output = tmp_path / "db.json"
+    output.write_text("{}")
+    inputs = {"source.txt": content_hash("source")}
+
+    manifest = BuildManifest(db_dir)
+    assert not manifest.is_current("db.json", inputs)
+    manifest.record("db.json", inputs, {"note": 1})
+    manifest.save()
+
+    manifest = BuildManifest(db_dir)
+    assert manifest.is_current("db.json", inputs)
+    assert manifest.is_current("db.json")
+    assert manifest.inputs("db.json") == inputs
+    assert manifest.meta("db.json") == {"note": 1}
+    assert not manifest.is_current("db.json", {"source.txt": content_hash("changed")})
+
+    output.write_text('{"edited": 1}')  # A database changed by hand is rebuilt
+    assert not manifest.is_current("db.json", inputs)
@@ -0,0 +1,35 @@
+from unilyze.codepoint_set import CodepointSet
+
+LETTERS = CodepointSet([(0x61, 0x7A), (0x41, 0x5A)])
+
+
+def test_ranges_are_merged():
+    assert CodepointSet([(5, 10), (1, 3), (4, 4), (8, 12), (20, 20)]).ranges == [(1, 12), (20, 20)]
+    assert CodepointSet.from_flat([5, 10, 1, 4]).to_flat() == [1, 10]
+    assert CodepointSet.from_chars("cab") == CodepointSet([(0x61, 0x63)])
+
+
+def test_iteration():
+    assert "".join(CodepointSet.from_chars("zyx")) == "xyz"
+    assert len(LETTERS) == 52
+    assert list(CodepointSet().codepoints()) == []
+    assert not CodepointSet()
+
+
+def test_contains():
+    assert "a" in LETTERS
+    assert "Z" in LETTERS
+    assert 0x7A in LETTERS
+    assert "[" not in LETTERS
+    assert "\x00" not in LETTERS
+
+
+def test_operators():
+    vowels = CodepointSet.from_chars("aeiouAEIOU")
+    lower = CodepointSet([(0x61, 0x7A)])
+    assert "".join(lower & vowels) == "aeiou"
+    assert "".join(vowels & lower) == "aeiou"
+    assert len(lower - vowels) == 21
+    assert "".join(LETTERS - CodepointSet([(0x42, 0x78)])) == "Ayz"
+    assert lower | CodepointSet([(0x41, 0x5A)]) == LETTERS
+    assert LETTERS - LETTERS == CodepointSet()
@@ -0,0 +1,161 @@
+import json
+import pytest
+from zipfile import ZipFile
+import xml.etree.ElementTree as ET
+from unilyze import create_cldr_dbs
+from unilyze.create_cldr_dbs import get_char_locales, get_char_exemplar, get_exemplar_char, get_lang_terr
+from unilyze.create_cldr_dbs import build_cldr_dbs, parse_locales
+from unilyze.create_cldr_dbs import parse_unicode_set, unicode_set_strings, get_language_exemplar_char
+
+EXEMPLAR_CHAR = {
+    "en": {"main": ["a", "b"], "punctuation": ["!"]},
+    "da": {"main": ["a", "b", "å"]},
+    "da_DK": {"main": ["a", "å"], "auxiliary": ["b"]},
+}
+
+
+def test_get_char_locales():
+    char_locales = get_char_locales(EXEMPLAR_CHAR)
+    assert char_locales["locales"] == ["da", "da_DK", "en"]
+    assert char_locales["chars"]["a"] == {"main": 0b111}
+    assert char_locales["chars"]["å"] == {"main": 0b011}
+    assert char_locales["chars"]["b"] == {"main": 0b101, "auxiliary": 0b010}
+    assert char_locales["chars"]["!"] == {"punctuation": 0b100}
+
+
+LOCALE_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<ldml>
+<identity><language type="{language}"/>{territory}</identity>
+<localeDisplayNames>
+<languages><language type="da">Danish</language><language type="en">English</language></languages>
+<territories><territory type="DK">Denmark</territory></territories>
+</localeDisplayNames>
+<characters><exemplarCharacters>[{main}]</exemplarCharacters></characters>
+</ldml>
+"""
+
+
+CORE_LOCALES = {
+    "en": ("en", "", "a b"),
+    "da": ("da", "", "a b \\u00E5"),
+    "da_DK": ("da", '<territory type="DK"/>', "a"),
+}
+
+
+def make_core_zip(filename, locales=CORE_LOCALES):
+    with ZipFile(filename, "w") as zf:
+        for name, (language, territory, main) in locales.items():
+            xml = LOCALE_XML.format(language=language, territory=territory, main=main)
+            zf.writestr("common/main/" + name + ".xml", xml)
+        zf.writestr("common/supplemental/en.xml", "<supplementalData/>")  # Not a locale file
+    return filename
+
+
+def test_get_char_exemplar():
+    char_exemplar = get_char_exemplar(EXEMPLAR_CHAR)
+    assert char_exemplar["a"] == {"main": ["en", "da", "da_DK"]}
+    assert char_exemplar["b"] == {"main": ["en", "da"], "auxiliary": ["da_DK"]}
+
+
+def test_get_exemplar_char(tmp_path):
+    core_zip = make_core_zip(str(tmp_path / "core.zip"))
+    exemplar_char = get_exemplar_char(core_zip, max_workers=2)
+    assert list(exemplar_char) == ["da", "da_DK", "en"]  # Merged in filename order
+    assert exemplar_char["da"] == {"main": ["a", "b", "\u00e5"]}
+    assert exemplar_char == get_exemplar_char(core_zip, max_workers=1)
+
+
+def test_parse_unicode_set():
+    assert parse_unicode_set("[a-c æ {aa} \\u00E5]") == [(0x61, 0x63), (0xE6, 0xE6), "aa", (0xE5, 0xE5)]
+    emoji = (0x1F600, 0x1F600)
+    assert parse_unicode_set("[\\U0001F600 \\x{1F600} \\uD83D\\uDE00 \\x41]") == [emoji, emoji, emoji, (0x41, 0x41)]
+    assert parse_unicode_set("[\\- \\[ \\{ {\\u0915\\u094D} {b} a-]") == [
+        (0x2D, 0x2D), (0x5B, 0x5B), (0x7B, 0x7B), "\u0915\u094D", (0x62, 0x62), (0x61, 0x61), (0x2D, 0x2D)
+    ]
+    assert parse_unicode_set("[]") == []
+
+
+INVALID_SETS = ["[:Latin:]", "[^a]", "[a", "[c-a]", "[a-{bb}]", "[a]]", "[\\u12]", "[\\x{41]", "[{ab]"]
+
+
+@pytest.mark.parametrize("text", INVALID_SETS)
+def test_parse_unicode_set_invalid(text):
+    with pytest.raises(ValueError):
+        parse_unicode_set(text)
+
+
+def test_unicode_set_strings():
+    assert unicode_set_strings("[a-d {ch} b \\u00E6-\\u00E6]") == ["a", "b", "c", "d", "ch", "\u00e6"]
+
+
+def test_get_exemplar_char_ranges(tmp_path):
+    locales = {"da": ("da", "", "a-c {aa} \\u00E5 \\-")}
+    exemplar_char = get_exemplar_char(make_core_zip(str(tmp_path / "core.zip"), locales), max_workers=1)
+    assert exemplar_char["da"] == {"main": ["a", "b", "c", "aa", "\u00e5", "-"]}
+
+
+def test_parse_locales_unsupported_syntax(tmp_path):
+    locales = dict(CORE_LOCALES, de=("de", "", "a [:Latin:] b"), fi=("fi", "", "a &amp; b"))
+    archive = make_core_zip(str(tmp_path / "core.zip"), locales)
+    names = ["common/main/" + name + ".xml" for name in sorted(locales)]
+    parsed = {lang_terr: exemplar for name, lang_terr, exemplar in parse_locales(archive, names, max_workers=1)}
+    assert parsed["de"] == {} and parsed["fi"] == {}  # Only the odd sets are skipped
+    assert parsed["da"] == {"main": ["a", "b", "\u00e5"]}
+    assert parsed["en"] == {"main": ["a", "b"]}
+
+
+def test_get_language_exemplar_char_logs(caplog):
+    xml = """<ldml>
+<exemplarCharacters>[a $x]</exemplarCharacters>
+<exemplarCharacters type="index">[A-C]</exemplarCharacters>
+</ldml>"""
+    exemplars = get_language_exemplar_char(ET.fromstring(xml), "da_DK")
+    assert exemplars == {"index": ["A", "B", "C"]}
+    assert "main exemplars of da_DK" in caplog.text and "'$'" in caplog.text
+
+
+def test_get_lang_terr(tmp_path):
+    lang_terr = get_lang_terr(make_core_zip(str(tmp_path / "core.zip")))
+    assert lang_terr == {"language": {"da": "Danish", "en": "English"}, "territory": {"DK": "Denmark"}}
+
+
+def load_dbs(db_dir):
+    dbs = {}
+    for name in ["cldr_exemplar_char", "cldr_char_exemplar", "cldr_char_locales", "cldr_language_territory"]:
+        with open(str(db_dir / (name + ".json")), encoding="utf-8") as fp:
+            dbs[name] = json.load(fp)
+    return dbs
+
+
+def test_build_cldr_dbs_incremental(tmp_path, monkeypatch):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    build_cldr_dbs(make_core_zip(str(tmp_path / "core.zip")), str(db_dir), max_workers=1)
+
+    parsed = []
+    parse_locales = create_cldr_dbs.parse_locales
+
+    def recording_parse_locales(archive, names, max_workers=None):
+        parsed.extend(names)
+        return parse_locales(archive, names, max_workers)
+
+    monkeypatch.setattr(create_cldr_dbs, "parse_locales", recording_parse_locales)
+
+    # A new release that changes "da", adds "de" and removes "da_DK"
+    locales = {"en": CORE_LOCALES["en"], "da": ("da", "", "a \\u00E6"), "de": ("de", "", "a b \\u00DF")}
+    new_zip = make_core_zip(str(tmp_path / "core2.zip"), locales)
+    build_cldr_dbs(new_zip, str(db_dir), max_workers=1)
+    assert sorted(parsed) == ["common/main/da.xml", "common/main/de.xml"]
+
+    full_dir = tmp_path / "full"
+    full_dir.mkdir()
+    build_cldr_dbs(new_zip, str(full_dir), max_workers=1)
+    incremental, full = load_dbs(db_dir), load_dbs(full_dir)
+    assert incremental == full
+    assert list(incremental["cldr_exemplar_char"]) == ["da", "de", "en"]
+    assert incremental["cldr_char_exemplar"]["a"] == {"main": ["da", "de", "en"]}
+    assert "\u00e5" not in incremental["cldr_char_exemplar"]
+
+    parsed.clear()
+    build_cldr_dbs(new_zip, str(db_dir), max_workers=1)
+    assert parsed == []  # Nothing changed
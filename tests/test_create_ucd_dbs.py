@@ -0,0 +1,157 @@
+import os
+import json
+import pytest
+from io import BytesIO
+from zipfile import ZipFile
+from unilyze import create_ucd_dbs
+from unilyze.create_ucd_dbs import iter_ucd_db, PropertyIndexBuilder, build_codepoint_dbs, build_ucd_dbs
+from unilyze.create_ucd_dbs import get_mapping_tables
+from unilyze.ucd_binary import UcdBinary, DecodedUcdBinary
+
+UCD_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ucd xmlns="http://www.unicode.org/ns/2003/ucd/1.0">
+<repertoire>
+<group gc="Lu" sc="Latn">
+<char cp="0041" na="LATIN CAPITAL LETTER A"/>
+<char cp="0042" na="LATIN CAPITAL LETTER B"/>
+<reserved cp="0378" gc="Cn"/>
+</group>
+<group gc="Lo" sc="Hani">
+<char first-cp="4E00" last-cp="9FFF" na="CJK UNIFIED IDEOGRAPH-#"/>
+<surrogate first-cp="D800" last-cp="DB7F" gc="Cs"/>
+</group>
+</repertoire>
+</ucd>
+"""
+
+
+CODEPOINT_DB = {
+    "chars": {
+        "A": {"na": "LATIN CAPITAL LETTER A", "group": "0"},
+        "B": {"na": "LATIN CAPITAL LETTER B", "group": "0"},
+    },
+    "groups": {"0": {"gc": "Lu", "sc": "Latn"}, "1": {"gc": "Lo", "sc": "Hani"}},
+    "ranges": [
+        [0x0378, 0x0378, "0", {"gc": "Cn"}],
+        [0x4E00, 0x9FFF, "1", {"na": "CJK UNIFIED IDEOGRAPH-#"}],
+        [0xD800, 0xDB7F, "1", {"gc": "Cs"}],
+    ],
+}
+
+PROPERTY_INDEX = {
+    "gc": {"Lu": [0x41, 0x42], "Cn": [0x378, 0x378], "Lo": [0x4E00, 0x9FFF], "Cs": [0xD800, 0xDB7F]},
+    "sc": {"Latn": [0x41, 0x42, 0x378, 0x378], "Hani": [0x4E00, 0x9FFF, 0xD800, 0xDB7F]},
+    "na": {
+        "LATIN CAPITAL LETTER A": [0x41, 0x41],
+        "LATIN CAPITAL LETTER B": [0x42, 0x42],
+        "CJK UNIFIED IDEOGRAPH-#": [0x4E00, 0x9FFF],
+    },
+}
+
+
+def write_zip(tmp_path, xml):
+    source = str(tmp_path / "ucd.all.grouped.zip")
+    with ZipFile(source, "w") as zf:
+        zf.writestr("ucd.all.grouped.xml", xml)
+    return source
+
+
+def test_iter_ucd_db():
+    assert list(iter_ucd_db(BytesIO(UCD_XML.encode("utf-8")))) == [
+        ("group", "0", {"gc": "Lu", "sc": "Latn"}),
+        ("char", "A", {"na": "LATIN CAPITAL LETTER A", "group": "0"}),
+        ("char", "B", {"na": "LATIN CAPITAL LETTER B", "group": "0"}),
+        ("range", 0x0378, 0x0378, "0", {"gc": "Cn"}),
+        ("group", "1", {"gc": "Lo", "sc": "Hani"}),
+        ("range", 0x4E00, 0x9FFF, "1", {"na": "CJK UNIFIED IDEOGRAPH-#"}),
+        ("range", 0xD800, 0xDB7F, "1", {"gc": "Cs"}),
+    ]
+
+
+def test_property_index_builder():
+    builder = PropertyIndexBuilder()
+    builder.add(0x41, 0x41, {"gc": "Lu", "na": "A", "group": "0"})
+    builder.add(0x42, 0x42, {"gc": "Lu", "na": "B", "group": "0"})
+    builder.add(0x61, 0x7A, {"gc": "Ll", "na": "a", "group": "0"})
+    general_category = {"Lu": [0x41, 0x42], "Ll": [0x61, 0x7A]}  # The adjacent A and B are one range
+    names = {"A": [0x41, 0x41], "B": [0x42, 0x42], "a": [0x61, 0x7A]}
+    assert builder.result() == {"gc": general_category, "na": names}
+    assert builder.result(max_values=2) == {"gc": general_category}  # "na" has 3 different values
+
+
+def test_build_codepoint_dbs(tmp_path):
+    build_codepoint_dbs(write_zip(tmp_path, UCD_XML), str(tmp_path))
+
+    with open(str(tmp_path / "ucd_codepoints.json"), encoding="utf-8") as fp:
+        assert json.load(fp) == CODEPOINT_DB
+    with open(str(tmp_path / "ucd_property_index.json"), encoding="utf-8") as fp:
+        assert json.load(fp) == PROPERTY_INDEX
+    binary = UcdBinary(str(tmp_path / "ucd_codepoints.bin"))
+    assert binary.lookup("A") == {"gc": "Lu", "sc": "Latn", "na": "LATIN CAPITAL LETTER A"}
+    assert binary.lookup("\u4E01")["na"] == "CJK UNIFIED IDEOGRAPH-4E01"
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".part")]
+
+
+def test_build_codepoint_dbs_bad_xml(tmp_path):
+    build_codepoint_dbs(write_zip(tmp_path, UCD_XML), str(tmp_path))
+    with pytest.raises(Exception):
+        build_codepoint_dbs(write_zip(tmp_path, UCD_XML[:400]), str(tmp_path))  # Truncated XML
+
+    with open(str(tmp_path / "ucd_codepoints.json"), encoding="utf-8") as fp:
+        assert json.load(fp) == CODEPOINT_DB  # The databases of the last good build are kept
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".part")]
+
+
+def test_build_ucd_dbs_incremental(tmp_path, monkeypatch):
+    source = write_zip(tmp_path, UCD_XML)
+    property_aliases = tmp_path / "PropertyAliases.txt"
+    property_aliases.write_text("gc ; General_Category\n")
+    property_value_aliases = tmp_path / "PropertyValueAliases.txt"
+    property_value_aliases.write_text("gc ; Lu ; Uppercase_Letter\n")
+    args = (source, str(property_aliases), str(property_value_aliases), str(tmp_path))
+
+    build_ucd_dbs(*args)
+    with open(str(tmp_path / "ucd_property_names.json"), encoding="utf-8") as fp:
+        assert json.load(fp) == {"gc": "General_Category"}
+    decoded = DecodedUcdBinary(str(tmp_path / "ucd_codepoints_decoded.bin"))
+    assert decoded.lookup("A")["General_Category"] == "Uppercase_Letter"
+
+    built = []
+    monkeypatch.setattr(create_ucd_dbs, "build_codepoint_dbs", lambda *args: built.append(args))
+    build_ucd_dbs(*args)
+    assert built == []  # The UCD-XML hasn't changed
+
+    (tmp_path / "ucd_codepoints.json").write_text("{}")  # A damaged database is rebuilt
+    build_ucd_dbs(*args)
+    assert len(built) == 1
+
+
+MAPPING_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ucd xmlns="http://www.unicode.org/ns/2003/ucd/1.0">
+<repertoire>
+<group uc="#" lc="#" cf="#" dm="#" dt="none" ccc="0">
+<char cp="0041" lc="0061" cf="0061"/>
+<char cp="0061" uc="0041"/>
+<char cp="00DF" uc="0053 0053" cf="0073 0073"/>
+<char cp="00C5" lc="00E5" cf="00E5" dm="0041 030A" dt="can"/>
+<char cp="212B" lc="00E5" cf="00E5" dm="00C5" dt="can"/>
+<char cp="00BD" dm="0031 2044 0032" dt="fra"/>
+<char cp="030A" ccc="230"/>
+<char first-cp="AC00" last-cp="D7A3" dm="#" dt="can"/>
+</group>
+</repertoire>
+</ucd>
+"""
+
+
+def test_get_mapping_tables(tmp_path):
+    build_codepoint_dbs(write_zip(tmp_path, MAPPING_XML), str(tmp_path))
+    tables = get_mapping_tables(UcdBinary(str(tmp_path / "ucd_codepoints.bin")))
+
+    assert tables["uc"] == {"97": "A", "223": "SS"}
+    assert tables["cf"]["223"] == "ss"
+    assert tables["canonical"]["8491"] == "A\u030a"  # The decomposition of the Angstrom sign is recursive
+    assert "189" not in tables["canonical"]
+    assert tables["compatibility"]["189"] == "1\u20442"
+    assert tables["canonical"][str(0xD55C)] == "\u1112\u1161\u11ab"
+    assert tables["ccc"] == {"778": 230}
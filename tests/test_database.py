@@ -0,0 +1,44 @@
+import time
+import threading
+from unilyze.database import get_database, loaded_databases, shared_database
+
+loads = []
+
+
+def slow_loader(filename):
+    loads.append(filename)
+    time.sleep(0.05)
+    return {"filename": filename}
+
+
+class Tables:
+    table = shared_database("test/lazy.json", slow_loader)
+
+
+def test_get_database_loads_once():
+    first = get_database("test/once.json", slow_loader)
+    second = get_database("test/once.json", slow_loader)
+    assert first is second
+    assert loads.count("test/once.json") == 1
+    assert "test/once.json" in loaded_databases()
+
+
+def test_get_database_threads():
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_database("test/threads.json", slow_loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads.count("test/threads.json") == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_shared_database_is_lazy():
+    first, second = Tables(), Tables()
+    assert "test/lazy.json" not in loaded_databases()
+    assert first.table is second.table
+    assert loads.count("test/lazy.json") == 1
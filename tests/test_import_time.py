@@ -0,0 +1,35 @@
+import sys
+import subprocess
+
+SLOW_MODULES = ["pkg_resources", "numpy", "asyncio", "concurrent.futures"]
+
+
+def imported_modules(statement):
+    """Runs a statement in a fresh interpreter with "python -X importtime". Timings vary too much between machines
+    to be tested, run the same command by hand to measure them.
+
+    Args:
+        statement (str): Eg: "import unilyze"
+
+    Returns:
+        set: The modules the statement imported
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            modules.add(line.split("|")[-1].strip())
+    return modules
+
+
+def test_package_import_is_lazy():
+    modules = imported_modules("import unilyze")
+    assert "unilyze" in modules
+    assert "unilyze.unichar" not in modules
+
+
+def test_class_import_avoids_slow_modules():
+    modules = imported_modules("from unilyze import Unichar, Unistat")
+    assert "unilyze.unichar" in modules
+    assert not [module for module in SLOW_MODULES if module in modules]
@@ -0,0 +1,101 @@
+import pickle
+import pytest
+from unilyze import Unichar, Unistat
+from unilyze.instrument import MethodStats
+
+
+def test_method_stats():
+    stats = MethodStats(samples=10)
+    for ms in range(1, 101):
+        stats.record(ms / 1000, 2, failed=ms == 100)
+    summary = stats.summary()
+    assert (summary["calls"], summary["errors"], summary["chars"]) == (100, 1, 200)
+    assert summary["max"] == 0.1
+    assert summary["mean"] == pytest.approx(0.0505)
+    assert len(stats.latencies) == 10  # Only the most recent calls
+    assert summary["p50"] == 0.096
+    assert summary["p99"] == 0.1
+
+    stats.reset()
+    assert stats.summary()["calls"] == 0
+
+
+def test_unichar_instrumentation():
+    uc = Unichar()
+    assert uc.stats()["instrumented"] is False
+    assert "ucd_info" not in uc.__dict__  # No overhead: the plain method of the class is used
+
+    calls = []
+    uc.enable_instrumentation(callback=lambda *call: calls.append(call))
+    uc.ucd_info("a")
+    uc.ucd_info("a")
+    uc.lng_can_write("abc")
+    with pytest.raises(ValueError):
+        uc.ucd_info("ab")
+
+    stats = uc.stats()
+    assert stats["instrumented"] is True
+    assert stats["methods"]["ucd_info"]["calls"] == 3
+    assert stats["methods"]["ucd_info"]["errors"] == 1
+    assert stats["methods"]["ucd_info"]["chars"] == 4
+    assert stats["methods"]["lng_can_write"]["chars"] == 3
+    assert stats["ucd_info_cache"]["hits"] >= 1
+    assert 0 < stats["ucd_info_cache"]["hit_rate"] <= 1
+    assert "db/cldr_char_locales.json" in stats["databases"]
+    assert [call[0] for call in calls] == ["ucd_info", "ucd_info", "lng_can_write", "ucd_info"]
+    assert calls[2][2] == 3
+
+    assert uc.stats(reset=True)["methods"]
+    assert uc.stats()["methods"] == {}
+
+    uc.disable_instrumentation()
+    uc.ucd_info("a")
+    assert "ucd_info" not in uc.__dict__
+    assert uc.stats()["methods"] == {}
+
+
+def test_nested_calls():
+    uc = Unichar()
+    uc.enable_instrumentation()
+    uc.ucd_info_many("abc", ["sc"])
+    uc.precompute_ucd_info("a", "c")
+    methods = uc.stats()["methods"]
+    assert methods["ucd_info_many"]["calls"] == 1
+    assert methods["ucd_info_many"]["chars"] == 3
+    assert methods["precompute_ucd_info"]["calls"] == 1
+    assert methods.get("ucd_info", {"calls": 0})["calls"] == 0
+
+    uc.ucd_info("a")
+    assert uc.stats()["methods"]["ucd_info"]["calls"] == 1
+
+
+def test_failing_callback(caplog):
+    def callback(method, seconds, chars):
+        raise RuntimeError("exporter is down")
+
+    uc = Unichar()
+    uc.enable_instrumentation(callback=callback)
+    assert uc.ucd_info("a", ["sc"]) == {"Script": "Latin"}
+    with pytest.raises(ValueError):  # The error of the method, not of the callback
+        uc.ucd_info("ab")
+    assert uc.stats()["methods"]["ucd_info"]["calls"] == 2
+    assert "exporter is down" in caplog.text
+
+
+def test_unistat_instrumentation():
+    us = Unistat()
+    us.enable_instrumentation()
+    us.add_stream(["Hello ", "world"])
+    us.unistat(["gc"])
+    methods = us.stats()["methods"]
+    assert methods["add_stream"]["calls"] == 1
+    assert "add_text" not in methods  # Only called by "add_stream"
+    assert methods["unistat"]["calls"] == 1
+    assert "ucd_info" not in methods
+
+    us.add_text("Hello")
+    assert us.stats()["methods"]["add_text"]["chars"] == 5
+
+    copy = pickle.loads(pickle.dumps(us))  # The instrumentation stays with the original
+    assert copy.stats()["instrumented"] is False
+    assert copy.charstat() == us.charstat()
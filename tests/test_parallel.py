@@ -0,0 +1,43 @@
+import pickle
+from collections import Counter
+from unilyze import Unistat
+from unilyze.parallel import unistat_files, unistat_texts
+
+TEXTS = ["Æblegrød", "test1!", "😀 € αβγ", ""] * 10
+
+
+def test_merge():
+    first, second = Unistat(), Unistat()
+    first.add_text("aab")
+    second.add_text("bc")
+
+    total = first + second
+    assert total.charstat() == {"a": 2, "b": 2, "c": 1}
+    assert first.charstat() == {"a": 2, "b": 1}
+
+    first += second
+    first.merge({"d": 3})
+    assert first.charstat() == {"a": 2, "b": 2, "c": 1, "d": 3}
+
+
+def test_pickle():
+    unistat = Unistat()
+    unistat.add_text("Æblegrød")
+    unpickled = pickle.loads(pickle.dumps(unistat))
+    assert unpickled.charstat() == unistat.charstat()
+
+
+def test_unistat_texts():
+    unistat = unistat_texts(TEXTS, max_workers=2, shard_size=3)
+    assert unistat.charstat() == Counter("".join(TEXTS))
+
+
+def test_unistat_files(tmp_path):
+    filenames = []
+    for idx, text in enumerate(TEXTS):
+        filename = tmp_path / "{}.txt".format(idx)
+        filename.write_text(text, encoding="utf-8")
+        filenames.append(str(filename))
+
+    unistat = unistat_files(filenames, max_workers=2, shard_size=7)
+    assert unistat.charstat() == Counter("".join(TEXTS))
@@ -0,0 +1,147 @@
+import pickle
+import pytest
+from unilyze import Unistat
+from unilyze import segment
+from unilyze.segment import Segmenter, compile_rules, grapheme_transition, word_transition
+
+GRAPHEME_CLASSES = {
+    "\r": segment.GB_CR,
+    "\n": segment.GB_LF,
+    "\u0301": segment.GB_EXTEND,
+    "\u200d": segment.GB_ZWJ,
+    "\U0001F468": segment.GB_EXTPICT,
+    "\U0001F469": segment.GB_EXTPICT,
+    "\U0001F1E9": segment.GB_RI,
+    "\U0001F1F0": segment.GB_RI,
+    "ᄀ": segment.GB_L,
+    "ᅡ": segment.GB_V,
+    "ᆨ": segment.GB_T,
+    "क": segment.GB_INCB_CONSONANT,
+    "ष": segment.GB_INCB_CONSONANT,
+    "्": segment.GB_INCB_LINKER,
+    "\u093c": segment.GB_INCB_EXTEND,
+    "ि": segment.GB_SPACINGMARK,
+}
+
+WORD_CLASSES = {
+    "\r": segment.WB_CR,
+    "\n": segment.WB_LF,
+    "\u0301": segment.WB_EXTEND,
+    "'": segment.WB_SINGLE_QUOTE,
+    ".": segment.WB_MIDNUMLET,
+    ":": segment.WB_MIDLETTER,
+    ",": segment.WB_MIDNUM,
+    "_": segment.WB_EXTENDNUMLET,
+    " ": segment.WB_WSEGSPACE,
+    "א": segment.WB_HEBREW,
+    '"': segment.WB_DOUBLE_QUOTE,
+    "ア": segment.WB_KATAKANA,
+}
+WORD_CLASSES.update((char, segment.WB_ALETTER) for char in "abcdefghijklmnopqrstuvwxyz")
+WORD_CLASSES.update((char, segment.WB_NUMERIC) for char in "0123456789")
+
+
+@pytest.fixture(autouse=True)
+def test_rules(monkeypatch):
+    """The rules with break classes for the test characters only, so the tests don't depend on the database
+    """
+
+    def rules(start, transition, class_count, class_map, keep):
+        classes = bytearray(segment.CODEPOINT_COUNT)
+        for char, cls in class_map.items():
+            classes[ord(char)] = cls
+        return lambda filename: (compile_rules(start, transition, class_count), classes, keep)
+
+    grapheme = rules((None, None), grapheme_transition, segment.GB_CLASS_COUNT, GRAPHEME_CLASSES, None)
+    word = rules((None, None, None), word_transition, segment.WB_CLASS_COUNT, WORD_CLASSES, segment.WB_WORD_START)
+    monkeypatch.setitem(segment.SEGMENT_RULES, "grapheme", ("test#grapheme", grapheme))
+    monkeypatch.setitem(segment.SEGMENT_RULES, "word", ("test#word", word))
+
+
+def segments(kind, text, chunk_size=None):
+    segmenter = Segmenter(kind)
+    chunk_size = chunk_size or len(text) or 1
+    result = []
+    for idx in range(0, len(text), chunk_size):
+        result += segmenter.feed(text[idx : idx + chunk_size])
+    return result + segmenter.finish()
+
+
+def test_graphemes():
+    text = "e\u0301a\r\n\U0001F468\u200d\U0001F469 \U0001F1E9\U0001F1F0\U0001F1E9각\u0301"
+    expected = [
+        "e\u0301",
+        "a",
+        "\r\n",
+        "\U0001F468\u200d\U0001F469",
+        " ",
+        "\U0001F1E9\U0001F1F0",
+        "\U0001F1E9",
+        "각\u0301",
+    ]
+    assert segments("grapheme", text) == expected
+    assert segments("grapheme", text, chunk_size=1) == expected
+    assert segments("grapheme", "") == []
+    assert segments("grapheme", "\u0301\u0301x") == ["\u0301\u0301", "x"]  # Extend at the start of the text
+
+
+def test_indic_conjuncts():
+    assert segments("grapheme", "क्षि") == ["क्षि"]  # GB9c: consonant, linker, consonant
+    assert segments("grapheme", "क\u093c्\u200dष", chunk_size=1) == ["क\u093c्\u200dष"]  # With InCB extends
+    assert segments("grapheme", "कष") == ["क", "ष"]
+    assert segments("grapheme", "क\u0301्ष") == ["क\u0301्", "ष"]  # Other extends end the conjunct
+    assert segments("grapheme", "a्ष") == ["a्", "ष"]  # The linker must follow a consonant
+
+
+def test_long_segment(monkeypatch):
+    monkeypatch.setattr(segment, "MAX_SEGMENT_LENGTH", 10)
+    segmenter = Segmenter("grapheme")
+    cut = [segment for _ in range(5) for segment in segmenter.feed("e" + "\u0301" * 5)]
+    assert all(len(segment) <= 12 for segment in cut)  # Held back text is cut, not kept growing
+    assert "".join(cut + segmenter.finish()) == ("e" + "\u0301" * 5) * 5
+
+
+def test_words():
+    assert segments("word", "hello, world. it's 3.14 or 1,000") == ["hello", "world", "it's", "3.14", "or", "1,000"]
+    assert segments("word", "e.g. a:b foo_bar 42abc") == ["e.g", "a:b", "foo_bar", "42abc"]
+    assert segments("word", "can'") == ["can"]  # The quote isn't kept, when no letter follows
+    assert segments("word", "cafe\u0301's") == ["cafe\u0301's"]  # Extend is skipped (WB4)
+    assert segments("word", "א\"א א'") == ["א\"א", "א'"]  # WB7a, WB7b, WB7c
+    assert segments("word", "アア\r\nx") == ["アア", "x"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+def test_words_chunked(chunk_size):
+    text = "it's 3.14, a:b. don't e\u0301te\u0301 א\"א"
+    assert segments("word", text, chunk_size) == segments("word", text)
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        Segmenter("sentence")
+    with pytest.raises(ValueError):
+        Unistat(segments=["sentence"])
+
+
+def test_unistat_segments():
+    unistat = Unistat(segments=["grapheme", "word"])
+    for chunk in ["it's e", "\u0301t", "e\u0301 it", "'", "s"]:
+        unistat.add_text(chunk)
+    assert unistat.segmentstat("grapheme")["e\u0301"] == 2
+    assert unistat.segmentstat("word") == {"it's": 2, "e\u0301te\u0301": 1}
+    assert unistat.charstat()["e"] == 2
+
+    other = Unistat(segments=["word"])
+    other.add_text("it's")
+    merged = Unistat(segments=["word"]).merge(unistat).merge(other)
+    assert merged.segmentstat("word") == {"it's": 3, "e\u0301te\u0301": 1}
+    assert (unistat + other).segmentstat("word")["it's"] == 3
+
+    restored = pickle.loads(pickle.dumps(unistat))
+    restored.add_text("x")
+    assert restored.segmentstat("word")["it'sx"] == 1
+
+    unistat.reset_stat()
+    assert unistat.segmentstat("word") == {}
+    with pytest.raises(ValueError):
+        Unistat().segmentstat("word")
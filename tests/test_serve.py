@@ -0,0 +1,140 @@
+import json
+import asyncio
+import pytest
+from unilyze import Unichar, Unistat
+from unilyze.serve import LookupServer, to_json
+from unilyze.client import Client, AsyncClient
+
+
+def as_json(value):
+    """The value as it looks after a trip through the server
+    """
+    return json.loads(json.dumps(value, ensure_ascii=False, default=to_json))
+
+
+async def start_server(**options):
+    lookup_server = LookupServer(**options)
+    server = await lookup_server.start_tcp("127.0.0.1", 0)
+    return lookup_server, server, server.sockets[0].getsockname()[1]
+
+
+async def stop_server(lookup_server, server):
+    server.close()
+    await server.wait_closed()
+    lookup_server.close()
+
+
+def test_async_client():
+    async def run():
+        lookup_server, server, port = await start_server(batch_size=8)
+        client = await AsyncClient.connect(port=port)
+        chars = "Hello, wørld! 123 aæø"
+        infos = await asyncio.gather(*(client.ucd_info(char) for char in chars))
+        scripts = await asyncio.gather(*(client.ucd_info(char, ["sc"]) for char in chars))
+        usages = await asyncio.gather(*(client.lng_usage(char) for char in chars))
+        stat = await client.unistat("Hello!", ["gc"])
+        with pytest.raises(ValueError):
+            await client.ucd_info("ab")
+        with pytest.raises(ValueError):
+            await client.call("no_such_method")
+        assert await client.call("ping") == "pong"
+        await client.close()
+        await stop_server(lookup_server, server)
+        return infos, scripts, usages, stat
+
+    infos, scripts, usages, stat = asyncio.run(run())
+    unichar = Unichar()
+    chars = "Hello, wørld! 123 aæø"
+    assert infos == [as_json(unichar.ucd_info(char)) for char in chars]
+    assert scripts == [as_json(unichar.ucd_info(char, ["sc"])) for char in chars]
+    assert usages == [as_json(unichar.lng_usage(char)) for char in chars]
+    unistat = Unistat()
+    unistat.add_text("Hello!")
+    assert stat == as_json(unistat.unistat(["gc"]))
+
+
+def test_blocking_client():
+    async def run():
+        lookup_server, server, port = await start_server()
+
+        def lookups():
+            with Client(port=port) as client:
+                return client.ucd_info("a", ["Script"]), client.call("ping")
+
+        result = await asyncio.get_running_loop().run_in_executor(None, lookups)
+        await stop_server(lookup_server, server)
+        return result
+
+    assert asyncio.run(run()) == ({"Script": "Latin"}, "pong")
+
+
+def test_backpressure():
+    async def run():
+        lookup_server, server, port = await start_server(max_pending=2, batch_size=1000, batch_delay=0.01)
+        client = await AsyncClient.connect(port=port)
+        results = await asyncio.gather(*(client.ucd_info(chr(codepoint), ["gc"]) for codepoint in range(0x41, 0x141)))
+        await client.close()
+        await stop_server(lookup_server, server)
+        return results
+
+    results = asyncio.run(run())
+    assert len(results) == 0x100
+    assert results[0] == {"General_Category": "Uppercase_Letter"}
+
+
+def test_idle_connections():
+    async def run():
+        lookup_server, server, port = await start_server(max_pending=2)
+        idle = [await AsyncClient.connect(port=port) for _ in range(4)]  # More idle connections than slots
+        client = await AsyncClient.connect(port=port)
+        result = await asyncio.wait_for(client.call("ping"), timeout=5)
+        for connection in idle + [client]:
+            await connection.close()
+        await stop_server(lookup_server, server)
+        return result
+
+    assert asyncio.run(run()) == "pong"
+
+
+def test_invalid_properties():
+    async def run():
+        lookup_server, server, port = await start_server(batch_delay=0.05)
+        good, bad = await AsyncClient.connect(port=port), await AsyncClient.connect(port=port)
+        results = await asyncio.gather(
+            good.ucd_info("a", ["sc"]),
+            bad.ucd_info("a", [["x"]]),
+            bad.ucd_info("a", "sc"),
+            bad.unistat("a", [1]),
+            return_exceptions=True,
+        )
+        for client in (good, bad):
+            await client.close()
+        await stop_server(lookup_server, server)
+        return results
+
+    script, *errors = asyncio.run(run())
+    assert script == {"Script": "Latin"}
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_unistat_reuses_instance():
+    unichar = Unichar(cache_size=64)
+
+    async def run():
+        lookup_server, server, port = await start_server(unichar=unichar)
+        client = await AsyncClient.connect(port=port)
+        first = await client.unistat("aab", ["gc"])
+        second = await client.unistat("c", ["gc"])  # Only the text of this request is counted
+        await client.close()
+        await stop_server(lookup_server, server)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["General_Category"]["Lowercase_Letter"]["total-count"] == 3
+    assert second["General_Category"]["Lowercase_Letter"] == {"chars": ["c"], "total-count": 1}
+
+    unistat = Unistat(cache_size=64)
+    lookup_server = LookupServer(unistat)
+    assert lookup_server.unichar is unistat
+    assert asyncio.run(lookup_server.call("unistat", {"text": "ab"})) == unistat.unistat()
+    lookup_server.close()
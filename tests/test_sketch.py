@@ -0,0 +1,98 @@
+import pickle
+import random
+import pytest
+from collections import Counter
+from unilyze import Unistat
+from unilyze.sketch import CountMinSketch, SpaceSaving, FrequencySketch
+
+
+@pytest.fixture
+def items():
+    """Skewed random items: a few frequent ones and a long tail
+    """
+    rng = random.Random(42)
+    frequent = ["a"] * 3000 + ["b"] * 2000 + ["c"] * 1000
+    tail = [chr(0x400 + rng.randrange(2000)) for _ in range(6000)]
+    items = frequent + tail
+    rng.shuffle(items)
+    return items
+
+
+def test_count_min_sketch(items):
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    for item in items:
+        sketch.add(item)
+    exact = Counter(items)
+    assert sketch.total == len(items)
+    for item, count in exact.items():
+        assert count <= sketch.estimate(item) <= count + sketch.epsilon * sketch.total
+
+    other = CountMinSketch(epsilon=0.01, delta=0.01)
+    other.add("a", 5)
+    sketch.merge(other)
+    assert sketch.estimate("a") >= exact["a"] + 5
+    with pytest.raises(ValueError):
+        sketch.merge(CountMinSketch(epsilon=0.01, delta=0.01, seed=1))
+
+
+def test_space_saving(items):
+    summary = SpaceSaving(capacity=20)
+    for item in items:
+        summary.add(item)
+    counts = summary.counts()
+    assert len(counts) == 20
+    for item, count in Counter(items).items():
+        if count > summary.total / summary.capacity:  # Heavy hitters always have a counter
+            assert count <= counts[item] <= count + summary.error(item)
+
+    half = len(items) // 2
+    first, second = SpaceSaving(capacity=20), SpaceSaving(capacity=20)
+    for item in items[:half]:
+        first.add(item)
+    for item in items[half:]:
+        second.add(item)
+    first.merge(second)
+    assert first.total == len(items)
+    assert {"a", "b", "c"} <= first.counts().keys()
+    assert first.counts()["a"] >= 3000
+
+
+def test_frequency_sketch(items):
+    sketch = FrequencySketch(epsilon=0.001, capacity=50)
+    sketch.update(Counter(items[:5000]))
+    sketch.update(items[5000:])
+    assert sketch.total == len(items)
+    assert len(sketch) == 50
+    assert [item for item, count in sketch.most_common(3)] == ["a", "b", "c"]
+    for item, count in sketch.most_common(3):
+        assert Counter(items)[item] <= count <= Counter(items)[item] + sketch.max_error()
+    assert "a" in sketch and sketch["a"] == sketch.estimate("a")
+    with pytest.raises(KeyError):
+        sketch["not counted"]
+
+    restored = pickle.loads(pickle.dumps(sketch))
+    assert restored.most_common(3) == sketch.most_common(3)
+
+
+def test_unistat_sketch(items):
+    text = "".join(items)
+    exact = Unistat()
+    exact.add_text(text)
+
+    halves = []
+    for part in [text[: len(text) // 2], text[len(text) // 2 :]]:
+        unistat = Unistat(sketch=FrequencySketch(capacity=100))
+        unistat.add_text(part)
+        halves.append(unistat)
+    merged = halves[0] + halves[1]
+
+    charstat = merged.charstat()
+    assert len(charstat) == 100
+    assert list(charstat)[:3] == ["a", "b", "c"]
+    for char in ["a", "b", "c"]:
+        assert charstat[char] >= exact.charstat()[char]
+    stat = merged.unistat(["gc"])
+    assert stat["General_Category"]["Lowercase_Letter"]["chars"] >= {"a", "b", "c"}
+
+    with pytest.raises(ValueError):  # Sketches with different parameters can't be merged
+        Unistat(sketch=FrequencySketch(capacity=100, epsilon=0.01)).merge(halves[0])
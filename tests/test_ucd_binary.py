@@ -0,0 +1,73 @@
+from unilyze.ucd_binary import save_binary, save_decoded_binary, UcdBinary, DecodedUcdBinary
+from unilyze.ucd_translate import UcdTranslator
+
+DB = {
+    "groups": {"0": {"gc": "Lu", "sc": "Latn", "Upper": "Y"}, "1": {"gc": "Nd", "sc": "Zyyy"}},
+    "chars": {
+        "A": {"group": "0", "na": "LATIN CAPITAL LETTER A"},
+        "Ä": {"group": "0", "na": "LATIN CAPITAL LETTER A WITH DIAERESIS", "dm": "0041 0308"},
+        "1": {"group": "1", "gc": "No"},
+        "2": {"group": "1"},
+    },
+    "ranges": [
+        [0x0378, 0x0378, "1", {"gc": "Cn"}],
+        [0x4E00, 0x9FFF, "0", {"na": "CJK UNIFIED IDEOGRAPH-#", "gc": "Lo"}],
+    ],
+}
+
+
+def create_db(tmp_path):
+    filename = str(tmp_path / "ucd_codepoints.bin")
+    save_binary(filename, DB)
+    return UcdBinary(filename)
+
+
+def test_lookup(tmp_path):
+    db = create_db(tmp_path)
+    assert len(db) == 4
+    for char, char_info in DB["chars"].items():
+        merged_info = {**DB["groups"][char_info["group"]], **char_info}
+        merged_info.pop("group")
+        assert db.lookup(char) == merged_info
+
+
+def test_lookup_char_overrides_group(tmp_path):
+    db = create_db(tmp_path)
+    assert db.lookup("1")["gc"] == "No"
+    assert db.lookup("2")["gc"] == "Nd"
+
+
+def test_lookup_missing(tmp_path):
+    db = create_db(tmp_path)
+    assert db.lookup("B") is None
+    assert db.lookup("\U0010FFFF") is None
+    assert db.lookup("\x00") is None
+
+
+def test_lookup_ranges(tmp_path):
+    db = create_db(tmp_path)
+    assert db.lookup("\u0378") == {"gc": "Cn", "sc": "Zyyy"}
+    assert db.lookup("\u4e00")["na"] == "CJK UNIFIED IDEOGRAPH-4E00"
+    assert db.lookup("\u9fff") == {"gc": "Lo", "sc": "Latn", "Upper": "Y", "na": "CJK UNIFIED IDEOGRAPH-9FFF"}
+    assert db.lookup("\u0379") is None
+    assert db.lookup("\ua000") is None
+
+
+def test_decoded(tmp_path):
+    db = create_db(tmp_path)
+    translator = UcdTranslator(
+        {"gc": "General_Category", "sc": "Script", "Upper": "Uppercase", "na": "Name", "dm": "Decomposition_Mapping"},
+        {"gc": {"Lu": "Uppercase_Letter"}, "sc": {"Latn": "Latin"}, "Upper": {"Y": "Yes", "N": "No"}},
+    )
+    filename = str(tmp_path / "ucd_codepoints_decoded.bin")
+    save_decoded_binary(filename, db, translator.translate_info)
+    decoded = DecodedUcdBinary(filename)
+
+    info = decoded.lookup("Ä")
+    assert info["General_Category"] == "Uppercase_Letter"
+    assert info["Uppercase"] is True
+    assert info["Decomposition_Mapping"] == ("A", "\u0308")
+    assert decoded.lookup("\u4e01")["Name"] == "CJK UNIFIED IDEOGRAPH-4E01"
+    assert decoded.lookup("B") is None
+    for char in ["A", "1", "\u0378", "\u9fff"]:
+        assert decoded.lookup(char) == translator.translate_info(db.lookup(char))
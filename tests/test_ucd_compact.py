@@ -0,0 +1,44 @@
+from unilyze.ucd_compact import CompactUcdDb
+from tests.test_ucd_binary import DB, create_db
+
+
+def test_lookup():
+    db = CompactUcdDb(DB)
+    assert len(db) == 4
+    for char, char_info in DB["chars"].items():
+        merged_info = {**DB["groups"][char_info["group"]], **char_info}
+        merged_info.pop("group")
+        assert list(db.lookup(char).items()) == list(merged_info.items())  # Also the same key order
+    assert db.lookup("1")["gc"] == "No"
+    assert db.lookup("2")["gc"] == "Nd"
+    assert db.lookup("x") is None
+
+
+def test_lookup_ranges():
+    db = CompactUcdDb(DB)
+    assert db.lookup("͸") == {"gc": "Cn", "sc": "Zyyy"}
+    assert db.lookup("丁")["na"] == "CJK UNIFIED IDEOGRAPH-4E01"
+    assert db.lookup("ꀀ") is None
+
+
+def test_same_as_binary(tmp_path):
+    compact, binary = CompactUcdDb(DB), create_db(tmp_path)
+    for codepoint in list(range(0x80)) + [0x378, 0x379, 0x4E00, 0x9FFF, 0xA000]:
+        assert compact.lookup(chr(codepoint)) == binary.lookup(chr(codepoint))
+
+
+def test_shared_records():
+    db = CompactUcdDb(
+        {
+            "groups": {"0": {"gc": "Lu", "sc": "Latn"}},
+            "chars": {
+                "a": {"group": "0", "na": "LATIN SMALL LETTER A", "gc": "Ll"},
+                "b": {"group": "0", "na": "LATIN SMALL LETTER B", "gc": "Ll"},
+                "C": {"group": "0", "na": "LATIN CAPITAL LETTER C"},
+            },
+        }
+    )
+    assert db.chars[ord("a")] is db.chars[ord("b")]  # The names are kept apart, so the rest is shared
+    assert db.chars[ord("C")] == (0, (("na", None),))
+    assert list(db.lookup("b")) == ["gc", "sc", "na"]
+    assert db.lookup("b") == {"gc": "Ll", "sc": "Latn", "na": "LATIN SMALL LETTER B"}
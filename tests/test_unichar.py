@@ -1,6 +1,8 @@
 import pytest
 import json
+import unicodedata
 from unilyze import Unichar
+from unilyze.unichar import ReadOnlyDict
 
 TEST_CHAR = "Ä"
 u = Unichar()
@@ -88,3 +90,112 @@ def test_in_lng():
 
     with pytest.raises(ValueError):
         used = u.in_lng("BAD CHAR", "da")
+
+
+def test_ucd_info_cache():
+    cached = Unichar(cache_size=2)
+    first = cached.ucd_info(TEST_CHAR)
+    assert cached.ucd_info(TEST_CHAR) is first
+    assert cached.ucd_cache_info().hits == 1
+    assert cached.ucd_cache_info().misses == 1
+
+    cached.ucd_info("a")
+    cached.ucd_info("b")  # Evicts TEST_CHAR
+    assert cached.ucd_cache_info().currsize == 2
+    assert cached.ucd_info(TEST_CHAR) is not first
+    assert cached.ucd_info(TEST_CHAR) == first
+
+    cached.ucd_cache_clear()
+    assert cached.ucd_cache_info().currsize == 0
+
+
+def test_ucd_info_read_only():
+    info = u.ucd_info(TEST_CHAR)
+    with pytest.raises(TypeError):
+        info["Age"] = "V2_0"
+    with pytest.raises(TypeError):
+        info.update({"Age": "V2_0"})
+    assert isinstance(info["Decomposition_Mapping"], tuple)
+
+    copy = dict(info)
+    copy["Age"] = "V2_0"
+    assert u.ucd_info(TEST_CHAR)["Age"] != "V2_0"
+
+
+def test_ucd_info_properties():
+    info = u.ucd_info("A", properties=["General_Category", "sc", "NOT A PROPERTY"])
+    assert info == {"General_Category": "Uppercase_Letter", "Script": "Latin"}
+    assert isinstance(info, ReadOnlyDict)
+
+    precomputed = Unichar()
+    precomputed.precompute_ucd_info("A", "A")
+    assert precomputed.ucd_info("A", properties=["gc", "Script"]) == info
+
+
+def test_precompute_ucd_info():
+    precomputed = Unichar(cache_size=0)
+    assert precomputed.precompute_ucd_info("\u0000", "\u007f") == 128
+    assert precomputed.ucd_info("A") == u.ucd_info("A")
+    assert precomputed.ucd_cache_info().misses == 0
+
+
+def test_chars_where():
+    greek = u.chars_where("Script", "Greek")
+    assert "α" in greek
+    assert "a" not in greek
+    assert greek == u.chars_where("sc", "Grek")
+
+    upper_greek = greek & u.chars_where("Uppercase", True)
+    assert "Ω" in upper_greek
+    assert "ω" not in upper_greek
+
+    letters = u.chars_where("General_Category", ["Uppercase_Letter", "Lowercase_Letter"])
+    assert "A" in letters and "a" in letters and "1" not in letters
+
+    with pytest.raises(KeyError):
+        u.chars_where("NOT A PROPERTY", "x")
+
+
+def test_lng_can_write():
+    locales = u.lng_can_write("Rødgrød med fløde")
+    assert "da" in locales
+    assert "en" not in locales
+
+    assert "en" in u.lng_can_write("Hello world", groups=["main"])
+    assert u.lng_can_write("å", groups=["NOT A GROUP"]) == []
+
+
+def test_ucd_info_many():
+    info = u.ucd_info_many("AbA!", ["Script", "gc"])
+    assert list(info) == ["Script", "gc"]
+    assert info["Script"] == [u.ucd_info(char)["Script"] for char in "AbA!"]
+    assert info["gc"] == [u.ucd_info(char)["General_Category"] for char in "AbA!"]
+
+    assert u.ucd_info_many([65, 98], ["sc"]) == u.ucd_info_many(["A", "b"], ["sc"])
+    assert u.ucd_info_many("A")["Age"] == [u.ucd_info("A")["Age"]]
+    assert u.ucd_info_many("", ["Script"]) == {"Script": []}
+
+    with pytest.raises(ValueError):
+        u.ucd_info_many(["AB"])
+
+
+def test_lng_usage_many():
+    usage = u.lng_usage_many("æ ", groups=["main"])
+    assert usage["main"] == [u.lng_usage("æ")["main"], None]
+    assert set(u.lng_usage_many("æ")) == set(u.lng_usage("æ"))
+
+
+def test_case_mappings():
+    text = "Straße Ǆemal ÅNGSTRÖM 123!"
+    assert u.to_upper(text) == text.upper()
+    assert u.to_lower(text) == text.lower()
+    assert u.casefold(text) == text.casefold()
+    assert u.to_upper("ß") == "SS"
+
+
+def test_decompose():
+    assert u.decompose("\u00c5") == "A\u030a"
+    assert u.decompose("\ud55c") == "\u1112\u1161\u11ab"  # Hangul is decomposed algorithmically
+    assert u.decompose("a\u0301\u0327") == "a\u0327\u0301"  # Combining marks are put in canonical order
+    text = "\u00c5ngstr\u00f6m \u00e7\u0301"
+    assert u.decompose(text) == unicodedata.normalize("NFD", text)
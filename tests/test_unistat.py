@@ -1,4 +1,8 @@
+import io
+import pytest
+from collections import Counter
 from unilyze import Unistat
+from unilyze import unistat as unistat_module
 
 u = Unistat()
 
@@ -28,3 +32,96 @@ def test_unistat():
     stat = u.unistat()
     assert len(stat["Lowercase"][True]["chars"]) == 12  # 12 different lowercase characters
     assert stat["General_Category"]["Space_Separator"]["total-count"] == 5
+
+
+def test_add_stream():
+    u.reset_stat()
+
+    text = "æøå € 😀 test"
+    u.add_stream(io.BytesIO(text.encode("utf-8")), chunk_size=1)  # Every multi-byte character is split
+    assert u.charstat() == Counter(text)
+
+    u.add_stream(io.StringIO(text), chunk_size=3)
+    u.add_stream(iter([b"\xc3", b"\xa6", "æ"]))
+    stat = u.charstat()
+    assert stat["😀"] == 2
+    assert stat["æ"] == 4
+
+
+def test_add_stream_truncated():
+    u.reset_stat()
+
+    with pytest.raises(UnicodeDecodeError):
+        u.add_stream(io.BytesIO(b"ab\xc3"))
+
+    u.reset_stat()
+    u.add_stream(io.BytesIO(b"ab\xc3"), errors="replace")
+    assert u.charstat()["�"] == 1
+
+
+def test_add_file(tmp_path):
+    u.reset_stat()
+
+    filename = tmp_path / "text.txt"
+    filename.write_text("Æblegrød\n" * 1000, encoding="utf-8")
+    u.add_file(str(filename), chunk_size=7)
+    stat = u.charstat()
+    assert stat["ø"] == 1000
+    assert stat["\n"] == 1000
+
+
+def test_unistat_incremental():
+    u.reset_stat()
+
+    u.add_text("TesT1!")
+    first = u.unistat()
+    u.add_text("Another little test to be added")
+    u.add_text("TesT1!")
+    second = u.unistat()
+
+    assert first["Uppercase"][True]["total-count"] == 2  # The first snapshot isn't changed by later text
+    assert second["Uppercase"][True]["total-count"] == 5
+
+    recomputed = Unistat()
+    recomputed.add_text("TesT1!Another little test to be addedTesT1!")
+    assert second == recomputed.unistat()
+
+
+def test_unistat_properties():
+    u.reset_stat()
+
+    u.add_text("TesT1!")
+    full = u.unistat()
+    stat = u.unistat(properties=["General_Category", "sc"])
+    assert set(stat) == {"General_Category", "Script"}
+    assert stat["Script"] == full["Script"]
+
+    u.add_text("Another little test")  # Each projection is kept up to date
+    assert u.unistat(properties=["sc"])["Script"] == u.unistat()["Script"]
+
+
+def test_unistat_many_projections(monkeypatch):
+    monkeypatch.setattr(unistat_module, "PROJECTION_CACHE_SIZE", 2)
+    us = Unistat()
+    us.add_text("TesT1!")
+    first = us.unistat(["sc"])
+    for properties in (["gc"], ["Upper"], ["Lower"], ["sc"]):
+        us.add_text("ab")
+        us.unistat(properties)
+    assert us.unistat(["sc"])["Script"]["Latin"]["total-count"] == first["Script"]["Latin"]["total-count"] + 8
+
+    evicted = us.unistat(["gc"])  # Summed up again from the character counts
+    recomputed = Unistat()
+    recomputed.add_text("TesT1!abababab")
+    assert evicted == recomputed.unistat(["gc"])
+
+
+def test_lng_rank():
+    u.reset_stat()
+    assert u.lng_rank() == []
+
+    u.add_text("Rødgrød med fløde og æbleskiver")
+    ranking = u.lng_rank()
+    assert ranking[0] == ("da", 1.0)
+    assert dict(ranking)["en"] < 1.0
+    assert len(u.lng_rank(top=2)) == 2
@@ -0,0 +1,78 @@
+import pickle
+import pytest
+from unilyze import Unistat
+
+np = pytest.importorskip("numpy")
+from unilyze.unistat_numpy import NumpyUnistat  # noqa: E402
+
+TEXT = "TesT1! Another little test to be added. Æblegrød med flødeskum 123"
+
+u = NumpyUnistat()
+
+
+def test_charstat():
+    u.reset_stat()
+    assert u.charstat() == {}
+
+    u.add_text("test1!")
+    stat = u.charstat()
+    assert stat["t"] == 2
+
+    u.reset_stat()
+    assert u.charstat() == {}
+
+
+def test_reset_clears_unistat_state():
+    us = NumpyUnistat()
+    us.add_text(TEXT)
+    us.unistat()
+    us.unistat(["sc"])
+    us.reset_stat()
+    us.add_text("abc")
+
+    reference = Unistat()
+    reference.add_text("abc")
+    assert us.unistat() == reference.unistat()  # Nothing left of the statistics before the reset
+    assert us.unistat(["sc"]) == reference.unistat(["sc"])
+    assert us.charstat() == {"a": 1, "b": 1, "c": 1}
+
+
+def test_unistat():
+    u.reset_stat()
+
+    u.add_text("TesT1!")
+    stat = u.unistat()
+    assert stat["Uppercase"][True]["total-count"] == 2
+    assert "e" in stat["Script"]["Latin"]["chars"]
+
+
+def test_same_as_unistat():
+    reference = Unistat()
+    u.reset_stat()
+    for text in (TEXT, "", TEXT * 3):
+        reference.add_text(text)
+        u.add_text(text)
+
+    assert u.charstat() == reference.charstat()
+    assert u.unistat() == reference.unistat()
+
+
+def test_unistat_properties():
+    reference = Unistat()
+    u.reset_stat()
+    reference.add_text(TEXT)
+    u.add_text(TEXT)
+
+    properties = ["General_Category", "sc", "na"]
+    assert set(u.unistat(properties)) == {"General_Category", "Script", "Name"}
+    assert u.unistat(properties) == reference.unistat(properties)
+
+
+def test_merge_and_pickle():
+    u.reset_stat()
+    u.add_text("aab")
+    other = Unistat()
+    other.add_text("bc")
+
+    total = pickle.loads(pickle.dumps(u + other + u))
+    assert total.charstat() == {"a": 4, "b": 3, "c": 1}
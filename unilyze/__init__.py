@@ -1,2 +1,17 @@
-from .unichar import Unichar
-from .unistat import Unistat
+# The classes are imported on first use, so "import unilyze" stays cheap for short-lived processes
+_LAZY_ATTRIBUTES = {"Unichar": "unilyze.unichar", "Unistat": "unilyze.unistat"}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(__import__(module, fromlist=[name]), name)
+    globals()[name] = value  # Later lookups don't come here
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
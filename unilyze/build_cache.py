@@ -0,0 +1,144 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import urllib.request
+
+MANIFEST_FILE = "build_manifest.json"  # Stored in the db-folder, next to the databases it describes
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_hash(data):
+    """Gets the content hash of some data
+
+    Args:
+        data (bytes|str): The data. A str is UTF-8 encoded first
+
+    Returns:
+        str: Hex digest of the SHA-256 hash
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(filename):
+    """Gets the content hash of a file. The file is read in blocks, so big files don't need to fit in memory
+
+    Args:
+        filename (str): The file
+
+    Returns:
+        str: Hex digest of the SHA-256 hash
+    """
+    sha = hashlib.sha256()
+    with open(filename, mode="rb") as fp:
+        for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def fetch_archive(source, cache_dir=None):
+    """Gets a local path of a zip-file. A local path is used as it is. An URL is downloaded into the cache folder,
+    unless it has been downloaded there before, so the same archive is never downloaded twice.
+
+    Args:
+        source (str): URL or local path of the zip-file
+        cache_dir (str, optional): Folder for downloaded archives. Defaults to the temp folder.
+
+    Returns:
+        str: Path of the local zip-file
+    """
+    if "://" not in source:
+        return source
+
+    cache_dir = cache_dir or tempfile.gettempdir()
+    url_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]  # Different releases have the same filename
+    name, ext = os.path.splitext(os.path.basename(source))
+    filename = os.path.join(cache_dir, "{}-{}{}".format(name, url_hash, ext))
+    if not os.path.exists(filename):
+        os.makedirs(cache_dir, exist_ok=True)
+        with urllib.request.urlopen(source) as url, open(filename + ".part", mode="wb") as fp:
+            shutil.copyfileobj(url, fp)
+        os.replace(filename + ".part", filename)  # A broken download never looks like a cached archive
+    return filename
+
+
+class BuildManifest:
+    """Records how each database in the db-folder was built: the content hashes of the inputs it was built from,
+    and the content hash of the database itself. A builder asks "is_current" before it rebuilds a database,
+    and skips it when neither the inputs nor the database file have changed since the last build.
+    """
+
+    def __init__(self, db_dir):
+        """Loads the manifest of a db-folder. A missing or outdated manifest is treated as empty
+
+        Args:
+            db_dir (str): The db-folder. Eg: "unilyze/db"
+        """
+        self.db_dir = db_dir
+        self.__filename = os.path.join(db_dir, MANIFEST_FILE)
+        self.__outputs = {}
+        if os.path.exists(self.__filename):
+            with open(self.__filename, mode="r", encoding="utf-8") as fp:
+                manifest = json.load(fp)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.__outputs = manifest["outputs"]
+
+    def is_current(self, output, inputs=None):
+        """Checks if a database is up to date
+
+        Args:
+            output (str): Filename of the database, relative to the db-folder. Eg: "ucd_codepoints.json"
+            inputs (dict, optional): The current content hashes of the inputs. Eg: {"PropertyAliases.txt": "9f2c..."}
+                                     If left out, only the database file itself is checked.
+
+        Returns:
+            bool: True if the database file is unchanged since it was recorded, and it was built from the same inputs
+        """
+        entry = self.__outputs.get(output)
+        if entry is None or (inputs is not None and entry["inputs"] != inputs):
+            return False
+        filename = os.path.join(self.db_dir, output)
+        return os.path.exists(filename) and file_hash(filename) == entry["hash"]
+
+    def inputs(self, output):
+        """
+        Args:
+            output (str): Filename of the database, relative to the db-folder
+
+        Returns:
+            dict: The input hashes the database was last built from. Empty if it isn't in the manifest
+        """
+        return self.__outputs.get(output, {}).get("inputs", {})
+
+    def meta(self, output):
+        """
+        Args:
+            output (str): Filename of the database, relative to the db-folder
+
+        Returns:
+            dict: The extra information the builder recorded with the database. Empty if there is none
+        """
+        return self.__outputs.get(output, {}).get("meta", {})
+
+    def record(self, output, inputs, meta=None):
+        """Records a database that was just built. Call "save" to write the manifest to disk
+
+        Args:
+            output (str): Filename of the database, relative to the db-folder
+            inputs (dict): Content hashes of the inputs the database was built from
+            meta (dict, optional): Extra information the builder needs for the next incremental build
+        """
+        entry = {"hash": file_hash(os.path.join(self.db_dir, output)), "inputs": inputs}
+        if meta:
+            entry["meta"] = meta
+        self.__outputs[output] = entry
+
+    def save(self):
+        """Writes the manifest to the db-folder
+        """
+        with open(self.__filename, mode="w", encoding="utf-8") as fp:
+            json.dump({"version": MANIFEST_VERSION, "outputs": self.__outputs}, fp, indent=1, sort_keys=True)
@@ -0,0 +1,194 @@
+"""Clients of the lookup server in unilyze.serve. "Client" is a plain blocking client, "AsyncClient" pipelines
+any number of concurrent requests over one connection.
+"""
+import json
+import socket
+import asyncio
+import itertools
+
+# Shared with unilyze.serve. Kept here, so the client doesn't import the databases code
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE = 64 << 20  # Longest request or response line in bytes
+
+ERRORS = {"ValueError": ValueError, "KeyError": KeyError, "TypeError": TypeError}
+
+
+def raise_error(error):
+    """Raises the error of a response as the exception the server got, when it's a known one
+
+    Args:
+        error (str): The error of the response. Eg: "ValueError: Unknown method: x"
+
+    Raises:
+        Exception: Always
+    """
+    name, _, message = error.partition(": ")
+    raise ERRORS.get(name, RuntimeError)(message if name in ERRORS else error)
+
+
+class Client:
+    """Blocking client. Requests are sent one at a time. Not thread-safe, use one client per thread
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, timeout=None):
+        """
+        Args:
+            host (str, optional): Address of the server
+            port (int, optional): Port of the server
+            unix (str, optional): Connect to this Unix socket instead of TCP
+            timeout (float, optional): Seconds to wait for a response. Defaults to no timeout.
+        """
+        if unix:
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.settimeout(timeout)
+            self.__socket.connect(unix)
+        else:
+            self.__socket = socket.create_connection((host, port), timeout)
+        self.__file = self.__socket.makefile("rwb")
+        self.__ids = itertools.count()
+
+    def call(self, method, **params):
+        """Sends a request and waits for its response
+
+        Args:
+            method (str): "ucd_info", "lng_usage", "unistat" or "ping"
+            **params: The arguments of the method. Eg: char="a"
+
+        Raises:
+            ValueError: If the server raised it. Other errors of the server raise RuntimeError
+            ConnectionError: If the connection to the server is lost
+
+        Returns:
+            object: The result. JSON types only: tuples and sets come back as lists
+        """
+        request_id = next(self.__ids)
+        request = {"id": request_id, "method": method, "params": params}
+        self.__file.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.__file.flush()
+        line = self.__file.readline()
+        if not line:
+            raise ConnectionError("Connection to the server was closed")
+        response = json.loads(line)
+        if "error" in response:
+            raise_error(response["error"])
+        return response["result"]
+
+    def ucd_info(self, char, properties=None):
+        """See Unichar.ucd_info"""
+        return self.call("ucd_info", char=char, properties=properties)
+
+    def lng_usage(self, char):
+        """See Unichar.lng_usage"""
+        return self.call("lng_usage", char=char)
+
+    def unistat(self, text, properties=None):
+        """See Unistat.unistat. The statistics of the text alone"""
+        return self.call("unistat", text=text, properties=properties)
+
+    def close(self):
+        self.__file.close()
+        self.__socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncClient:
+    """Asyncio client. Concurrent requests share one connection, and are matched to their responses by id.
+    Create it with "await AsyncClient.connect(...)".
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Args:
+            reader (asyncio.StreamReader): Responses from the server
+            writer (asyncio.StreamWriter): Requests to the server
+        """
+        self.__reader = reader
+        self.__writer = writer
+        self.__ids = itertools.count()
+        self.__waiting = {}  # Request id -> future of the response
+        self.__write_lock = asyncio.Lock()
+        self.__receiver = asyncio.get_running_loop().create_task(self.__receive())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+        """
+        Args:
+            host (str, optional): Address of the server
+            port (int, optional): Port of the server
+            unix (str, optional): Connect to this Unix socket instead of TCP
+
+        Returns:
+            AsyncClient: The connected client
+        """
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def __receive(self):
+        """Hands the responses to the requests waiting for them. Fails the waiting requests when the connection ends
+        """
+        try:
+            while True:
+                line = await self.__reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.__waiting.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.__waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the server was closed"))
+            self.__waiting.clear()
+
+    async def call(self, method, **params):
+        """Sends a request and waits for its response. Other requests can be sent in the meantime
+
+        Args:
+            method (str): "ucd_info", "lng_usage", "unistat" or "ping"
+            **params: The arguments of the method. Eg: char="a"
+
+        Raises:
+            ValueError: If the server raised it. Other errors of the server raise RuntimeError
+            ConnectionError: If the connection to the server is lost
+
+        Returns:
+            object: The result. JSON types only: tuples and sets come back as lists
+        """
+        request_id = next(self.__ids)
+        future = asyncio.get_running_loop().create_future()
+        self.__waiting[request_id] = future
+        request = {"id": request_id, "method": method, "params": params}
+        async with self.__write_lock:
+            self.__writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            await self.__writer.drain()  # Waits when the server applies backpressure
+        response = await future
+        if "error" in response:
+            raise_error(response["error"])
+        return response["result"]
+
+    async def ucd_info(self, char, properties=None):
+        """See Unichar.ucd_info"""
+        return await self.call("ucd_info", char=char, properties=properties)
+
+    async def lng_usage(self, char):
+        """See Unichar.lng_usage"""
+        return await self.call("lng_usage", char=char)
+
+    async def unistat(self, text, properties=None):
+        """See Unistat.unistat. The statistics of the text alone"""
+        return await self.call("unistat", text=text, properties=properties)
+
+    async def close(self):
+        self.__writer.close()
+        await self.__writer.wait_closed()
+        self.__receiver.cancel()
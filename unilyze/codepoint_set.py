@@ -0,0 +1,123 @@
+from bisect import bisect_right
+
+
+class CodepointSet:
+    """An immutable set of code points, stored as a sorted list of disjoint (first, last) ranges.
+    Large blocks of characters take no more memory than a single range. Sets can be combined with
+    & (and), | (or) and - (difference), and iterating over a set yields its characters lazily.
+    """
+
+    def __init__(self, ranges=()):
+        """
+        Args:
+            ranges (iterable, optional): (first, last) code point pairs, both inclusive. They may overlap
+                                         and be unsorted. Eg: [(0x41, 0x5A), (0x61, 0x7A)]
+        """
+        merged = []
+        for first, last in sorted(ranges):
+            if merged and first <= merged[-1][1] + 1:  # Overlapping or adjacent ranges are joined
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((first, last))
+        self.ranges = merged
+        self.__firsts = [first for first, last in merged]
+
+    @classmethod
+    def from_flat(cls, flat):
+        """Creates a set from a flat list of range bounds, as stored in the database files
+
+        Args:
+            flat (list): [first1, last1, first2, last2, ...]
+
+        Returns:
+            CodepointSet: The set
+        """
+        return cls(zip(flat[::2], flat[1::2]))
+
+    @classmethod
+    def from_chars(cls, chars):
+        """Creates a set from characters
+
+        Args:
+            chars (iterable): Single characters. Eg: "abc"
+
+        Returns:
+            CodepointSet: The set
+        """
+        return cls((ord(char), ord(char)) for char in chars)
+
+    def to_flat(self):
+        """Gets the ranges as a flat list. The inverse of "from_flat"
+
+        Returns:
+            list: [first1, last1, first2, last2, ...]
+        """
+        return [bound for first_last in self.ranges for bound in first_last]
+
+    def codepoints(self):
+        """Iterates over the code points of the set in ascending order
+
+        Yields:
+            int: The next code point
+        """
+        for first, last in self.ranges:
+            yield from range(first, last + 1)
+
+    def __iter__(self):
+        return map(chr, self.codepoints())
+
+    def __len__(self):
+        return sum(last - first + 1 for first, last in self.ranges)
+
+    def __bool__(self):
+        return bool(self.ranges)
+
+    def __contains__(self, char):
+        codepoint = ord(char) if isinstance(char, str) else char
+        idx = bisect_right(self.__firsts, codepoint) - 1
+        return idx >= 0 and codepoint <= self.ranges[idx][1]
+
+    def __eq__(self, other):
+        if not isinstance(other, CodepointSet):
+            return NotImplemented
+        return self.ranges == other.ranges
+
+    def __or__(self, other):
+        return CodepointSet(self.ranges + other.ranges)
+
+    def __and__(self, other):
+        intersection = []
+        idx = other_idx = 0
+        while idx < len(self.ranges) and other_idx < len(other.ranges):
+            first, last = self.ranges[idx]
+            other_first, other_last = other.ranges[other_idx]
+            if max(first, other_first) <= min(last, other_last):
+                intersection.append((max(first, other_first), min(last, other_last)))
+            if last < other_last:  # Move on in the set whose range ends first
+                idx += 1
+            else:
+                other_idx += 1
+        return CodepointSet(intersection)
+
+    def __sub__(self, other):
+        difference = []
+        other_idx = 0
+        for first, last in self.ranges:
+            while other_idx < len(other.ranges) and other.ranges[other_idx][1] < first:
+                other_idx += 1
+            idx = other_idx
+            while idx < len(other.ranges) and other.ranges[idx][0] <= last:
+                other_first, other_last = other.ranges[idx]
+                if other_first > first:
+                    difference.append((first, other_first - 1))
+                first = max(first, other_last + 1)
+                idx += 1
+            if first <= last:
+                difference.append((first, last))
+        return CodepointSet(difference)
+
+    def __repr__(self):
+        ranges = ", ".join("{:04X}..{:04X}".format(first, last) for first, last in self.ranges[:5])
+        more = ", ..." if len(self.ranges) > 5 else ""
+        return "CodepointSet([{}{}])".format(ranges, more)
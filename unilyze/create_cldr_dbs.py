@@ -1,65 +1,160 @@
-import re
+import os
+import sys
 import json
+import logging
 from zipfile import ZipFile
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
-from io import BytesIO
-import urllib.request
+from unilyze.build_cache import BuildManifest, content_hash, file_hash, fetch_archive
 
+CLDR_CORE_URL = "http://unicode.org/Public/cldr/37/core.zip"
+LOCALE_DIR = "common/main/"  # The locale definitions inside core.zip
+LOCALE_SHARD_SIZE = 32  # Number of locale files each worker parses per task
 
-def raw_url_xml(url, dir_search, file_search):
-    """An iterator that yields many xml-files from inside a single zip-file in the provided url.
+# The databases, relative to the db-folder
+EXEMPLAR_CHAR_DB = "cldr_exemplar_char.json"
+CHAR_EXEMPLAR_DB = "cldr_char_exemplar.json"
+CHAR_LOCALES_DB = "cldr_char_locales.json"
+LANG_TERR_DB = "cldr_language_territory.json"
 
-    Args:
-        url (str): URL of the zip-file
-        dir_search (str): A directory name to search for
-        file_search (str): A file name to search for.
-
-    Yields:
-        xml.etree.ElementTree: An XML tree element for further parsing
-    """
-    url = urllib.request.urlopen(url)
+UNICODE_SET_WHITE_SPACE = frozenset("\t\n\x0b\x0c\r \x85\u200e\u200f\u2028\u2029")  # Pattern_White_Space
+UNICODE_SET_HEX_ESCAPES = {"u": 4, "U": 8, "x": 2}  # Escape -> number of hex digits
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
 
-    with ZipFile(BytesIO(url.read())) as zf:
-        for name in zf.namelist():
-            if dir_search in name and file_search in name:
-                raw_xml = zf.read(name).decode("utf-8")
-                yield ET.fromstring(raw_xml,)
+logger = logging.getLogger(__name__)
 
 
-def exemplar_unescape(text):
-    """ In the original xml's the exemplar-fileds are escaped.
-    This method removes the escaping and returns a cleaned exemplar string
-    Info about escaping: https://www.unicode.org/reports/tr35/tr35-59/tr35.html#Unicode_Sets
+def read_unicode_set_char(text, idx):
+    """Reads one character of a UnicodeSet, which may be escaped. Eg: "a", "\\-", "\\u00E5", "\\U0001F600" or "\\x{E5}".
+    An escaped UTF-16 surrogate pair is read as one character
 
     Args:
-        text (str): Raw exemplar string from XML. EG: "a b c \\- \\["
+        text (str): The UnicodeSet
+        idx (int): Position of the character
+
+    Raises:
+        ValueError: If an escape sequence is malformed
 
     Returns:
-        str: A clean exemplar string without escape characters. EG: "a b c - ["
+        (int, int): The codepoint, and the position after the character
     """
-    esc_chars = ["-", "[", "]", ":", "&", "$", "\\", "^", "{", "}"]
+    if text[idx] != "\\":
+        return ord(text[idx]), idx + 1
+    if idx + 1 >= len(text):
+        raise ValueError("UnicodeSet ends with a backslash: {}".format(text))
+    escape = text[idx + 1]
+    if escape == "x" and text.startswith("{", idx + 2):
+        end = text.find("}", idx + 3)
+        if end < 0:
+            end = len(text) - 1  # Unterminated, so malformed
+        digits, after = text[idx + 3 : end], end + 1
+    elif escape in UNICODE_SET_HEX_ESCAPES:
+        after = idx + 2 + UNICODE_SET_HEX_ESCAPES[escape]
+        digits = text[idx + 2 : after]
+        if len(digits) != UNICODE_SET_HEX_ESCAPES[escape]:
+            digits = ""
+    else:  # Any other escaped character is itself. Eg: "\\-" or "\\{"
+        return ord(escape), idx + 2
+    if not digits or not all(digit in HEX_DIGITS for digit in digits) or int(digits, 16) > 0x10FFFF:
+        raise ValueError("Malformed escape {!r} in UnicodeSet: {}".format(text[idx:after], text))
+    codepoint = int(digits, 16)
+
+    if 0xD800 <= codepoint <= 0xDBFF and text.startswith("\\u", after):  # High surrogate. Eg: "\\uD83D\\uDE00"
+        low, low_after = read_unicode_set_char(text, after)
+        if 0xDC00 <= low <= 0xDFFF:
+            return 0x10000 + ((codepoint - 0xD800) << 10) + (low - 0xDC00), low_after
+    return codepoint, after
+
+
+def parse_unicode_set(text):
+    """Parses a UnicodeSet, like the exemplar characters of CLDR, in a single pass.
+    Ranges ("a-z"), strings of more characters ("{aa}"), escapes ("\\u00E5", "\\-") and pattern white space are
+    supported. Info about the syntax: https://www.unicode.org/reports/tr35/tr35.html#Unicode_Sets
 
-    for esc_char in esc_chars:
-        text = text.replace("\\" + esc_char, esc_char)
-
-    text = re.sub(r"\{([^\s]+)\}", "\\1", text)  # Multichar's are in format "{xx}"
-
-    return text
+    Args:
+        text (str): The UnicodeSet. Eg: "[a-c æ {aa} \\u00E5]"
 
+    Raises:
+        ValueError: If the set uses syntax that exemplars don't need, like properties ("[:Latin:]"),
+                    negation ("[^a]") or set operations, or if it's malformed
 
-def exemplar_unicodes_convert(text):
-    """Convert \u1234 strings inside the exemplar text to real unicode characters
+    Returns:
+        list: (first, last) codepoint ranges, both inclusive, and multi-character strings, in the order of the set.
+              Eg: [(0x61, 0x63), (0xE6, 0xE6), "aa", (0xE5, 0xE5)]
+    """
+    items = []
+    idx = 0
+    depth = 0
+    dash = False  # A "-" after a character. It's a range if a character follows, else a literal "-"
+    while idx < len(text):
+        char = text[idx]
+        if char in UNICODE_SET_WHITE_SPACE:
+            idx += 1
+            continue
+        if char == "[":
+            if text.startswith("[:", idx) or text.startswith("[^", idx) or depth:
+                raise ValueError("Unsupported UnicodeSet syntax at {!r}: {}".format(text[idx : idx + 3], text))
+            depth += 1
+            idx += 1
+            continue
+        if char in "]}&$^":
+            if char != "]" or not depth:
+                raise ValueError("Unexpected {!r} in UnicodeSet: {}".format(char, text))
+            if dash:
+                items.append((ord("-"), ord("-")))
+                dash = False
+            depth -= 1
+            idx += 1
+            continue
+        if char == "-" and not dash and items and isinstance(items[-1], tuple) and items[-1][0] == items[-1][1]:
+            dash = True
+            idx += 1
+            continue
+        if char == "{":  # A string of characters. Eg: "{aa}" or "{\\u0915\\u094D}"
+            end = idx + 1
+            codepoints = []
+            while end < len(text) and text[end] != "}":
+                codepoint, end = read_unicode_set_char(text, end)
+                codepoints.append(codepoint)
+            if end >= len(text):
+                raise ValueError("Unterminated string in UnicodeSet: {}".format(text))
+            if dash:
+                raise ValueError("A range can't end with a string in UnicodeSet: {}".format(text))
+            string = "".join(map(chr, codepoints))
+            items.append(string if len(codepoints) != 1 else (codepoints[0], codepoints[0]))
+            idx = end + 1
+            continue
+
+        codepoint, idx = read_unicode_set_char(text, idx)
+        if dash:
+            first = items[-1][0]
+            if codepoint < first:
+                raise ValueError("Range {:04X}-{:04X} is reversed in UnicodeSet: {}".format(first, codepoint, text))
+            items[-1] = (first, codepoint)
+            dash = False
+        else:
+            items.append((codepoint, codepoint))
+    if depth or dash:
+        raise ValueError("Unterminated UnicodeSet: {}".format(text))
+    return items
+
+
+def unicode_set_strings(text):
+    """Expands a UnicodeSet into its characters and strings
 
     Args:
-        text (str): Raw exemplar string. Eg: "a b c \\u0041"
+        text (str): The UnicodeSet. Eg: "[a-c {aa}]"
 
     Returns:
-        [type]: Converted exemplar string: Eg: "a b c A"
+        list: The distinct characters and strings, in the order of the set. Eg: ["a", "b", "c", "aa"]
     """
-    uni_chars = re.findall(r"\\u([0-9A-F]+)", text)
-    for uni_char in uni_chars:
-        text = text.replace("\\u" + uni_char, chr(int(uni_char, 16)))
-    return text
+    strings = []
+    for item in parse_unicode_set(text):
+        if isinstance(item, str):
+            strings.append(item)
+        else:
+            strings.extend(map(chr, range(item[0], item[1] + 1)))
+    return list(dict.fromkeys(strings))
 
 
 def get_xml_tag_attrib(xmltree, tagname, attribute):
@@ -101,44 +196,100 @@ def get_xml_tag_dict(xml_tree, tag, attribute):
     return tag_dict
 
 
-def get_exemplar_char(url):
+def _parse_locales(archive, names):
+    """Worker: parses the exemplars of a shard of locale files
+
+    Args:
+        archive (str): Path of the local zip-file
+        names (list): Names of the locale files inside the zip-file
+
+    Returns:
+        list: (name, lang_terr, exemplar) tuples in the order of names. Eg: [("common/main/da_DK.xml", "da_DK", {...})]
+    """
+    locales = []
+    with ZipFile(archive) as zf:
+        for name in names:
+            xmltree = ET.fromstring(zf.read(name).decode("utf-8"))
+            language = get_xml_tag_attrib(xmltree, "identity/language", "type")
+            territory = get_xml_tag_attrib(xmltree, "identity/territory", "type")
+            lang_terr = language + "_" + territory if language and territory else language
+            exemplar = get_language_exemplar_char(xmltree, lang_terr)
+            locales.append((name, lang_terr, exemplar))
+    return locales
+
+
+def parse_locales(archive, names, max_workers=None):
+    """Parses the exemplars of locale files in parallel worker processes
+
+    Args:
+        archive (str): Path of the local zip-file
+        names (list): Names of the locale files inside the zip-file
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        list: (name, lang_terr, exemplar) tuples in the order of names
+    """
+    if not names:
+        return []
+    shards = [names[idx : idx + LOCALE_SHARD_SIZE] for idx in range(0, len(names), LOCALE_SHARD_SIZE)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_parse_locales, [archive] * len(shards), shards)
+        return [locale for locales in results for locale in locales]
+
+
+def locale_hashes(archive):
+    """Gets the content hash of every locale file in the zip-file
+
+    Args:
+        archive (str): Path of the local zip-file
+
+    Returns:
+        dict: {name: hash}, sorted by name. Eg: {"common/main/da.xml": "9f2c...", ...}
+    """
+    with ZipFile(archive) as zf:
+        names = sorted(name for name in zf.namelist() if name.startswith(LOCALE_DIR) and name.endswith(".xml"))
+        return {name: content_hash(zf.read(name)) for name in names}
+
+
+def get_exemplar_char(url, max_workers=None, cache_dir=None):
     """Builds a complete database of exemplars. It's ordered by Language->Group->Characters
+    The locale files are parsed in parallel worker processes. The result is the same for any number of workers,
+    because the locales are merged in the order of their filenames.
 
     Args:
-        url (str): URL of the zip-file that contains all xml-language definitions
+        url (str): URL or local path of the zip-file that contains all xml-language definitions
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache_dir (str, optional): Folder for downloaded archives. See "build_cache.fetch_archive"
 
     Returns:
         dict: Eg: {"da": {"Numbers": "[0 1 2]", "Auxilary":". ,"}, "en"... }
     """
+    archive = fetch_archive(url, cache_dir)
     exemplar_char = {}
-    for xmltree in raw_url_xml(url, "main", ".xml"):
-        language = get_xml_tag_attrib(xmltree, "identity/language", "type")
-        territory = get_xml_tag_attrib(xmltree, "identity/territory", "type")
-        exemplar = get_language_exemplar_char(xmltree)
-        lang_terr = language + "_" + territory if language and territory else language
-
+    for name, lang_terr, exemplar in parse_locales(archive, list(locale_hashes(archive)), max_workers):
         exemplar_char[lang_terr] = exemplar
     return exemplar_char
 
 
-def get_language_exemplar_char(xmltree):
-    """Gets the exemplar from one country
+def get_language_exemplar_char(xmltree, lang_terr=None):
+    """Gets the exemplar from one country. An exemplar set that can't be parsed is logged and skipped,
+    so one odd set doesn't stop the build of the other sets and locales
 
     Args:
         xmltree (xml.etree.ElementTree): The XML tree for a certain language
+        lang_terr (str, optional): Name of the locale, for the log. Eg: "da_DK"
 
     Returns:
-        dict: Eg: {"Numbers": "[0 1 2]", "Auxilary":". ,"}
+        dict: Eg: {"numbers": ["0", "1", "2"], "auxiliary": [".", ","]}
     """
     exemplars = {}
 
     for x in xmltree.iter("exemplarCharacters"):
         exemplar_name = x.attrib.get("type", "main")
-        exemplar_raw = x.text[1:-1]
-        exemplar_unicode = exemplar_unicodes_convert(exemplar_raw)
-        exemplar = exemplar_unescape(exemplar_unicode)
-
-        exemplars[exemplar_name] = exemplar.split(" ")
+        try:
+            exemplars[exemplar_name] = unicode_set_strings(x.text or "")
+        except ValueError as error:  # The message has the offending token
+            logger.warning("Skipped the %s exemplars of %s: %s", exemplar_name, lang_terr, error)
     return exemplars
 
 
@@ -154,23 +305,137 @@ def get_char_exemplar(expemplar_char):
     exemplars = {}
     for lang_terr, groups in expemplar_char.items():
         for group in groups:
-            for char in exemplar_char[lang_terr][group]:
+            for char in groups[group]:
                 exemplars.setdefault(char, {})
                 exemplars[char].setdefault(group, [])
                 exemplars[char][group].append(lang_terr)
     return exemplars
 
 
-def get_lang_terr(url):
+def _remove_locale(char_exemplar, lang_terr, exemplar):
+    """Removes a locale from the inverted database "get_char_exemplar". Chars and groups that end up empty are removed
+
+    Args:
+        char_exemplar (dict): The inverted database. Is changed in place
+        lang_terr (str): The locale. Eg: "da_DK"
+        exemplar (dict): The exemplars the locale had. Eg: {"main": ["a", "b"]}
+    """
+    for group, chars in exemplar.items():
+        for char in chars:
+            char_groups = char_exemplar.get(char, {})
+            if lang_terr in char_groups.get(group, []):
+                char_groups[group] = [other for other in char_groups[group] if other != lang_terr]
+                if not char_groups[group]:
+                    del char_groups[group]
+                if not char_groups:
+                    del char_exemplar[char]
+
+
+def _insert_locale(char_exemplar, lang_terr, exemplar, positions):
+    """Adds a locale to the inverted database "get_char_exemplar". The locale lists stay in locale order,
+    so the result is the same as building the inverted database from scratch.
+
+    Args:
+        char_exemplar (dict): The inverted database. Is changed in place
+        lang_terr (str): The locale. Eg: "da_DK"
+        exemplar (dict): The exemplars of the locale. Eg: {"main": ["a", "b"]}
+        positions (dict): Position of every locale in the exemplar database. Eg: {"da": 0, "da_DK": 1}
+    """
+    position = positions[lang_terr]
+    for group, chars in exemplar.items():
+        for char in chars:
+            lang_terrs = char_exemplar.setdefault(char, {}).setdefault(group, [])
+            idx = len(lang_terrs)
+            while idx and positions[lang_terrs[idx - 1]] > position:
+                idx -= 1
+            lang_terrs.insert(idx, lang_terr)
+
+
+def update_exemplars(
+    exemplar_char, char_exemplar, archive, hashes, previous_hashes, previous_locales, max_workers=None
+):
+    """Brings an exemplar database up to date with a new archive. Only the locale files whose hash changed are parsed,
+    and the inverted database is patched in place, instead of rebuilding it with "get_char_exemplar".
+
+    Args:
+        exemplar_char (dict): The previous exemplar database, see "get_exemplar_char"
+        char_exemplar (dict): The previous inverted database, see "get_char_exemplar". Is changed in place
+        archive (str): Path of the local zip-file
+        hashes (dict): Hashes of the locale files in the archive, see "locale_hashes"
+        previous_hashes (dict): Hashes of the locale files the previous databases were built from
+        previous_locales (dict): The locale of every previous locale file. Eg: {"common/main/da_DK.xml": "da_DK"}
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        (dict, dict): The new exemplar database, and the locale of every locale file in the archive
+    """
+    names = sorted(hashes)
+    changed = [name for name in names if previous_hashes.get(name) != hashes[name]]
+    removed = [name for name in previous_hashes if name not in hashes]
+    parsed = {name: (lang_terr, exemplar) for name, lang_terr, exemplar in parse_locales(archive, changed, max_workers)}
+    locales = {name: parsed[name][0] if name in parsed else previous_locales[name] for name in names}
+
+    # Several files can have the same locale, and then the last one wins. So the unchanged files of an affected
+    # locale are parsed too
+    affected = {previous_locales[name] for name in changed + removed if name in previous_locales}
+    affected.update(lang_terr for lang_terr, exemplar in parsed.values())
+    unchanged = [name for name in names if locales[name] in affected and name not in parsed]
+    for name, lang_terr, exemplar in parse_locales(archive, unchanged, max_workers):
+        parsed[name] = (lang_terr, exemplar)
+    new_exemplars = {}
+    for name in names:
+        if name in parsed:
+            new_exemplars[parsed[name][0]] = parsed[name][1]
+
+    order = list(dict.fromkeys(locales[name] for name in names))  # Locales in the order of their first file
+    positions = {lang_terr: idx for idx, lang_terr in enumerate(order)}
+    for lang_terr in sorted(affected):
+        _remove_locale(char_exemplar, lang_terr, exemplar_char.get(lang_terr, {}))
+    for lang_terr in sorted(affected):
+        if lang_terr in new_exemplars:
+            _insert_locale(char_exemplar, lang_terr, new_exemplars[lang_terr], positions)
+
+    exemplar_char = {
+        lang_terr: new_exemplars[lang_terr] if lang_terr in affected else exemplar_char[lang_terr]
+        for lang_terr in order
+    }
+    return exemplar_char, locales
+
+
+def get_char_locales(exemplar_char):
+    """Builds a bitset database of exemplars. Every locale gets a dense ID (its position in the sorted list of
+    locales), and for each character and exemplar group there is an integer with the bits of the locales set.
+    This makes membership tests O(1), and intersecting the locales of many characters a bitwise AND.
+
+    Args:
+        exemplar_char (dict): Takes the format generated in method "get_exemplar_char"
+
+    Returns:
+        dict: Eg: {"locales": ["da", "en"], "chars": {"a": {"main": 3}, "å": {"main": 1}}}
+    """
+    locales = sorted(exemplar_char)
+    chars = {}
+    for locale_id, lang_terr in enumerate(locales):
+        for group, group_chars in exemplar_char[lang_terr].items():
+            for char in group_chars:
+                chars.setdefault(char, {})
+                chars[char].setdefault(group, 0)
+                chars[char][group] |= 1 << locale_id
+    return {"locales": locales, "chars": chars}
+
+
+def get_lang_terr(url, cache_dir=None):
     """Creates a database of languages and territories, based on "common/main/en.xml".
 
     Args:
-        url (str): UTL of the zipfile that contains language definitions
+        url (str): URL or local path of the zipfile that contains language definitions
+        cache_dir (str, optional): Folder for downloaded archives. See "build_cache.fetch_archive"
 
     Returns:
         dict: Final database dict : {"language": {"da": "Danish"...}, "territory": {"DK": "Denmark"...}}
     """
-    xml_tree = next(raw_url_xml(url, "main", "en.xml"))
+    with ZipFile(fetch_archive(url, cache_dir)) as zf:
+        xml_tree = ET.fromstring(zf.read(LOCALE_DIR + "en.xml").decode("utf-8"))
     language = get_xml_tag_dict(xml_tree, "localeDisplayNames/languages", "type")
     territory = get_xml_tag_dict(xml_tree, "localeDisplayNames/territories", "type")
     return {"language": language, "territory": territory}
@@ -187,16 +452,84 @@ def save_json(filename, data):
         json.dump(data, fp)
 
 
+def load_json(filename):
+    """Loads a json file from disk
+
+    Args:
+        filename (str): Filename of the json file
+
+    Returns:
+        dict|list: The loaded object
+    """
+    with open(filename, mode="r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def build_cldr_dbs(source, db_dir, max_workers=None, cache_dir=None):
+    """Builds the CLDR databases that are out of date. The content hash of every locale file is kept in the
+    build manifest of the db-folder. When a new archive only changes some locales, only those are parsed,
+    and the inverted exemplar database is patched instead of being rebuilt.
+
+    Args:
+        source (str): URL or local path of core.zip
+        db_dir (str): Folder of the databases. Eg: "unilyze/db"
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache_dir (str, optional): Folder for downloaded archives. See "build_cache.fetch_archive"
+    """
+    archive = fetch_archive(source, cache_dir)
+    manifest = BuildManifest(db_dir)
+    hashes = locale_hashes(archive)
+    exemplar_file = os.path.join(db_dir, EXEMPLAR_CHAR_DB)
+    char_exemplar_file = os.path.join(db_dir, CHAR_EXEMPLAR_DB)
+
+    exemplar_char = None
+    if not manifest.is_current(EXEMPLAR_CHAR_DB, hashes):
+        if manifest.is_current(EXEMPLAR_CHAR_DB) and manifest.is_current(
+            CHAR_EXEMPLAR_DB, {EXEMPLAR_CHAR_DB: file_hash(exemplar_file)}
+        ):  # Both databases are intact, so they can be patched
+            char_exemplar = load_json(char_exemplar_file)
+            exemplar_char, locales = update_exemplars(
+                load_json(exemplar_file),
+                char_exemplar,
+                archive,
+                hashes,
+                manifest.inputs(EXEMPLAR_CHAR_DB),
+                manifest.meta(EXEMPLAR_CHAR_DB)["locales"],
+                max_workers,
+            )
+        else:
+            exemplar_char, locales, char_exemplar = {}, {}, None
+            for name, lang_terr, exemplar in parse_locales(archive, list(hashes), max_workers):
+                exemplar_char[lang_terr] = exemplar
+                locales[name] = lang_terr
+        save_json(exemplar_file, exemplar_char)
+        manifest.record(EXEMPLAR_CHAR_DB, hashes, {"locales": locales})
+        if char_exemplar is not None:
+            save_json(char_exemplar_file, char_exemplar)
+            manifest.record(CHAR_EXEMPLAR_DB, {EXEMPLAR_CHAR_DB: file_hash(exemplar_file)})
+
+    # The databases derived from the exemplar database are rebuilt when it has changed
+    derived_inputs = {EXEMPLAR_CHAR_DB: file_hash(exemplar_file)}
+    for output, builder in ((CHAR_EXEMPLAR_DB, get_char_exemplar), (CHAR_LOCALES_DB, get_char_locales)):
+        if not manifest.is_current(output, derived_inputs):
+            if exemplar_char is None:
+                exemplar_char = load_json(exemplar_file)
+            save_json(os.path.join(db_dir, output), builder(exemplar_char))
+            manifest.record(output, derived_inputs)
+
+    lang_terr_inputs = {LOCALE_DIR + "en.xml": hashes[LOCALE_DIR + "en.xml"]}
+    if not manifest.is_current(LANG_TERR_DB, lang_terr_inputs):
+        save_json(os.path.join(db_dir, LANG_TERR_DB), get_lang_terr(archive))
+        manifest.record(LANG_TERR_DB, lang_terr_inputs)
+
+    manifest.save()
+
+
 if __name__ == "__main__":
     """Creates all the ready CLDR-json that this entire module needs.
-    All the files are stored in the db-folder.
+    All the files are stored in the db-folder. Databases whose inputs haven't changed since the last build are skipped.
     This is done before distribution af the package
+    Run it from the project root with "python -m unilyze.create_cldr_dbs [core.zip]"
+    The optional argument is a local path or URL of core.zip. Downloads are cached in the temp folder.
     """
-    exemplar_char = get_exemplar_char("http://unicode.org/Public/cldr/37/core.zip")
-    save_json("unilyze/db/cldr_exemplar_char.json", exemplar_char)
-
-    char_exemplar = get_char_exemplar(exemplar_char)
-    save_json("unilyze/db/cldr_char_exemplar.json", char_exemplar)
-
-    lang_terr = get_lang_terr("http://unicode.org/Public/cldr/37/core.zip")
-    save_json("unilyze/db/cldr_language_territory.json", lang_terr)
+    build_cldr_dbs(sys.argv[1] if len(sys.argv) > 1 else CLDR_CORE_URL, "unilyze/db")
@@ -1,38 +1,65 @@
+import os
 import re
+import sys
 import json
+from contextlib import contextmanager
 from zipfile import ZipFile
 import urllib.request
-from io import BytesIO
 import xml.etree.ElementTree as ET
+from unilyze.ucd_binary import BinaryWriter, UcdBinary, save_decoded_binary
+from unilyze.ucd_translate import UcdTranslator
+from unilyze.build_cache import BuildManifest, content_hash, file_hash, fetch_archive
 
+UCD_NAMESPACE = "{http://www.unicode.org/ns/2003/ucd/1.0}"
+UCD_ZIP_URL = "https://www.unicode.org/Public/UCD/latest/ucdxml/ucd.all.grouped.zip"
+UCD_XML_FILE = "ucd.all.grouped.xml"
+UCD_TEXT_URL = "https://www.unicode.org/Public/UCD/latest/ucd/"
 
-def download_zip(url, filename):
-    """Gets content of a file inside an online zip-file
+# The databases built from the UCD-XML, relative to the db-folder
+CODEPOINT_DBS = ["ucd_codepoints.json", "ucd_codepoints.bin", "ucd_property_index.json"]
+DECODED_DB = "ucd_codepoints_decoded.bin"
+MAPPINGS_DB = "ucd_mappings.json"
+# Hangul syllables are decomposed algorithmically. See chapter 3.12 of the Unicode standard
+HANGUL_S_BASE, HANGUL_L_BASE, HANGUL_V_BASE, HANGUL_T_BASE = 0xAC00, 0x1100, 0x1161, 0x11A7
+HANGUL_V_COUNT, HANGUL_T_COUNT, HANGUL_S_COUNT = 21, 28, 11172
+
+# The databases the decoded database is built from
+DECODED_DB_INPUTS = ["ucd_codepoints.bin", "ucd_property_names.json", "ucd_property_values.json"]
+
+# XML tags that describe code points. Each has either a "cp", or a "first-cp" and "last-cp" attribute
+CODEPOINT_TAGS = ["char", "reserved", "noncharacter", "surrogate"]
+
+# Properties with more distinct values than this (names, mappings, comments...) are left out of the property index
+MAX_INDEXED_VALUES = 2000
+
+
+@contextmanager
+def open_zip_member(source, filename):
+    """Opens a file inside a zip-file as a binary stream. The file is decompressed while it is read.
 
     Args:
-        url (str): URL of the zip-file
+        source (str): Local path of the zip-file. Eg: "ucd.all.grouped.zip"
         filename (str): Filename of the compressed file
 
-    Returns:
-        str: The full content of the file. Is UTF-8 decoded
+    Yields:
+        file: The compressed file, opened for binary reading
     """
-    url = urllib.request.urlopen(url)
-
-    with ZipFile(BytesIO(url.read())) as zf:
-        with zf.open(filename, "r") as fp:
-            data = fp.read()
-        return data.decode("utf-8")
+    with ZipFile(source) as zf, zf.open(filename, "r") as fp:
+        yield fp
 
 
 def download_text(url):
-    """Gets the content of an online text-file
+    """Gets the content of an online or local text-file
 
     Args:
-        url (str): URL of the text-file
+        url (str): URL or local path of the text-file
 
     Returns:
         str: The full content of the file. Is UTF-8 decoded
     """
+    if "://" not in url:
+        with open(url, mode="r", encoding="utf-8") as fp:
+            return fp.read()
     url = urllib.request.urlopen(url)
     data = url.read()
     return data.decode("utf-8")
@@ -49,34 +76,141 @@ def save_json(filename, data):
         json.dump(data, fp)
 
 
-def get_ucd_db(xmldata):
-    """Creates an unicode dictionary database that is ready for the entire module.
+def iter_ucd_db(fp):
+    """Streams the groups and code points out of the UCD-XML. Elements are cleared as soon as they are processed,
+    so memory use doesn't grow with the size of the XML.
 
     Args:
-        xmldata (str): Raw utf-8 encoded XML data the should be processed
-
-    Returns:
-        Dict: {
-                groups: {"1": {properties}, "2": {properties}},
-                chars: {"A": {"group": 1, properties}, "B": {"group": 1, properties}}
-               }
+        fp (file): The UCD-XML, opened for binary reading
+
+    Yields:
+        tuple: One of
+               ("group", group, {properties})
+               ("char", "A", {"group": group, properties}) for chars with their own code point
+               ("range", first codepoint, last codepoint, group, {properties}) for all other code points
+               Groups are numbered "0", "1", ... in document order, and come before their code points.
+    """
+    group_tag = UCD_NAMESPACE + "group"
+    codepoint_tags = [UCD_NAMESPACE + tag for tag in CODEPOINT_TAGS]
+
+    group = None
+    group_count = 0
+    for event, element in ET.iterparse(fp, events=("start", "end")):
+        if event == "start":
+            if element.tag == group_tag:  # The attributes are complete at the start, the code points follow
+                group = str(group_count)
+                group_count += 1
+                yield "group", group, dict(element.attrib)
+            continue
+
+        if element.tag == group_tag:
+            group = None
+            element.clear()  # Drops the already processed code points of the group
+        elif element.tag in codepoint_tags and group is not None:
+            attrib = dict(element.attrib)
+            element.clear()
+            if element.tag == codepoint_tags[0] and attrib.get("cp"):  # A char with its own code point
+                unicode = chr(int(attrib.pop("cp"), 16))
+                attrib["group"] = group  # save a reference inside each char, what group we belong to
+                yield "char", unicode, attrib
+            elif attrib.get("cp"):  # A single reserved, noncharacter or surrogate code point
+                codepoint = int(attrib.pop("cp"), 16)
+                yield "range", codepoint, codepoint, group, attrib
+            else:  # A range of code points sharing the same properties
+                first = int(attrib.pop("first-cp"), 16)
+                last = int(attrib.pop("last-cp"), 16)
+                yield "range", first, last, group, attrib
+
+
+class PropertyIndexBuilder:
+    """Builds the inverted index from each property value to the code points that have it, one char or range
+    at a time. The code points are stored as sorted ranges, so eg. all of "gc=Lo" is a few hundred ranges.
+    Code points must be added in ascending order.
     """
-    tree = ET.fromstring(xmldata,)
 
-    namespace = {"ucd": "http://www.unicode.org/ns/2003/ucd/1.0"}
+    def __init__(self):
+        self.__index = {}
+
+    def add(self, first, last, info):
+        """
+        Args:
+            first (int): First code point
+            last (int): Last code point (inclusive)
+            info (dict): All properties of the code points, with the group properties merged in
+        """
+        for property, property_value in info.items():
+            if property == "group":
+                continue
+            ranges = self.__index.setdefault(property, {}).setdefault(property_value, [])
+            if ranges and ranges[-1] + 1 == first:  # Extend the previous range, when the code points are adjacent
+                ranges[-1] = last
+            else:
+                ranges.extend((first, last))
+
+    def result(self, max_values=MAX_INDEXED_VALUES):
+        """
+        Args:
+            max_values (int, optional): Properties with more distinct values are not indexed.
+
+        Returns:
+            dict: {"gc": {"Lu": [65, 90, 192, 214, ...]}} - each list holds flat pairs of first and last code point
+        """
+        return {property: values for property, values in self.__index.items() if len(values) <= max_values}
 
-    chars = {}
-    groups = {}
 
-    for idx, group in enumerate(tree.findall(".//ucd:group", namespace)):  # Enumerate all group-tags in XML
-        groups[str(idx)] = group.attrib  # Store attributes for the group
-        for char in group.findall(".//ucd:char", namespace):  # Inside a group enumerate all unicode chars.
-            if char.attrib.get("cp"):  # There are some reserved areas that doesn't have assigned unicode.
-                unicode = chr(int(char.attrib.pop("cp"), 16))
-                char.attrib["group"] = str(idx)  # save a reference inside each char, what group we belong to
-                chars[unicode] = char.attrib
+def build_codepoint_dbs(source, db_dir):
+    """Builds the codepoint databases in a single streaming pass over the UCD-XML:
+    ucd_codepoints.json, ucd_codepoints.bin and ucd_property_index.json.
+    The chars of the json database are written to disk as they are parsed. Only groups, ranges, the interned
+    binary tables and the property index are kept in memory, which are all small.
+    The databases are written to ".part" files, that replace the databases only when the whole pass has succeeded.
 
-    return {"groups": groups, "chars": chars}
+    Args:
+        source (str): Local path of ucd.all.grouped.zip. "build_ucd_dbs" downloads it with "fetch_archive"
+        db_dir (str): Folder of the databases. Eg: "unilyze/db"
+    """
+    binary = BinaryWriter()
+    index = PropertyIndexBuilder()
+    groups = {}
+    ranges = []
+    parts = {output: db_dir + "/" + output + ".part" for output in CODEPOINT_DBS}
+
+    try:
+        with open_zip_member(source, UCD_XML_FILE) as xml_fp, open(
+            parts["ucd_codepoints.json"], mode="w", encoding="utf-8"
+        ) as fp:
+            fp.write('{"chars": {')
+            separator = ""
+            for kind, *entry in iter_ucd_db(xml_fp):
+                if kind == "group":
+                    group, group_info = entry
+                    groups[group] = group_info
+                    binary.add_group(group, group_info)
+                elif kind == "char":
+                    unicode, char_info = entry
+                    fp.write(separator + json.dumps(unicode) + ": " + json.dumps(char_info))
+                    separator = ", "
+                    binary.add_char(unicode, char_info)
+                    index.add(ord(unicode), ord(unicode), {**groups[char_info["group"]], **char_info})
+                else:
+                    first, last, group, range_info = entry
+                    ranges.append(entry)
+                    binary.add_range(first, last, group, range_info)
+                    index.add(first, last, {**groups[group], **range_info})
+
+            ranges.sort(key=lambda r: r[0])
+            fp.write('}, "groups": ' + json.dumps(groups) + ', "ranges": ' + json.dumps(ranges) + "}")
+
+        binary.save(parts["ucd_codepoints.bin"])
+        save_json(parts["ucd_property_index.json"], index.result())
+    except BaseException:  # Bad XML or an interrupted build leaves the databases as they were
+        for part in parts.values():
+            if os.path.exists(part):
+                os.remove(part)
+        raise
+
+    for output, part in parts.items():
+        os.replace(part, db_dir + "/" + output)
 
 
 def get_property_names(textdata):
@@ -133,21 +267,151 @@ def get_property_values(textdata):
     return property_values
 
 
+def build_decoded_db(db_dir):
+    """Builds the decoded codepoint database from the binary codepoint database and the property name and value
+    databases in the db-folder. All values are translated up front, so lookups don't need to translate anything.
+    See "ucd_binary.DecodedUcdBinary"
+
+    Args:
+        db_dir (str): Folder of the databases. Eg: "unilyze/db"
+    """
+    with open(db_dir + "/ucd_property_names.json", mode="r", encoding="utf-8") as fp:
+        property_names = json.load(fp)
+    with open(db_dir + "/ucd_property_values.json", mode="r", encoding="utf-8") as fp:
+        property_values = json.load(fp)
+    translator = UcdTranslator(property_names, property_values)
+    save_decoded_binary(db_dir + "/" + DECODED_DB, UcdBinary(db_dir + "/ucd_codepoints.bin"), translator.translate_info)
+
+
+def hangul_decomposition(codepoint):
+    """Decomposes a precomposed Hangul syllable into its jamo
+
+    Args:
+        codepoint (int): Codepoint of the syllable. Eg: 0xD4DB
+
+    Returns:
+        str: The jamo. Eg: "\u1111\u1171\u11B6"
+    """
+    s_index = codepoint - HANGUL_S_BASE
+    l_part = chr(HANGUL_L_BASE + s_index // (HANGUL_V_COUNT * HANGUL_T_COUNT))
+    v_part = chr(HANGUL_V_BASE + s_index % (HANGUL_V_COUNT * HANGUL_T_COUNT) // HANGUL_T_COUNT)
+    t_index = s_index % HANGUL_T_COUNT
+    return l_part + v_part + (chr(HANGUL_T_BASE + t_index) if t_index else "")
+
+
+def get_mapping_tables(database):
+    """Creates the tables for the string-level case mappings and decompositions of Unichar.
+    The decompositions are fully recursive, so a single lookup per character is enough.
+
+    Args:
+        database (UcdBinary): The binary codepoint database
+
+    Returns:
+        dict: {"uc": {"97": "A", "223": "SS", ...}, "lc": {...}, "cf": {...},
+               "canonical": {"196": "A\u0308", ...}, "compatibility": {...}, "ccc": {"768": 230, ...}}
+               Keys are codepoints. Characters that map to themselves, or have combining class 0, are left out.
+    """
+    tables = {"uc": {}, "lc": {}, "cf": {}}
+    decompositions = {}  # codepoint -> (decomposition type, one level decomposition)
+    combining_classes = {}
+    mapped_records = {}
+    for kind, first, last, group_record, override_record in database.entries():
+        mappings = mapped_records.get((group_record, override_record))
+        if mappings is None:  # The mappings of each distinct pair of records are only parsed once
+            info = {**database.record(group_record), **database.record(override_record)}
+            mappings = {
+                property: "".join(chr(int(codepoint_hex, 16)) for codepoint_hex in info[property].split())
+                for property in list(tables) + ["dm"]
+                if info.get(property, "#") != "#"  # "#" means the character maps to itself
+            }
+            if info.get("dt", "none") == "none":
+                mappings.pop("dm", None)
+            mapped_records[(group_record, override_record)] = (mappings, info.get("dt"), int(info.get("ccc", "0")))
+        mappings, decomposition_type, combining_class = mapped_records[(group_record, override_record)]
+        if not mappings and not combining_class:
+            continue
+
+        for codepoint in range(first, last + 1):
+            for property, table in tables.items():
+                if mappings.get(property, chr(codepoint)) != chr(codepoint):
+                    table[str(codepoint)] = mappings[property]
+            if "dm" in mappings:
+                decompositions[codepoint] = (decomposition_type, [ord(mapped) for mapped in mappings["dm"]])
+            if combining_class:
+                combining_classes[str(codepoint)] = combining_class
+
+    def decompose(codepoint, compatibility):
+        if HANGUL_S_BASE <= codepoint < HANGUL_S_BASE + HANGUL_S_COUNT:
+            return hangul_decomposition(codepoint)
+        decomposition_type, mapping = decompositions.get(codepoint, ("none", None))
+        if mapping is None or (decomposition_type != "can" and not compatibility):
+            return chr(codepoint)
+        return "".join(decompose(mapped, compatibility) for mapped in mapping)
+
+    codepoints = sorted(set(decompositions) | set(range(HANGUL_S_BASE, HANGUL_S_BASE + HANGUL_S_COUNT)))
+    for name, compatibility in (("canonical", False), ("compatibility", True)):
+        tables[name] = {}
+        for codepoint in codepoints:
+            decomposed = decompose(codepoint, compatibility)
+            if decomposed != chr(codepoint):
+                tables[name][str(codepoint)] = decomposed
+    tables["ccc"] = combining_classes
+    return tables
+
+
+def build_ucd_dbs(ucd_zip, property_aliases, property_value_aliases, db_dir, cache_dir=None):
+    """Builds the UCD databases that are out of date. The content hashes of the inputs are kept in the
+    build manifest of the db-folder, and a database is only rebuilt when one of its inputs has changed.
+
+    Args:
+        ucd_zip (str): URL or local path of ucd.all.grouped.zip
+        property_aliases (str): URL or local path of PropertyAliases.txt
+        property_value_aliases (str): URL or local path of PropertyValueAliases.txt
+        db_dir (str): Folder of the databases. Eg: "unilyze/db"
+        cache_dir (str, optional): Folder for downloaded archives. See "build_cache.fetch_archive"
+    """
+    manifest = BuildManifest(db_dir)
+
+    ucd_zip = fetch_archive(ucd_zip, cache_dir)
+    inputs = {"ucd.all.grouped.zip": file_hash(ucd_zip)}
+    if not all(manifest.is_current(output, inputs) for output in CODEPOINT_DBS):
+        build_codepoint_dbs(ucd_zip, db_dir)
+        for output in CODEPOINT_DBS:
+            manifest.record(output, inputs)
+
+    for source, output, builder in (
+        (property_aliases, "ucd_property_names.json", get_property_names),
+        (property_value_aliases, "ucd_property_values.json", get_property_values),
+    ):
+        textdata = download_text(source)
+        inputs = {source.rsplit("/", 1)[-1]: content_hash(textdata)}
+        if not manifest.is_current(output, inputs):
+            save_json(db_dir + "/" + output, builder(textdata))
+            manifest.record(output, inputs)
+
+    inputs = {output: file_hash(db_dir + "/" + output) for output in DECODED_DB_INPUTS}
+    if not manifest.is_current(DECODED_DB, inputs):
+        build_decoded_db(db_dir)
+        manifest.record(DECODED_DB, inputs)
+
+    inputs = {"ucd_codepoints.bin": file_hash(db_dir + "/ucd_codepoints.bin")}
+    if not manifest.is_current(MAPPINGS_DB, inputs):
+        save_json(db_dir + "/" + MAPPINGS_DB, get_mapping_tables(UcdBinary(db_dir + "/ucd_codepoints.bin")))
+        manifest.record(MAPPINGS_DB, inputs)
+
+    manifest.save()
+
+
 if __name__ == "__main__":
     """Creates all the ready UCD-json that this entire module needs.
-    All the files are stored in the db-folder.
-    This is done before distribution af the package
+    All the files are stored in the db-folder. Databases whose inputs haven't changed since the last build are skipped.
+    This is done before distribution af the package.
+    Run it from the project root with "python -m unilyze.create_ucd_dbs"
+    To build offline, pass a folder that has ucd.all.grouped.zip, PropertyAliases.txt and PropertyValueAliases.txt:
+    "python -m unilyze.create_ucd_dbs path/to/ucd"
     """
-    xmldata = download_zip(
-        "https://www.unicode.org/Public/UCD/latest/ucdxml/ucd.all.grouped.zip", "ucd.all.grouped.xml"
-    )
-    data = get_ucd_db(xmldata)
-    save_json("unilyze/db/ucd_codepoints.json", data)
-
-    textdata = download_text("https://www.unicode.org/Public/UCD/latest/ucd/PropertyAliases.txt")
-    data = get_property_names(textdata)
-    save_json("unilyze/db/ucd_property_names.json", data)
-
-    textdata = download_text("https://www.unicode.org/Public/UCD/latest/ucd/PropertyValueAliases.txt")
-    data = get_property_values(textdata)
-    save_json("unilyze/db/ucd_property_values.json", data)
+    if len(sys.argv) > 1:
+        ucd_zip, text_dir = sys.argv[1] + "/ucd.all.grouped.zip", sys.argv[1] + "/"
+    else:
+        ucd_zip, text_dir = UCD_ZIP_URL, UCD_TEXT_URL
+    build_ucd_dbs(ucd_zip, text_dir + "PropertyAliases.txt", text_dir + "PropertyValueAliases.txt", "unilyze/db")
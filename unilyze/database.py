@@ -0,0 +1,81 @@
+import time
+import threading
+
+CODEPOINT_COUNT = 0x110000  # Codepoints in Unicode, U+0000 to U+10FFFF. The size of tables indexed by codepoint
+
+# Process wide registry of loaded databases, shared by all Unichar and Unistat instances. Keyed by filename.
+_databases = {}
+_locks = {}
+_load_seconds = {}  # Filename -> seconds its loader took
+_registry_lock = threading.Lock()
+
+
+def get_database(filename, loader):
+    """Gets a database from the registry. The first caller loads it, everybody else reuses the loaded object.
+    Loading is thread-safe: concurrent callers of the same file wait for one load, while different files
+    can be loaded at the same time.
+
+    Args:
+        filename (str): Filename of the database, relative to the package. Eg: "db/ucd_codepoints.json"
+        loader (callable): Function that takes the filename and returns the loaded database
+
+    Returns:
+        object: The loaded database
+    """
+    database = _databases.get(filename)
+    if database is not None:
+        return database
+
+    with _registry_lock:
+        lock = _locks.setdefault(filename, threading.Lock())
+    with lock:
+        database = _databases.get(filename)
+        if database is None:
+            start = time.perf_counter()
+            database = loader(filename)
+            _load_seconds[filename] = time.perf_counter() - start
+            _databases[filename] = database
+    return database
+
+
+def loaded_databases():
+    """Gets the filenames of the databases that have been loaded so far
+
+    Returns:
+        list: Eg: ["db/cldr_language_territory.json", "db/cldr_char_exemplar.json"]
+    """
+    return list(_databases)
+
+
+def load_times():
+    """Gets how long each database took to load
+
+    Returns:
+        dict: Filename -> seconds. Eg: {"db/ucd_codepoints.bin": 0.002}
+    """
+    return dict(_load_seconds)
+
+
+class shared_database:
+    """Class attribute that loads a database from the registry the first time it is read.
+    After that the database is cached on the instance, so later reads are plain attribute lookups.
+    """
+
+    def __init__(self, filename, loader):
+        """
+        Args:
+            filename (str): Filename of the database, relative to the package
+            loader (callable): Function that takes the filename and returns the loaded database
+        """
+        self.filename = filename
+        self.loader = loader
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        database = get_database(self.filename, self.loader)
+        instance.__dict__[self.name] = database
+        return database
@@ -0,0 +1,167 @@
+"""Opt-in timing of the public methods of Unichar and Unistat. See Unichar.enable_instrumentation.
+Instances that aren't instrumented run the plain methods, so there is no overhead until it is enabled.
+"""
+import time
+import logging
+import threading
+from functools import wraps
+
+LATENCY_SAMPLES = 1000  # Latencies kept per method for the percentiles. The most recent calls
+PERCENTILES = (0.5, 0.9, 0.99)
+
+logger = logging.getLogger(__name__)
+
+
+def text_length(value):
+    """
+    Args:
+        value (object): The first argument of a method. Eg: a text, a character or a list of codepoints
+
+    Returns:
+        int: Number of characters in it, 0 if it has no length
+    """
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+class MethodStats:
+    """Counters of one method. Latencies are kept in a ring buffer, so the percentiles are of the recent calls
+    """
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        """
+        Args:
+            samples (int, optional): Number of latencies kept for the percentiles
+        """
+        self.__samples = samples
+        self.reset()
+
+    def reset(self):
+        """Zeroes the counters
+        """
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.chars = 0
+        self.max_seconds = 0.0
+        self.latencies = []
+
+    def record(self, seconds, chars, failed):
+        """
+        Args:
+            seconds (float): Latency of the call
+            chars (int): Characters the call processed
+            failed (bool): If the call raised an exception
+        """
+        if len(self.latencies) < self.__samples:
+            self.latencies.append(seconds)
+        else:
+            self.latencies[self.calls % self.__samples] = seconds
+        self.calls += 1
+        self.errors += failed
+        self.seconds += seconds
+        self.chars += chars
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def summary(self):
+        """
+        Returns:
+            dict: The counters. Eg: {"calls": 10, "errors": 0, "seconds": 0.01, "chars": 10, "mean": 0.001,
+                  "p50": 0.0008, "p90": 0.001, "p99": 0.004, "max": 0.004}
+        """
+        latencies = sorted(self.latencies)
+        summary = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "seconds": self.seconds,
+            "chars": self.chars,
+            "mean": self.seconds / self.calls if self.calls else 0.0,
+        }
+        for share in PERCENTILES:
+            key = "p{:g}".format(share * 100)
+            summary[key] = latencies[min(len(latencies) - 1, int(share * len(latencies)))] if latencies else 0.0
+        summary["max"] = self.max_seconds
+        return summary
+
+
+class Instrumentation:
+    """Times the public methods of one Unichar or Unistat instance, and hands every call to an optional callback.
+    Only the outermost call is recorded. Eg. "ucd_info_many" is one call, not also a "ucd_info" call per character,
+    so the counters show what the callers of the instance did.
+    """
+
+    def __init__(self, callback=None, samples=LATENCY_SAMPLES):
+        """
+        Args:
+            callback (callable, optional): Called after every timed call with (method, seconds, chars).
+                                           Eg: to export the calls to a metrics system. Exceptions it raises
+                                           are logged, and don't reach the caller of the method.
+            samples (int, optional): Number of latencies kept per method for the percentiles
+        """
+        self.callback = callback
+        self.methods = {}  # Method name -> MethodStats
+        self.__samples = samples
+        self.__lock = threading.Lock()
+        self.__calls = threading.local()  # "depth": number of timed calls in progress in the thread
+
+    def wrap(self, name, method, counts_chars):
+        """Makes a timed version of a method
+
+        Args:
+            name (str): Name of the method in the statistics
+            method (callable): The bound method
+            counts_chars (bool): If the first argument is the text or characters the method processes
+
+        Returns:
+            callable: The timed method
+        """
+        stats = self.methods.setdefault(name, MethodStats(self.__samples))
+        perf_counter = time.perf_counter
+
+        def record(start, args, failed):
+            seconds = perf_counter() - start
+            chars = text_length(args[0]) if counts_chars and args else 0
+            with self.__lock:
+                stats.record(seconds, chars, failed)
+            if self.callback is not None:
+                try:
+                    self.callback(name, seconds, chars)
+                except Exception:  # A failing exporter must not fail the call, or hide its exception
+                    logger.exception("Instrumentation callback failed for %s", name)
+
+        calls = self.__calls
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            if getattr(calls, "depth", 0):  # Called by another timed method, which covers the time
+                return method(*args, **kwargs)
+            calls.depth = 1
+            start = perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                calls.depth = 0
+                record(start, args, True)
+                raise
+            calls.depth = 0
+            record(start, args, False)
+            return result
+
+        return timed
+
+    def summary(self):
+        """
+        Returns:
+            dict: Method name -> MethodStats.summary(), for the methods that have been called
+        """
+        with self.__lock:
+            return {name: stats.summary() for name, stats in sorted(self.methods.items()) if stats.calls}
+
+    def reset(self):
+        """Zeroes the counters of all methods
+        """
+        with self.__lock:
+            for stats in self.methods.values():
+                stats.reset()
@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from unilyze.unistat import Unistat
+
+SHARD_SIZE = 16  # Number of inputs each worker handles per task
+
+
+def _shards(inputs, shard_size):
+    """Splits the inputs into lists of at most shard_size items
+
+    Args:
+        inputs (iterable): The inputs
+        shard_size (int): Maximum number of inputs in a shard
+
+    Yields:
+        list: The next shard
+    """
+    shard = []
+    for item in inputs:
+        shard.append(item)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def _count_files(unistat_class, filenames, encoding, errors):
+    """Worker: counts the characters of a shard of files
+
+    Args:
+        unistat_class (type): Unistat or a subclass
+        filenames (list): Filenames of the text files
+        encoding (str): Encoding of the files
+        errors (str): Error handling of the decoder
+
+    Returns:
+        Unistat: Partial result with only character counts. No databases are loaded in the worker
+    """
+    unistat = unistat_class()
+    for filename in filenames:
+        unistat.add_file(filename, encoding, errors)
+    return unistat
+
+
+def _count_texts(unistat_class, texts):
+    """Worker: counts the characters of a shard of texts
+
+    Args:
+        unistat_class (type): Unistat or a subclass
+        texts (list): The texts
+
+    Returns:
+        Unistat: Partial result with only character counts. No databases are loaded in the worker
+    """
+    unistat = unistat_class()
+    for text in texts:
+        unistat.add_text(text)
+    return unistat
+
+
+def _run(worker, shards, unistat_class, max_workers):
+    """Runs a worker over every shard in a process pool, and merges the partial results in input order
+
+    Args:
+        worker (callable): "_count_files" or "_count_texts"
+        shards (iterable): Argument tuples for the worker, after unistat_class
+        unistat_class (type): Unistat or a subclass
+        max_workers (int): Number of worker processes. None means the number of CPUs
+
+    Returns:
+        Unistat: The merged result
+    """
+    result = unistat_class()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, unistat_class, *shard) for shard in shards]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+def unistat_files(
+    filenames, max_workers=None, shard_size=SHARD_SIZE, encoding="utf-8", errors="strict", unistat_class=Unistat
+):
+    """Counts the characters of many files in parallel worker processes, and merges the counts into one Unistat.
+    The workers only count characters. The expensive "unistat" aggregation is left to the caller, and runs
+    once over the merged set of distinct characters. Workers never load the UCD database.
+
+    Args:
+        filenames (iterable): Filenames of the text files
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        shard_size (int, optional): Number of files each worker handles per task.
+        encoding (str, optional): Encoding of the files. Defaults to "utf-8".
+        errors (str, optional): Error handling of the decoder. Eg: "replace". Defaults to "strict".
+        unistat_class (type, optional): Unistat or a subclass, Eg. NumpyUnistat. Defaults to Unistat.
+
+    Returns:
+        Unistat: An instance of unistat_class with the counts of all files
+    """
+    shards = ((filenames, encoding, errors) for filenames in _shards(filenames, shard_size))
+    return _run(_count_files, shards, unistat_class, max_workers)
+
+
+def unistat_texts(texts, max_workers=None, shard_size=SHARD_SIZE, unistat_class=Unistat):
+    """Counts the characters of many texts in parallel worker processes, and merges the counts into one Unistat.
+
+    Args:
+        texts (iterable): The texts (str)
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        shard_size (int, optional): Number of texts each worker handles per task.
+        unistat_class (type, optional): Unistat or a subclass, Eg. NumpyUnistat. Defaults to Unistat.
+
+    Returns:
+        Unistat: An instance of unistat_class with the counts of all texts
+    """
+    shards = ((texts,) for texts in _shards(texts, shard_size))
+    return _run(_count_texts, shards, unistat_class, max_workers)
@@ -0,0 +1,382 @@
+from unilyze.unichar import UCD_PROPERTY_INDEX_FILE, load_json
+from unilyze.database import get_database, CODEPOINT_COUNT
+
+# Registry names of the compiled segmentation rules
+GRAPHEME_RULES = UCD_PROPERTY_INDEX_FILE + "#grapheme"
+WORD_RULES = UCD_PROPERTY_INDEX_FILE + "#word"
+
+# Actions of the state machine, for the position before the current character
+NO_BREAK = 0
+BREAK = 1
+MAYBE_BREAK = 2  # A break, unless the next character cancels it. Eg. "'" in "can't"
+CANCEL = 3  # No break, and the pending MAYBE_BREAK is cancelled
+
+MAX_SEGMENT_LENGTH = 1 << 16  # Characters a Segmenter holds back at most. A longer segment is cut
+
+# Grapheme_Cluster_Break classes. Extended_Pictographic characters get a class of their own, and so do the
+# Indic_Conjunct_Break (InCB) consonants, linkers and extends of GB9c. UCD versions before 15.1 have no InCB,
+# and then GB9c never applies
+GB_OTHER, GB_CR, GB_LF, GB_CONTROL, GB_EXTEND, GB_ZWJ, GB_RI, GB_PREPEND, GB_SPACINGMARK = range(9)
+GB_L, GB_V, GB_T, GB_LV, GB_LVT, GB_EXTPICT = range(9, 15)
+GB_INCB_CONSONANT, GB_INCB_LINKER, GB_INCB_EXTEND = range(15, 18)
+GB_CLASS_COUNT = 18
+GB_EXTENDS = (GB_EXTEND, GB_INCB_LINKER, GB_INCB_EXTEND)  # Grapheme_Cluster_Break=Extend
+GB_VALUES = {
+    "CR": GB_CR,
+    "LF": GB_LF,
+    "CN": GB_CONTROL,
+    "EX": GB_EXTEND,
+    "ZWJ": GB_ZWJ,
+    "RI": GB_RI,
+    "PP": GB_PREPEND,
+    "SM": GB_SPACINGMARK,
+    "L": GB_L,
+    "V": GB_V,
+    "T": GB_T,
+    "LV": GB_LV,
+    "LVT": GB_LVT,
+}
+# (InCB value, the class it refines, the refined class)
+GB_INCB_VALUES = [
+    ("Consonant", GB_OTHER, GB_INCB_CONSONANT),
+    ("Linker", GB_EXTEND, GB_INCB_LINKER),
+    ("Extend", GB_EXTEND, GB_INCB_EXTEND),
+]
+
+# Word_Break classes. Extended_Pictographic characters get a class of their own
+WB_OTHER, WB_CR, WB_LF, WB_NEWLINE, WB_EXTEND, WB_ZWJ, WB_RI, WB_FORMAT, WB_KATAKANA, WB_HEBREW = range(10)
+WB_ALETTER, WB_SINGLE_QUOTE, WB_DOUBLE_QUOTE, WB_MIDNUMLET, WB_MIDLETTER, WB_MIDNUM = range(10, 16)
+WB_NUMERIC, WB_EXTENDNUMLET, WB_WSEGSPACE, WB_EXTPICT = range(16, 20)
+WB_CLASS_COUNT = 20
+WB_VALUES = {
+    "CR": WB_CR,
+    "LF": WB_LF,
+    "NL": WB_NEWLINE,
+    "Extend": WB_EXTEND,
+    "ZWJ": WB_ZWJ,
+    "RI": WB_RI,
+    "FO": WB_FORMAT,
+    "KA": WB_KATAKANA,
+    "HL": WB_HEBREW,
+    "LE": WB_ALETTER,
+    "SQ": WB_SINGLE_QUOTE,
+    "DQ": WB_DOUBLE_QUOTE,
+    "MB": WB_MIDNUMLET,
+    "ML": WB_MIDLETTER,
+    "MN": WB_MIDNUM,
+    "NU": WB_NUMERIC,
+    "EX": WB_EXTENDNUMLET,
+    "WSegSpace": WB_WSEGSPACE,
+}
+WB_AHLETTER = (WB_ALETTER, WB_HEBREW)
+WB_WORD_START = bytes([WB_ALETTER, WB_HEBREW, WB_NUMERIC, WB_KATAKANA, WB_EXTENDNUMLET])  # Word-like segments
+
+
+def compile_rules(start, transition, class_count):
+    """Compiles segmentation rules into a flat transition table. All states reachable from the start state are
+    numbered, and each entry of the table is (offset of the next state << 2) | action, where the offset of a state
+    is its number times class_count. The state machine then only needs "table[state + class]" per character.
+
+    Args:
+        start (tuple): The state at the start of the text
+        transition (callable): Takes a state and a class, and returns (action, next state)
+        class_count (int): Number of character classes
+
+    Returns:
+        list: The table. The start state has offset 0
+    """
+    numbers = {start: 0}
+    states = [start]
+    table = []
+    for state in states:  # Grows while new states are found
+        for cls in range(class_count):
+            action, next_state = transition(state, cls)
+            if next_state not in numbers:
+                numbers[next_state] = len(states)
+                states.append(next_state)
+            table.append(numbers[next_state] * class_count << 2 | action)
+    return table
+
+
+def grapheme_transition(state, cls):
+    """The extended grapheme cluster rules of UAX #29, as of Unicode 15.1. The state is the class of the previous
+    character, with extra states for Indic conjuncts (GB9c), emoji sequences (GB11) and regional indicator pairs
+    (GB12, GB13)
+
+    Args:
+        state (tuple): (previous class or None at the start,
+                        "conjunct", "conjunct_linker", "emoji", "emoji_zwj", "ri_pair" or None)
+        cls (int): Class of the current character
+
+    Returns:
+        (int, tuple): The action and the next state
+    """
+    previous, context = state
+    next_context = None
+    if cls == GB_EXTPICT:
+        next_context = "emoji"
+    elif cls in GB_EXTENDS and context == "emoji":
+        next_context = "emoji"
+    elif cls == GB_INCB_CONSONANT:
+        next_context = "conjunct"
+    elif cls == GB_INCB_LINKER and context in ("conjunct", "conjunct_linker"):
+        next_context = "conjunct_linker"
+    elif cls in (GB_INCB_EXTEND, GB_ZWJ) and context in ("conjunct", "conjunct_linker"):  # ZWJ is InCB=Extend
+        next_context = context
+    elif cls == GB_ZWJ and context == "emoji":
+        next_context = "emoji_zwj"
+    elif cls == GB_RI and previous == GB_RI and context != "ri_pair":
+        next_context = "ri_pair"
+    next_state = (cls, next_context)
+
+    if previous is None:  # GB1: Start of text
+        return BREAK, next_state
+    if previous == GB_CR and cls == GB_LF:  # GB3
+        return NO_BREAK, next_state
+    if previous in (GB_CR, GB_LF, GB_CONTROL) or cls in (GB_CR, GB_LF, GB_CONTROL):  # GB4, GB5
+        return BREAK, next_state
+    if previous == GB_L and cls in (GB_L, GB_V, GB_LV, GB_LVT):  # GB6
+        return NO_BREAK, next_state
+    if previous in (GB_LV, GB_V) and cls in (GB_V, GB_T):  # GB7
+        return NO_BREAK, next_state
+    if previous in (GB_LVT, GB_T) and cls == GB_T:  # GB8
+        return NO_BREAK, next_state
+    if cls in GB_EXTENDS + (GB_ZWJ, GB_SPACINGMARK) or previous == GB_PREPEND:  # GB9, GB9a, GB9b
+        return NO_BREAK, next_state
+    if context == "conjunct_linker" and cls == GB_INCB_CONSONANT:  # GB9c
+        return NO_BREAK, next_state
+    if context == "emoji_zwj" and cls == GB_EXTPICT:  # GB11
+        return NO_BREAK, next_state
+    if next_context == "ri_pair":  # GB12, GB13
+        return NO_BREAK, next_state
+    return BREAK, next_state  # GB999
+
+
+def word_transition(state, cls):
+    """The word boundary rules of UAX #29. Extend, Format and ZWJ are skipped (WB4), so the state holds the class of
+    the previous character that wasn't skipped, and the class of the character just before. Rules that look one
+    character ahead (WB6, WB7b, WB12) place a MAYBE_BREAK, and the state remembers which rule is waiting.
+
+    Args:
+        state (tuple): (previous class or None at the start, class just before, waiting rule or None)
+        cls (int): Class of the current character
+
+    Returns:
+        (int, tuple): The action and the next state
+    """
+    previous, before, waiting = state
+    if previous is None:  # WB1: Start of text
+        return BREAK, (cls, cls, None)
+    if before == WB_CR and cls == WB_LF:  # WB3
+        return NO_BREAK, (cls, cls, None)
+    if previous in (WB_CR, WB_LF, WB_NEWLINE) or cls in (WB_CR, WB_LF, WB_NEWLINE):  # WB3a, WB3b
+        return BREAK, (cls, cls, None)
+    if before == WB_ZWJ and cls == WB_EXTPICT and waiting is None:  # WB3c
+        return NO_BREAK, (cls, cls, None)
+    if before == WB_WSEGSPACE and cls == WB_WSEGSPACE and waiting is None:  # WB3d
+        return NO_BREAK, (cls, cls, None)
+    if cls in (WB_EXTEND, WB_FORMAT, WB_ZWJ):  # WB4
+        return NO_BREAK, (previous, cls, waiting)
+
+    if waiting is not None:  # The character after a MidLetter, MidNum or quote decides the waiting rule
+        if waiting == "letter" and cls in WB_AHLETTER:  # WB6, WB7
+            return CANCEL, (cls, cls, None)
+        if waiting == "hebrew_quote" and cls == WB_HEBREW:  # WB7b, WB7c
+            return CANCEL, (cls, cls, None)
+        if waiting == "hebrew_single_quote" and cls in WB_AHLETTER:  # WB7 after WB7a
+            return CANCEL, (cls, cls, None)
+        if waiting == "number" and cls == WB_NUMERIC:  # WB11, WB12
+            return CANCEL, (cls, cls, None)
+        action, next_state = word_transition((previous, before, None), cls)
+        return action or BREAK, next_state  # Nothing after a MidLetter, MidNum or quote is kept together
+
+    next_state = (cls, cls, None)
+    if previous in WB_AHLETTER and cls in WB_AHLETTER:  # WB5
+        return NO_BREAK, next_state
+    if previous == WB_HEBREW and cls == WB_SINGLE_QUOTE:  # WB7a
+        return NO_BREAK, (cls, cls, "hebrew_single_quote")
+    if previous in WB_AHLETTER and cls in (WB_MIDLETTER, WB_MIDNUMLET, WB_SINGLE_QUOTE):  # WB6
+        return MAYBE_BREAK, (cls, cls, "letter")
+    if previous == WB_HEBREW and cls == WB_DOUBLE_QUOTE:  # WB7b
+        return MAYBE_BREAK, (cls, cls, "hebrew_quote")
+    if previous in (WB_NUMERIC,) + WB_AHLETTER and cls in (WB_NUMERIC,) + WB_AHLETTER:  # WB8, WB9, WB10
+        return NO_BREAK, next_state
+    if previous == WB_NUMERIC and cls in (WB_MIDNUM, WB_MIDNUMLET, WB_SINGLE_QUOTE):  # WB12
+        return MAYBE_BREAK, (cls, cls, "number")
+    if previous == WB_KATAKANA and cls == WB_KATAKANA:  # WB13
+        return NO_BREAK, next_state
+    if previous in WB_AHLETTER + (WB_NUMERIC, WB_KATAKANA, WB_EXTENDNUMLET) and cls == WB_EXTENDNUMLET:  # WB13a
+        return NO_BREAK, next_state
+    if previous == WB_EXTENDNUMLET and cls in WB_AHLETTER + (WB_NUMERIC, WB_KATAKANA):  # WB13b
+        return NO_BREAK, next_state
+    if previous == WB_RI and cls == WB_RI:  # WB15, WB16: Regional indicators pair up
+        return NO_BREAK, ("ri_pair", cls, None)  # A third regional indicator starts a new pair
+    return BREAK, next_state  # WB999
+
+
+def load_classes(property, values, extpict_class, refinements=None):
+    """Creates a dense array with the break class of every codepoint, from the property index
+
+    Args:
+        property (str): The break property. Eg: "GCB"
+        values (dict): Raw property value -> class. Values that aren't in it get class 0
+        extpict_class (int): Class of Extended_Pictographic characters that have no other class
+        refinements (tuple, optional): (property, [(raw value, class, refined class), ...]). Codepoints with the
+                                       value and the class get the refined class. Eg: the InCB values of GB9c
+
+    Returns:
+        bytearray: Class of each codepoint
+    """
+    index = get_database(UCD_PROPERTY_INDEX_FILE, load_json)
+    classes = bytearray(CODEPOINT_COUNT)
+    for flat_ranges in [index.get("ExtPict", {}).get("Y", [])]:
+        for first, last in zip(flat_ranges[::2], flat_ranges[1::2]):
+            classes[first : last + 1] = bytes([extpict_class]) * (last - first + 1)
+    for raw_value, flat_ranges in index[property].items():
+        cls = values.get(raw_value)
+        if cls is None:
+            continue
+        for first, last in zip(flat_ranges[::2], flat_ranges[1::2]):
+            classes[first : last + 1] = bytes([cls]) * (last - first + 1)
+    if refinements is not None:
+        refined_property, refined_values = refinements
+        for raw_value, cls, refined_cls in refined_values:
+            flat_ranges = index.get(refined_property, {}).get(raw_value, [])
+            for first, last in zip(flat_ranges[::2], flat_ranges[1::2]):
+                for codepoint in range(first, last + 1):
+                    if classes[codepoint] == cls:
+                        classes[codepoint] = refined_cls
+    return classes
+
+
+def load_grapheme_rules(name):
+    """
+    Args:
+        name (str): Registry name of the rules
+
+    Returns:
+        tuple: (transition table, class of each codepoint, None)
+    """
+    table = compile_rules((None, None), grapheme_transition, GB_CLASS_COUNT)
+    return table, load_classes("GCB", GB_VALUES, GB_EXTPICT, ("InCB", GB_INCB_VALUES)), None
+
+
+def load_word_rules(name):
+    """
+    Args:
+        name (str): Registry name of the rules
+
+    Returns:
+        tuple: (transition table, class of each codepoint, classes that start a word-like segment)
+    """
+    table = compile_rules((None, None, None), word_transition, WB_CLASS_COUNT)
+    return table, load_classes("WB", WB_VALUES, WB_EXTPICT), WB_WORD_START
+
+
+SEGMENT_RULES = {"grapheme": (GRAPHEME_RULES, load_grapheme_rules), "word": (WORD_RULES, load_word_rules)}
+
+
+class Segmenter:
+    """Splits a stream of text into grapheme clusters or words. Text can be fed in chunks of any size: the last
+    segment of a chunk is held back until the next chunk shows where it ends. Each character costs two lookups in
+    flat arrays, its break class and the next entry of the transition table, so segmenting is linear in the text.
+    At most MAX_SEGMENT_LENGTH characters are held back, so memory stays bounded. A longer segment, like a long run
+    of combining marks, is cut there.
+    """
+
+    def __init__(self, kind):
+        """
+        Args:
+            kind (str): "grapheme" or "word"
+
+        Raises:
+            ValueError: If kind isn't known
+        """
+        if kind not in SEGMENT_RULES:
+            raise ValueError("Unknown segment kind: {}. Use one of: {}".format(kind, ", ".join(SEGMENT_RULES)))
+        self.kind = kind
+        self.reset()
+
+    def reset(self):
+        """Forgets the text fed so far. The next text is the start of a new stream
+        """
+        self.__state = 0
+        self.__tail = ""  # The text after the last boundary that is known for sure
+        self.__pending = None  # Position in the tail of a MAYBE_BREAK, waiting for the next character
+
+    def __rules(self):
+        name, loader = SEGMENT_RULES[self.kind]
+        return get_database(name, loader)  # Not kept on the instance, so a Segmenter pickles without the tables
+
+    def feed(self, text):
+        """Segments the next chunk of the stream
+
+        Args:
+            text (str): The next chunk
+
+        Returns:
+            list: The segments that ended in this chunk. For words only the word-like segments,
+                  those starting with a letter, a digit or a connector like "_"
+        """
+        table, classes, keep = self.__rules()
+        buffer = self.__tail + text
+        boundaries = []
+        state = self.__state
+        pending = self.__pending
+        for idx, codepoint in enumerate(map(ord, text), len(self.__tail)):
+            entry = table[state + classes[codepoint]]
+            state = entry >> 2
+            action = entry & 3
+            if not action:
+                continue
+            if action == BREAK or action == MAYBE_BREAK:
+                if pending is not None:  # Any break after a MAYBE_BREAK confirms it
+                    boundaries.append(pending)
+                    pending = None
+                if action == BREAK:
+                    boundaries.append(idx)
+                else:
+                    pending = idx
+            elif action == CANCEL:
+                pending = None
+
+        segments = []
+        start = 0
+        for boundary in boundaries:
+            if boundary > start:
+                segments.append(buffer[start:boundary])
+            start = boundary
+        self.__state = state
+        self.__tail = buffer[start:]
+        self.__pending = None if pending is None else pending - start
+        if len(self.__tail) > MAX_SEGMENT_LENGTH:  # No boundary for too long. The held back text is cut off
+            segments.extend(self.__held_back())
+            self.__tail = ""
+            self.__pending = None
+        return self.__keep(segments, classes, keep)
+
+    def finish(self):
+        """Gets the segments the stream would end with, if no more text came. Doesn't change the state,
+        so more text can still be fed afterwards.
+
+        Returns:
+            list: The held back segments. Like "feed", only the word-like ones for words
+        """
+        table, classes, keep = self.__rules()
+        return self.__keep(self.__held_back(), classes, keep)
+
+    def __held_back(self):
+        """
+        Returns:
+            list: The segments of the held back text, if it ended here
+        """
+        if self.__pending is None:
+            segments = [self.__tail]
+        else:  # The end of the text confirms a MAYBE_BREAK
+            segments = [self.__tail[: self.__pending], self.__tail[self.__pending :]]
+        return [segment for segment in segments if segment]
+
+    def __keep(self, segments, classes, keep):
+        if keep is None:
+            return segments
+        return [segment for segment in segments if classes[ord(segment[0])] in keep]
@@ -0,0 +1,352 @@
+"""A long-lived lookup server, so many processes can share one copy of the databases.
+Start it with "python -m unilyze.serve --port 8765" or "python -m unilyze.serve --unix /tmp/unilyze.sock".
+
+The protocol is one JSON object per line in both directions. A request is {"id": 1, "method": "ucd_info",
+"params": {"char": "a"}} and the response is {"id": 1, "result": {...}} or {"id": 1, "error": "ValueError: ..."}.
+Requests can be pipelined, and responses may come back in a different order. See unilyze.client.
+"""
+import json
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from unilyze.unistat import Unistat
+from unilyze.client import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE
+
+BATCH_SIZE = 256  # Lookups coalesced into one batch at most
+BATCH_DELAY = 0.001  # Seconds a lookup waits for others to join its batch
+MAX_PENDING = 1024  # Requests in progress before the server stops reading from its clients
+
+
+def to_json(value):
+    """Converts the values json doesn't know. Sets of characters become sorted lists
+
+    Args:
+        value (object): A value json.dumps can't encode
+
+    Returns:
+        list: The converted value
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("Can't encode {} as JSON".format(type(value).__name__))
+
+
+def check_properties(properties):
+    """Checks the properties of a request, before it's looked up together with the requests of other clients
+
+    Args:
+        properties (list): UCD property names from the request. Can be None
+
+    Raises:
+        ValueError: If it's not None or a list of strings. Eg: a bare "sc" or [["sc"]]
+
+    Returns:
+        tuple: The properties, hashable so lookups with the same properties can be batched. None for all properties
+    """
+    if properties is None:
+        return None
+    if not isinstance(properties, list) or not all(isinstance(property, str) for property in properties):
+        raise ValueError("Properties must be a list of UCD property names. Eg: [\"sc\", \"gc\"]")
+    return tuple(properties)
+
+
+class Batcher:
+    """Coalesces concurrent lookups into batches. A lookup waits at most "delay" seconds for others to join,
+    and a full batch is sent at once. Batches run one at a time in a worker thread, so the event loop keeps serving
+    the clients while a batch is looked up.
+    """
+
+    def __init__(self, lookup, executor, size=BATCH_SIZE, delay=BATCH_DELAY):
+        """
+        Args:
+            lookup (callable): Takes a list of (key, char) tuples and returns a list with a result for each.
+                               A result that is an exception fails only its own lookup
+            executor (Executor): Runs the batches
+            size (int, optional): Maximum number of lookups in a batch
+            delay (float, optional): Seconds the first lookup of a batch waits for others
+        """
+        self.__lookup = lookup
+        self.__executor = executor
+        self.__size = size
+        self.__delay = delay
+        self.__pending = []
+        self.__timer = None
+        self.__tasks = set()  # Batches in progress. Keeps the tasks from being garbage collected
+
+    async def submit(self, key, char):
+        """Looks up a character in the next batch
+
+        Args:
+            key (object): Lookups with the same key are done together. Eg: the properties of "ucd_info"
+            char (str): The character
+
+        Returns:
+            object: The result of the lookup
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__pending.append((key, char, future))
+        if len(self.__pending) >= self.__size:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.__delay, self.__flush)
+        return await future
+
+    def __flush(self):
+        """Sends the pending lookups as a batch
+        """
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch, self.__pending = self.__pending, []
+        task = asyncio.get_running_loop().create_task(self.__run(batch))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __run(self, batch):
+        """Looks up a batch in the worker thread, and hands out the results
+
+        Args:
+            batch (list): (key, char, future) tuples
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.__executor, self.__lookup, [item[:2] for item in batch])
+        except Exception as error:  # The whole batch fails. Eg. a missing database
+            for key, char, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (key, char, future), result in zip(batch, results):
+            if future.done():  # The client may have gone
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class LookupServer:
+    """Answers "ucd_info", "lng_usage" and "unistat" requests from one shared Unistat, so all the requests use the
+    same "ucd_info" LRU cache.
+    Single character lookups from all the clients are coalesced into batches, that are looked up in one go
+    in a worker thread. When MAX_PENDING requests are in progress, the server stops reading until some are answered,
+    so clients that send faster than the server can answer are slowed down by their sockets.
+    """
+
+    def __init__(self, unichar=None, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY, max_pending=MAX_PENDING):
+        """
+        Args:
+            unichar (Unichar, optional): The instance answering the lookups. Defaults to a new Unistat.
+                                         If it's a Unichar only, "unistat" requests get a Unistat with the same
+                                         cache size.
+            batch_size (int, optional): Maximum number of lookups in a batch
+            batch_delay (float, optional): Seconds a lookup waits for others to join its batch
+            max_pending (int, optional): Requests in progress before the server stops reading
+        """
+        self.unichar = unichar or Unistat()
+        if isinstance(self.unichar, Unistat):
+            self.__unistat_instance = self.unichar
+        else:
+            self.__unistat_instance = Unistat(cache_size=self.unichar.ucd_cache_info().maxsize)
+        self.__executor = ThreadPoolExecutor(max_workers=1)  # Lookups are CPU bound, one thread keeps the GIL calm
+        self.__batchers = {
+            "ucd_info": Batcher(self.__ucd_info_batch, self.__executor, batch_size, batch_delay),
+            "lng_usage": Batcher(self.__lng_usage_batch, self.__executor, batch_size, batch_delay),
+        }
+        self.__max_pending = max_pending
+        self.__slots = None  # Created in the event loop
+
+    def close(self):
+        """Stops the worker thread, after the lookups in progress. Close the servers from "start_tcp" and
+        "start_unix" first
+        """
+        self.__executor.shutdown()
+
+    async def start_tcp(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Args:
+            host (str, optional): Address to listen on. Defaults to localhost only.
+            port (int, optional): Port to listen on. 0 picks a free port.
+
+        Returns:
+            asyncio.Server: The server. Serve with "serve_forever", stop with "close"
+        """
+        self.__slots = asyncio.Semaphore(self.__max_pending)
+        return await asyncio.start_server(self.__handle, host, port, limit=MAX_LINE)
+
+    async def start_unix(self, path):
+        """
+        Args:
+            path (str): Filename of the Unix socket
+
+        Returns:
+            asyncio.Server: The server. Serve with "serve_forever", stop with "close"
+        """
+        self.__slots = asyncio.Semaphore(self.__max_pending)
+        return await asyncio.start_unix_server(self.__handle, path, limit=MAX_LINE)
+
+    async def __handle(self, reader, writer):
+        """Serves one client connection. Each request is answered in its own task, so requests are pipelined
+
+        Args:
+            reader (asyncio.StreamReader): Requests from the client
+            writer (asyncio.StreamWriter): Responses to the client
+        """
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # Too long line, or the client is gone
+                    break
+                if not line:
+                    break
+                # Backpressure: a slot is only taken when a request has arrived, so idle connections hold none.
+                # While all slots are in use, no connection reads past its current request
+                await self.__slots.acquire()
+                task = asyncio.get_running_loop().create_task(self.__respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def __respond(self, line, writer, write_lock):
+        """Answers one request
+
+        Args:
+            line (bytes): The JSON request
+            writer (asyncio.StreamWriter): Responses to the client
+            write_lock (asyncio.Lock): Keeps the responses of the connection from interleaving
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {"id": request_id, "result": await self.call(request["method"], request.get("params", {}))}
+        except Exception as error:
+            response = {"id": request_id, "error": "{}: {}".format(type(error).__name__, error)}
+        finally:
+            self.__slots.release()
+        try:
+            data = json.dumps(response, ensure_ascii=False, default=to_json).encode("utf-8") + b"\n"
+        except TypeError as error:
+            data = json.dumps({"id": request_id, "error": "TypeError: {}".format(error)}).encode("utf-8") + b"\n"
+        async with write_lock:
+            try:
+                writer.write(data)
+                await writer.drain()  # Backpressure the other way: a slow reader doesn't fill our memory
+            except ConnectionError:
+                pass
+
+    async def call(self, method, params):
+        """Runs a request
+
+        Args:
+            method (str): "ucd_info", "lng_usage", "unistat" or "ping"
+            params (dict): The arguments. "ucd_info": {"char": "a", "properties": ["sc"]},
+                           "lng_usage": {"char": "a"}, "unistat": {"text": "Hi", "properties": ["sc"]}
+
+        Raises:
+            ValueError: If the method is unknown, a character isn't one single character, or the properties
+                        aren't a list of property names
+
+        Returns:
+            object: The same result as the Unichar or Unistat method of the same name
+        """
+        if method == "ping":
+            return "pong"
+        if method in self.__batchers:
+            char = params["char"]
+            if not isinstance(char, str) or len(char) != 1:
+                raise ValueError("Only one unicode character is considered valid. No more, no less.")
+            key = check_properties(params.get("properties"))
+            return await self.__batchers[method].submit(key, char)
+        if method == "unistat":
+            properties = check_properties(params.get("properties"))
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.__executor, self.__unistat, params["text"], properties)
+        raise ValueError("Unknown method: {}".format(method))
+
+    def __ucd_info_batch(self, batch):
+        """
+        Args:
+            batch (list): (properties, char) tuples. Properties is a tuple or None
+
+        Returns:
+            list: The "ucd_info" of each character, or the exception its lookup raised.
+                  Each distinct lookup is only done once
+        """
+        infos = {}
+        for lookup in dict.fromkeys(batch):
+            try:
+                infos[lookup] = self.unichar.ucd_info(lookup[1], lookup[0])
+            except Exception as error:  # Fails only the requests of this lookup, not the whole batch
+                infos[lookup] = error
+        return [infos[lookup] for lookup in batch]
+
+    def __lng_usage_batch(self, batch):
+        """
+        Args:
+            batch (list): (None, char) tuples
+
+        Returns:
+            list: The "lng_usage" of each character
+        """
+        columns = self.unichar.lng_usage_many([char for key, char in batch])
+        results = []
+        for row in range(len(batch)):
+            usage = {group: values[row] for group, values in columns.items() if values[row] is not None}
+            results.append(usage or None)
+        return results
+
+    def __unistat(self, text, properties):
+        """
+        Args:
+            text (str): The text
+            properties (tuple): UCD properties to sum up, or None for all
+
+        Returns:
+            dict: The "unistat" of the text
+        """
+        # Only the single worker thread uses the instance, so a request never sees the text of another
+        self.__unistat_instance.reset_stat()
+        self.__unistat_instance.add_text(text)
+        return self.__unistat_instance.unistat(properties)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, **options):
+    """Runs a LookupServer until it is cancelled
+
+    Args:
+        host (str, optional): Address to listen on
+        port (int, optional): Port to listen on
+        unix (str, optional): Listen on this Unix socket instead of TCP
+        **options: Options of LookupServer. Eg: batch_size=512
+    """
+    lookup_server = LookupServer(**options)
+    try:
+        server = await (lookup_server.start_unix(unix) if unix else lookup_server.start_tcp(host, port))
+        async with server:
+            await server.serve_forever()
+    finally:
+        lookup_server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve unilyze lookups to other processes")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on. Default: %(default)s")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on. Default: %(default)s")
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Default: %(default)s")
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY, help="Seconds. Default: %(default)s")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING, help="Default: %(default)s")
+    args = parser.parse_args()
+    options = {"batch_size": args.batch_size, "batch_delay": args.batch_delay, "max_pending": args.max_pending}
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, **options))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,281 @@
+import math
+import heapq
+import hashlib
+from array import array
+from collections.abc import Mapping
+
+
+class CountMinSketch:
+    """Approximate counts of any number of distinct items in fixed memory. An estimate is never lower than the true
+    count, and with probability 1 - delta it is at most epsilon * total higher. Items are hashed with a seeded
+    BLAKE2 hash, so sketches with the same parameters can be merged, also across processes.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, seed=0):
+        """
+        Args:
+            epsilon (float, optional): Error bound relative to the total count. Defaults to 0.001.
+            delta (float, optional): Probability that an estimate is off by more than the bound. Defaults to 0.01.
+            seed (int, optional): Seed of the hash functions. Only sketches with the same seed can be merged.
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.total = 0
+        self.__key = seed.to_bytes(8, "little")
+        self.__table = array("q", bytes(8 * self.width * self.depth))
+
+    def __positions(self, item):
+        """Gets the cell of an item in each row. The rows use double hashing of one 128 bit hash
+
+        Args:
+            item (str): The item
+
+        Returns:
+            list: Index of the cell in the flat table, one per row
+        """
+        digest = hashlib.blake2b(item.encode("utf-8", "surrogatepass"), digest_size=16, key=self.__key).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [row * self.width + (first + row * step) % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        """
+        Args:
+            item (str): The item. Eg: "a"
+            count (int, optional): How many times it occurred. Defaults to 1.
+        """
+        table = self.__table
+        for position in self.__positions(item):
+            table[position] += count
+        self.total += count
+
+    def estimate(self, item):
+        """
+        Args:
+            item (str): The item
+
+        Returns:
+            int: The estimated count. Never lower than the true count
+        """
+        table = self.__table
+        return min(table[position] for position in self.__positions(item))
+
+    def merge(self, other):
+        """Adds the counts of another sketch to this one
+
+        Args:
+            other (CountMinSketch): A sketch with the same epsilon, delta and seed
+
+        Raises:
+            ValueError: If the sketches don't have the same parameters
+        """
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Only sketches with the same epsilon, delta and seed can be merged")
+        table = self.__table
+        for position, count in enumerate(other.__table):
+            if count:
+                table[position] += count
+        self.total += other.total
+
+
+class SpaceSaving:
+    """The Space-Saving heavy hitters algorithm. Keeps a counter for at most "capacity" items. A new item takes over
+    the counter of the least counted item, and inherits its count as error. Any item that occurs more than
+    total / capacity times is guaranteed to have a counter, and its count is at most total / capacity too high.
+    """
+
+    def __init__(self, capacity=1000):
+        """
+        Args:
+            capacity (int, optional): Number of counters. Defaults to 1000.
+        """
+        self.capacity = capacity
+        self.total = 0
+        self.__counts = {}
+        self.__errors = {}
+        self.__heap = []  # (count, item) of every counted item. Counts only grow, so an entry may be too low
+
+    def __pop_min(self):
+        """Removes the least counted item from the heap. Entries with an outdated count are pushed back updated
+
+        Returns:
+            (int, str): The count and the item
+        """
+        while True:
+            count, item = heapq.heappop(self.__heap)
+            if self.__counts[item] == count:
+                return count, item
+            heapq.heappush(self.__heap, (self.__counts[item], item))
+
+    def floor(self):
+        """
+        Returns:
+            int: The count a new item would take over. 0 until all the counters are in use
+        """
+        if len(self.__counts) < self.capacity:
+            return 0
+        count, item = self.__pop_min()
+        heapq.heappush(self.__heap, (count, item))
+        return count
+
+    def add(self, item, count=1):
+        """
+        Args:
+            item (str): The item. Eg: "a"
+            count (int, optional): How many times it occurred. Defaults to 1.
+        """
+        self.total += count
+        if item in self.__counts:
+            self.__counts[item] += count
+            return
+        error = 0
+        if len(self.__counts) >= self.capacity:
+            error, victim = self.__pop_min()
+            del self.__counts[victim], self.__errors[victim]
+        self.__counts[item] = error + count
+        self.__errors[item] = error
+        heapq.heappush(self.__heap, (error + count, item))
+
+    def counts(self):
+        """
+        Returns:
+            dict: Item -> count, for the counted items. Counts may be too high by the error of the item
+        """
+        return self.__counts
+
+    def error(self, item):
+        """
+        Args:
+            item (str): A counted item
+
+        Returns:
+            int: How much its count may be too high
+        """
+        return self.__errors[item]
+
+    def merge(self, other):
+        """Adds the counts of another Space-Saving summary to this one. An item missing from a full summary may have
+        occurred as often as its least counted item, so it is counted with that. The most counted items are kept.
+
+        Args:
+            other (SpaceSaving): Another summary
+        """
+        floor, other_floor = self.floor(), other.floor()
+        counts, other_counts = self.__counts, other.__counts
+        merged = {}
+        for item in counts.keys() | other_counts.keys():
+            count = counts.get(item, floor) + other_counts.get(item, other_floor)
+            error = self.__errors.get(item, floor) + other.__errors.get(item, other_floor)
+            merged[item] = (count, error)
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item_count: (item_count[1][0], item_count[0]))
+        self.__counts = {item: count for item, (count, error) in kept}
+        self.__errors = {item: error for item, (count, error) in kept}
+        self.__heap = [(count, item) for item, count in self.__counts.items()]
+        heapq.heapify(self.__heap)
+        self.total += other.total
+
+
+class FrequencySketch(Mapping):
+    """Approximate counting in fixed memory: a count-min sketch estimates the count of any item, and a Space-Saving
+    summary keeps the most frequent items. As a mapping it is a read-only dict of the most frequent items and their
+    estimated counts, so it can be used where a Counter is read. The estimate of a kept item is never too low, and
+    at most "max_error" too high (with probability 1 - delta). Sketches with the same parameters can be merged.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, capacity=1000, seed=0):
+        """
+        Args:
+            epsilon (float, optional): Error bound of the count-min sketch relative to the total. Defaults to 0.001.
+            delta (float, optional): Probability that the count-min bound doesn't hold. Defaults to 0.01.
+            capacity (int, optional): Number of most frequent items kept. Defaults to 1000.
+            seed (int, optional): Seed of the hash functions. Only sketches with the same seed can be merged.
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.capacity = capacity
+        self.seed = seed
+        self.__estimator = CountMinSketch(epsilon, delta, seed)
+        self.__heavy_hitters = SpaceSaving(capacity)
+
+    def empty(self):
+        """
+        Returns:
+            FrequencySketch: A new sketch with the same parameters, that can be merged with this one
+        """
+        return FrequencySketch(self.epsilon, self.delta, self.capacity, self.seed)
+
+    @property
+    def total(self):
+        """
+        Returns:
+            int: The exact total of all the counts
+        """
+        return self.__estimator.total
+
+    def update(self, counts):
+        """Adds counts to the sketch, like Counter.update
+
+        Args:
+            counts (dict|FrequencySketch|iterable): Item -> count, another sketch to merge, or items to count once each
+        """
+        if isinstance(counts, FrequencySketch):
+            self.__estimator.merge(counts.__estimator)
+            self.__heavy_hitters.merge(counts.__heavy_hitters)
+            return
+        items = counts.items() if isinstance(counts, Mapping) else ((item, 1) for item in counts)
+        for item, count in items:
+            self.__estimator.add(item, count)
+            self.__heavy_hitters.add(item, count)
+
+    def estimate(self, item):
+        """
+        Args:
+            item (str): Any item, also one that isn't among the most frequent
+
+        Returns:
+            int: The estimated count. Never lower than the true count
+        """
+        estimate = self.__estimator.estimate(item)
+        count = self.__heavy_hitters.counts().get(item)
+        return estimate if count is None else min(count, estimate)
+
+    def max_error(self):
+        """
+        Returns:
+            float: How much the estimate of a kept item may be too high. The smaller of epsilon * total
+                   (holds with probability 1 - delta) and total / capacity (always holds)
+        """
+        return min(self.epsilon * self.total, self.total / self.capacity)
+
+    def most_common(self, n=None):
+        """
+        Args:
+            n (int, optional): Number of items. Defaults to all the kept items.
+
+        Returns:
+            list: (item, estimated count) tuples, most frequent first
+        """
+        common = sorted(((item, self.estimate(item)) for item in self), key=lambda item: (-item[1], item[0]))
+        return common[:n] if n is not None else common
+
+    def __getitem__(self, item):
+        if item not in self.__heavy_hitters.counts():
+            raise KeyError(item)
+        return self.estimate(item)
+
+    def __iter__(self):
+        return iter(self.__heavy_hitters.counts())
+
+    def __len__(self):
+        return len(self.__heavy_hitters.counts())
+
+    def __contains__(self, item):
+        return item in self.__heavy_hitters.counts()
+
+    def __repr__(self):
+        return "FrequencySketch(epsilon={}, delta={}, capacity={}, total={})".format(
+            self.epsilon, self.delta, self.capacity, self.total
+        )
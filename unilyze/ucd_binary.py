@@ -0,0 +1,427 @@
+import sys
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+# The binary database starts with this magic, followed by a version and a directory of named sections.
+MAGIC = b"UNILYZE\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sII")  # magic, version, number of sections
+SECTION = struct.Struct("<4sII")  # name, offset, length in bytes
+
+
+class _Interner:
+    """Hands out small consecutive integer IDs for hashable values. Equal values share one ID.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, value):
+        """Get the ID of a value. Unseen values are appended to the table
+
+        Args:
+            value (hashable): The value to intern. Eg: "Latn"
+
+        Returns:
+            int: The ID of the value
+        """
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.ids[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def _pack_uint32(values):
+    """Packs a sequence of integers as little endian uint32
+
+    Args:
+        values (iterable): The integers to pack
+
+    Returns:
+        bytes: The packed integers
+    """
+    packed = array("I", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_uint32(buffer):
+    """Gives an indexable uint32 view of a little endian buffer. On little endian machines this is
+    a zero-copy view straight into the mmap'ed file.
+
+    Args:
+        buffer (memoryview): The raw section
+
+    Returns:
+        memoryview|array: An indexable sequence of ints
+    """
+    if sys.byteorder == "little":
+        return buffer.cast("I")
+    unpacked = array("I")
+    unpacked.frombytes(buffer)
+    unpacked.byteswap()
+    return unpacked
+
+
+def expand_name(info, codepoint, name_property="na"):
+    """Names of code points in a range contain a "#" that stands for the code point. Eg: "CJK UNIFIED IDEOGRAPH-#"
+    This replaces it with the hex code point, so the name becomes eg. "CJK UNIFIED IDEOGRAPH-4E00"
+
+    Args:
+        info (dict): Properties of a code point in a range. Is changed in place
+        codepoint (int): The code point
+        name_property (str, optional): The property holding the name. "Name" in translated properties
+
+    Returns:
+        dict: The same info
+    """
+    name = info.get(name_property)
+    if name and "#" in name:
+        info[name_property] = name.replace("#", "{:04X}".format(codepoint))
+    return info
+
+
+def _pack_sections(sections):
+    """Lays out named sections after the header and directory. Every section is 4-byte aligned.
+
+    Args:
+        sections (list): List of (name, bytes) tuples. Names are 4 bytes long.
+
+    Returns:
+        bytes: The complete file content
+    """
+    offset = HEADER.size + SECTION.size * len(sections)
+    directory = []
+    body = []
+    for name, content in sections:
+        directory.append(SECTION.pack(name, offset, len(content)))
+        padding = b"\x00" * (-len(content) % 4)
+        body.append(content + padding)
+        offset += len(content) + len(padding)
+    return HEADER.pack(MAGIC, VERSION, len(sections)) + b"".join(directory) + b"".join(body)
+
+
+class BinaryWriter:
+    """Builds a binary codepoint database one group, char and range at a time, so a streaming builder doesn't
+    need the whole database in memory. Only the interned tables and the integer arrays are kept.
+    All property names and values are interned into one string table. Groups and the per-character
+    overrides become records of (property, value) pairs, and identical override records are only stored once.
+    Code point ranges are stored in a sorted range table, so they take no memory per code point.
+    """
+
+    def __init__(self):
+        self.__strings = _Interner()
+        self.__records = _Interner()
+        self.__records.intern(())  # Record 0 is the empty record, used by chars that have no overrides
+        self.__group_records = {}
+        self.__codepoints = array("I")
+        self.__cp_groups = array("I")
+        self.__cp_overrides = array("I")
+        self.__ranges = []  # (first, last, group record, override record)
+
+    def __record(self, info):
+        """Interns the properties of a group, char or range as a record
+
+        Args:
+            info (dict): The properties. A "group" key is left out
+
+        Returns:
+            int: ID of the record
+        """
+        strings = self.__strings
+        pairs = tuple((strings.intern(k), strings.intern(v)) for k, v in info.items() if k != "group")
+        return self.__records.intern(pairs)
+
+    def add_group(self, group, group_info):
+        """
+        Args:
+            group (str): ID of the group. Eg: "0"
+            group_info (dict): Properties of the group
+        """
+        self.__group_records[group] = self.__record(group_info)
+
+    def add_char(self, char, char_info):
+        """
+        Args:
+            char (str): The character
+            char_info (dict): Properties of the char, with the ID of its group in "group". The group must be added first
+        """
+        self.__codepoints.append(ord(char))
+        self.__cp_groups.append(self.__group_records[char_info["group"]])
+        self.__cp_overrides.append(self.__record(char_info))
+
+    def add_range(self, first, last, group, range_info):
+        """
+        Args:
+            first (int): First code point of the range
+            last (int): Last code point of the range (inclusive)
+            group (str): ID of the group. The group must be added first
+            range_info (dict): Properties of the range
+        """
+        self.__ranges.append((first, last, self.__group_records[group], self.__record(range_info)))
+
+    def save(self, filename):
+        """Writes the database to disk. Chars and ranges may have been added in any order
+
+        Args:
+            filename (str): Filename of the destination file
+        """
+        order = sorted(range(len(self.__codepoints)), key=self.__codepoints.__getitem__)
+        ranges = sorted(self.__ranges)
+
+        encoded = [value.encode("utf-8") for value in self.__strings.values]
+        string_offsets = [0]
+        for value in encoded:
+            string_offsets.append(string_offsets[-1] + len(value))
+
+        record_offsets = [0]
+        pairs = array("I")
+        for record in self.__records.values:
+            for key, value in record:
+                pairs.extend((key, value))
+            record_offsets.append(len(pairs) // 2)
+
+        content = _pack_sections(
+            [
+                (b"STRO", _pack_uint32(string_offsets)),
+                (b"RECO", _pack_uint32(record_offsets)),
+                (b"PAIR", _pack_uint32(pairs)),
+                (b"CPNT", _pack_uint32(self.__codepoints[idx] for idx in order)),
+                (b"CPGR", _pack_uint32(self.__cp_groups[idx] for idx in order)),
+                (b"CPOV", _pack_uint32(self.__cp_overrides[idx] for idx in order)),
+                (b"RNGF", _pack_uint32(r[0] for r in ranges)),
+                (b"RNGL", _pack_uint32(r[1] for r in ranges)),
+                (b"RNGG", _pack_uint32(r[2] for r in ranges)),
+                (b"RNGO", _pack_uint32(r[3] for r in ranges)),
+                (b"STRB", b"".join(encoded)),
+            ]
+        )
+        with open(filename, mode="wb") as fp:
+            fp.write(content)
+
+
+def save_binary(filename, data):
+    """Saves the codepoint database in a compact binary format, that can be mmap'ed by "UcdBinary".
+    See "BinaryWriter" for the layout.
+
+    Args:
+        filename (str): Filename of the destination file
+        data (dict): The json codepoint database: {"groups": {...}, "chars": {...}, "ranges": [...]}
+    """
+    writer = BinaryWriter()
+    for group, group_info in data["groups"].items():
+        writer.add_group(group, group_info)
+    for char, char_info in data["chars"].items():
+        writer.add_char(char, char_info)
+    for first, last, group, range_info in data.get("ranges", []):
+        writer.add_range(first, last, group, range_info)
+    writer.save(filename)
+
+
+class UcdBinary:
+    """Read-only access to a codepoint database written by "save_binary".
+    The file is mmap'ed, so opening it is close to instant, and processes that open the same
+    file share the pages instead of each holding a private copy.
+    """
+
+    NAME_PROPERTY = "na"  # Names in ranges have a "#" for the code point. See "expand_name"
+
+    def __init__(self, filename):
+        """Maps the database file into memory
+
+        Args:
+            filename (str): Filename of the binary database
+
+        Raises:
+            ValueError: If the file is not a binary database of a supported version
+        """
+        with open(filename, mode="rb") as fp:
+            self.__map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, section_count = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a unilyze binary database (or unsupported version): " + filename)
+
+        view = memoryview(self.__map)
+        self.__sections = {}
+        for idx in range(section_count):
+            name, offset, length = SECTION.unpack_from(self.__map, HEADER.size + idx * SECTION.size)
+            self.__sections[name] = view[offset : offset + length]
+
+        self.__string_offsets = _unpack_uint32(self.__sections[b"STRO"])
+        self.__string_blob = self.__sections[b"STRB"]
+        self.__record_offsets = _unpack_uint32(self.__sections[b"RECO"])
+        self.__pairs = _unpack_uint32(self.__sections[b"PAIR"])
+        self.__codepoints = _unpack_uint32(self.__sections[b"CPNT"])
+        self.__cp_groups = _unpack_uint32(self.__sections[b"CPGR"])
+        self.__cp_overrides = _unpack_uint32(self.__sections[b"CPOV"])
+        self.__range_firsts = _unpack_uint32(self.__sections.get(b"RNGF", view[0:0]))
+        self.__range_lasts = _unpack_uint32(self.__sections.get(b"RNGL", view[0:0]))
+        self.__range_groups = _unpack_uint32(self.__sections.get(b"RNGG", view[0:0]))
+        self.__range_overrides = _unpack_uint32(self.__sections.get(b"RNGO", view[0:0]))
+
+    def __len__(self):
+        return len(self.__codepoints)
+
+    def section(self, name):
+        """Gets the raw bytes of a section. Used by vectorized readers that do their own decoding.
+
+        Args:
+            name (bytes): The 4 byte section name. Eg: b"CPNT"
+
+        Returns:
+            memoryview: The section content. The integer sections are little endian uint32
+        """
+        return self.__sections[name]
+
+    def string(self, idx):
+        """Decodes one entry of the string table
+
+        Args:
+            idx (int): ID of the string
+
+        Returns:
+            str: The string. Eg: "Latn"
+        """
+        return str(self.__string_blob[self.__string_offsets[idx] : self.__string_offsets[idx + 1]], "utf-8")
+
+    def record(self, idx):
+        """Decodes a group or override record
+
+        Args:
+            idx (int): ID of the record
+
+        Returns:
+            dict: The properties of the record. Eg: {"gc": "Lu", "na": "LATIN CAPITAL LETTER A"}
+        """
+        pairs = self.__pairs
+        info = {}
+        for pos in range(self.__record_offsets[idx] * 2, self.__record_offsets[idx + 1] * 2, 2):
+            info[self.string(pairs[pos])] = self.value(pairs[pos + 1])
+        return info
+
+    def value(self, idx):
+        """Decodes a property value of a record. In this database the values are plain strings
+
+        Args:
+            idx (int): ID of the string
+
+        Returns:
+            str: The value. Eg: "Latn"
+        """
+        return self.string(idx)
+
+    def entries(self):
+        """Iterates over the chars and ranges of the database, in code point order within each kind
+
+        Yields:
+            tuple: ("char", codepoint, codepoint, group record, override record) for chars with their own entry, and
+                   ("range", first, last, group record, override record) for ranges. Records are IDs for "record"
+        """
+        for idx, codepoint in enumerate(self.__codepoints):
+            yield "char", codepoint, codepoint, self.__cp_groups[idx], self.__cp_overrides[idx]
+        for idx, first in enumerate(self.__range_firsts):
+            yield "range", first, self.__range_lasts[idx], self.__range_groups[idx], self.__range_overrides[idx]
+
+    def lookup(self, char):
+        """Gets the raw properties of a character, with the group properties merged in.
+        Characters without their own entry are looked up in the range table.
+
+        Args:
+            char (str): A single character. Eg: "ä"
+
+        Returns:
+            dict: All the properties of the character. None if the character is not in the database
+        """
+        codepoint = ord(char)
+        idx = bisect_left(self.__codepoints, codepoint)
+        if idx < len(self.__codepoints) and self.__codepoints[idx] == codepoint:
+            merged_info = self.record(self.__cp_groups[idx])
+            merged_info.update(self.record(self.__cp_overrides[idx]))  # Tags from char takes precedence over group
+            return merged_info
+
+        idx = bisect_right(self.__range_firsts, codepoint) - 1
+        if idx >= 0 and codepoint <= self.__range_lasts[idx]:
+            merged_info = self.record(self.__range_groups[idx])
+            merged_info.update(self.record(self.__range_overrides[idx]))
+            return expand_name(merged_info, codepoint, self.NAME_PROPERTY)
+        return None
+
+
+class DecodedUcdBinary(UcdBinary):
+    """Read-only access to a decoded codepoint database written by "save_decoded_binary".
+    The records have readable property names, and the values are already translated into characters, booleans and
+    readable enum names. Values are stored json-encoded and each distinct value is decoded only once, so a lookup
+    is pure indexing. Lists are returned as tuples, because the decoded values are shared.
+    """
+
+    NAME_PROPERTY = "Name"
+
+    def __init__(self, filename):
+        """Maps the database file into memory
+
+        Args:
+            filename (str): Filename of the decoded binary database
+
+        Raises:
+            ValueError: If the file is not a binary database of a supported version
+        """
+        super().__init__(filename)
+        self.__values = {}
+
+    def value(self, idx):
+        """Decodes a property value of a record
+
+        Args:
+            idx (int): ID of the string
+
+        Returns:
+            str|bool|tuple: The translated value. Eg: "Latin", True or ("a",)
+        """
+        value = self.__values.get(idx, self)  # The instance itself is a marker, as None is a valid value
+        if value is self:
+            value = json.loads(self.string(idx))
+            if isinstance(value, list):
+                value = tuple(value)
+            self.__values[idx] = value
+        return value
+
+
+def save_decoded_binary(filename, database, translate_info):
+    """Saves a decoded copy of a binary codepoint database, that can be mmap'ed by "DecodedUcdBinary".
+    Every distinct record of the database is translated once.
+
+    Args:
+        filename (str): Filename of the destination file
+        database (UcdBinary): The binary codepoint database
+        translate_info (callable): Translates a dict of raw properties into a dict of readable properties with
+                                   json-serializable values. Eg: "UcdTranslator.translate_info"
+    """
+    decoded_records = {}
+
+    def decoded(record):
+        if record not in decoded_records:
+            info = translate_info(database.record(record))
+            decoded_records[record] = {name: json.dumps(value, ensure_ascii=False) for name, value in info.items()}
+        return decoded_records[record]
+
+    writer = BinaryWriter()
+    groups = set()
+    for kind, first, last, group_record, override_record in database.entries():
+        group = str(group_record)
+        if group not in groups:
+            writer.add_group(group, decoded(group_record))
+            groups.add(group)
+        if kind == "char":
+            writer.add_char(chr(first), {**decoded(override_record), "group": group})
+        else:
+            writer.add_range(first, last, group, decoded(override_record))
+    writer.save(filename)
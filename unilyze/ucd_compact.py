@@ -0,0 +1,88 @@
+import sys
+from bisect import bisect_right
+from unilyze.ucd_binary import expand_name
+
+
+class CompactUcdDb:
+    """In-memory codepoint database, built from the json version when the binary one hasn't been built.
+    This is only a fallback: the json is still parsed with one "json.loads" first, so the peak memory of loading it
+    is unchanged. What it cuts is the memory kept after loading.
+    The json layout has a dict of properties per character, with the property names and the group repeated in every
+    one of them. Here a record is a tuple of (property, value) pairs with interned strings, identical records are
+    stored once, groups have integer IDs and the names, which are different for almost every character, are kept apart
+    so the remaining overrides can be shared. The records keep a ("na", None) slot where the name goes, so lookups
+    give the same dicts as the json layout, in the same key order.
+    """
+
+    def __init__(self, database):
+        """
+        Args:
+            database (dict): The json codepoint database: {"groups": {...}, "chars": {...}, "ranges": [...]}
+        """
+        self.__records = {}  # Record -> the same record, so identical records are the same object
+        group_ids = {}
+        self.groups = []
+        for group, group_info in database["groups"].items():
+            group_ids[group] = len(self.groups)
+            self.groups.append(self.__record(group_info))
+
+        self.chars = {}  # Codepoint -> (group ID, override record)
+        self.names = {}  # Codepoint -> name, when it differs from the group
+        entries = {}
+        for char, char_info in database["chars"].items():
+            codepoint = ord(char)
+            overrides = {key: None if key == "na" else value for key, value in char_info.items() if key != "group"}
+            if "na" in char_info:
+                self.names[codepoint] = char_info["na"]
+            entry = (group_ids[char_info["group"]], self.__record(overrides))
+            self.chars[codepoint] = entries.setdefault(entry, entry)
+
+        ranges = database.get("ranges", [])
+        self.range_firsts = [first for first, last, group, range_info in ranges]
+        self.range_lasts = [last for first, last, group, range_info in ranges]
+        self.range_entries = [(group_ids[group], self.__record(info)) for first, last, group, info in ranges]
+        del self.__records  # Only needed while building
+
+    def __record(self, info):
+        """
+        Args:
+            info (dict): Properties. Eg: {"gc": "Lu", "sc": "Latn"}
+
+        Returns:
+            tuple: The shared record. Eg: (("gc", "Lu"), ("sc", "Latn"))
+        """
+        pairs = ((key, sys.intern(value) if isinstance(value, str) else value) for key, value in info.items())
+        record = tuple((sys.intern(key), value) for key, value in pairs)
+        return self.__records.setdefault(record, record)
+
+    def __len__(self):
+        return len(self.chars)
+
+    def lookup(self, char):
+        """Looks up the raw properties of a character
+
+        Args:
+            char (str): A single character
+
+        Returns:
+            dict: The merged group and character properties, or None if the character isn't in the database
+        """
+        codepoint = ord(char)
+        entry = self.chars.get(codepoint)
+        if entry is not None:
+            group, overrides = entry
+            info = dict(self.groups[group])
+            info.update(overrides)  # Tags from char takes precedence over the group tags
+            name = self.names.get(codepoint)
+            if name is not None:
+                info["na"] = name  # Fills the slot, so the key keeps its place
+            return info
+
+        # Code points without their own entry are found in the range table. Eg. CJK ideographs and reserved areas
+        idx = bisect_right(self.range_firsts, codepoint) - 1
+        if idx >= 0 and codepoint <= self.range_lasts[idx]:
+            group, overrides = self.range_entries[idx]
+            info = dict(self.groups[group])
+            info.update(overrides)
+            return expand_name(info, codepoint)
+        return None
@@ -0,0 +1,128 @@
+import re
+
+
+class UcdTranslator:
+    """Translates raw UCD properties and values, as found in the UCD-XML, into a readable form.
+    Used by Unichar at runtime, and by create_ucd_dbs to build the decoded codepoint database.
+    """
+
+    def __init__(self, property_names, property_values):
+        """
+        Args:
+            property_names (dict): The database created by "create_ucd_dbs.get_property_names"
+            property_values (dict): The database created by "create_ucd_dbs.get_property_values"
+        """
+        self.__ucd_properties = property_names
+        self.__ucd_property_values = property_values
+        self.__uc_single_ref = ["bmg", "bpb", "suc", "slc", "stc", "scf", "EqUIdeo"]  # codepoint references
+        self.__uc_multi_ref = ["FC_NFKC", "uc", "lc", "tc", "cf", "dm", "NFKC_CF"]  # codepoint references
+
+    def __codepoint_reference(self, property, property_value):
+        """Some of the unicode characters refers to others. Eg upper, lower versions of a codepoint.
+        This method converts the XML value-format of Eg "0101 004A" into real unicode characters like "āJ"
+
+        Args:
+            property (str): The property (Eg: lc, uc - meaning lowercase and uppercase resp.)
+            property_value ([type]): Eg "0101 004A" from the xml property value.
+
+        Returns:
+            (bool, str|list): First value is True if the provided UCD property is member of "self._uc_ref".
+                              This means that we have done a character lookup. Otherwise first value is False.
+
+                              Second value is the converted codepoints:
+                                1) string with one unicode char if property is found in self.__uc_single_ref
+                                2) list of unicode chars if property is found in self.__uc_multi_ref
+        """
+        if property in self.__uc_single_ref:  # Codepoint have single reference
+            codepoint_hex = re.findall(r"[0-9A-F]+", property_value)
+            codepoint = chr(int(codepoint_hex[0], 16)) if codepoint_hex else ""
+            return True, codepoint  # Return it as a string with one unicode character
+
+        if property in self.__uc_multi_ref:  # Codepoint have multiple references?
+            codepoints_hex = re.findall(r"[0-9A-F]+", property_value)
+            codepoints = []
+            for codepoint_hex in codepoints_hex:
+                codepoints.append(chr(int(codepoint_hex, 16)))
+            return True, codepoints  # Return a list of unicode characters
+
+        return False, None  # property does not have references
+
+    def translate_value(self, property, property_value):
+        """Takes the raw VALUE of a provided UCD property and refines it:
+        "Y"/"N" is converted into True/False
+        Codepoint references like "004A" is converted into "J"
+
+        Args:
+            property (str): An UCD property. EG: age, uc, lc
+            property_value (str): Value of the UCD property. Eg: "1.1", "Y", "N", "004A"
+
+        Returns:
+            str|bool|list: The converted value. EG: "V1_1", True, False, "J"
+        """
+        if property == "scx":  # Special case - scx is a list of sc
+            return self.__scx_lookup(property_value)
+
+        # If there is a codepoint reference in the UCD value, we return the converted reference (unicode str)
+        found, codepoint_ref = self.__codepoint_reference(property, property_value)
+        if found:
+            return codepoint_ref
+
+        # Get lookup table for an UCD property. Eg lookuptable for Eg "age" would be {"1.1": "V1_1",.....}
+        p_lookup = self.__ucd_property_values.get(property)
+        if p_lookup:
+            pv_lookup = p_lookup.get(property_value)  # Look up UCD value in our lookuptable.
+            if pv_lookup:
+                if "NFC_QC" not in property and "NFKC_QC" not in property:  # These has Y/N/M and cant be bool
+                    if pv_lookup == "Yes":
+                        return True
+                    if pv_lookup == "No":
+                        return False
+                return pv_lookup
+            else:  # Property is not in lookup table, just return it as-is.
+                return property_value
+        else:  # Value not in lookup table, just return it as-is.
+            return property_value
+
+    def __scx_lookup(self, property_value):
+        """UCD property scx is a list of sc. This generates a python list with each scx scripts
+
+        Args:
+            property_value (str): The property value of the scx tag: Eg: "Latn Lana"
+
+        Returns:
+            list: A list of scripts. EG: ["Latin", "Tai_Tham"]
+        """
+        scx = []
+        scripts = property_value.split(" ")
+        p_lookup = self.__ucd_property_values.get("sc")  # scx uses same lookup table as sc
+        for script in scripts:
+            pv_lookup = p_lookup.get(script)
+            scx.append(pv_lookup)
+        return scx
+
+    def translate(self, property, property_value):
+        """Translates a raw UCD property and its value
+
+        Args:
+            property (str): A short UCD property. Eg: "gc"
+            property_value (str): The raw value of the property. Eg: "Lu"
+
+        Returns:
+            (str, str|bool|list): The property name and the converted value.
+                                  Eg: ("General_Category", "Uppercase_Letter")
+                                  Properties without a long name keep their short name.
+        """
+        looked_up_v = self.translate_value(property, property_value)  # convert the value to readable
+        looked_up_name = self.__ucd_properties.get(property) or property  # Lookup the UCD property name
+        return looked_up_name, looked_up_v
+
+    def translate_info(self, info):
+        """Translates all the properties of a character
+
+        Args:
+            info (dict): Raw properties. Eg: {"gc": "Lu", "Upper": "Y"}
+
+        Returns:
+            dict: The translated properties. Eg: {"General_Category": "Uppercase_Letter", "Uppercase": True}
+        """
+        return dict(self.translate(property, property_value) for property, property_value in info.items())
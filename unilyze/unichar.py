@@ -1,132 +1,269 @@
 import re
 import json
 from os import path
-from pkg_resources import resource_string
+from functools import lru_cache
+from unilyze.ucd_binary import UcdBinary, DecodedUcdBinary
+from unilyze.ucd_translate import UcdTranslator
+from unilyze.ucd_compact import CompactUcdDb
+from unilyze.database import get_database, shared_database, load_times
+from unilyze.instrument import Instrumentation, LATENCY_SAMPLES
+from unilyze.codepoint_set import CodepointSet
 
 # Location of files used for unicode lookups
 UCD_CODEPOINT_FILE = "db/ucd_codepoints.json"
+UCD_CODEPOINT_BINARY_FILE = "db/ucd_codepoints.bin"
 UCD_PROPERTY_NAME_FILE = "db/ucd_property_names.json"
 UCD_PROPERTY_VALUES_FILE = "db/ucd_property_values.json"
+UCD_PROPERTY_INDEX_FILE = "db/ucd_property_index.json"
+UCD_DECODED_FILE = "db/ucd_codepoints_decoded.bin"
+UCD_TRANSLATOR = UCD_PROPERTY_VALUES_FILE + "#translator"  # Registry name of the shared UcdTranslator
+UCD_MAPPINGS_FILE = "db/ucd_mappings.json"
 
 CLDR_LANGUAGE_TERRITORY_FILE = "db/cldr_language_territory.json"
 CLDR_CHAR_EXEMPLAR_FILE = "db/cldr_char_exemplar.json"
 CLDR_EXEMPLAR_CHAR_FILE = "db/cldr_exemplar_char.json"
+CLDR_CHAR_LOCALES_FILE = "db/cldr_char_locales.json"
 
+UCD_INFO_CACHE_SIZE = 4096  # Default number of translated "ucd_info" records kept in the LRU cache
 
-class Unichar:
-    """A class to get unicode information from characters.
-    All information is based on UCD-xml data from www.unicode.org
-    Field reference at https://www.unicode.org/reports/tr42/
+# Methods that are never timed by "enable_instrumentation"
+UNINSTRUMENTED_METHODS = frozenset(["enable_instrumentation", "disable_instrumentation", "stats"])
+
+
+def package_path(filename):
+    """Gets the full path of a data file. The files are read directly from the package folder, as the binary
+    databases are mmap'ed and must be real files anyway
+
+    Args:
+        filename (str): Filename relative to the package. Eg: "db/ucd_codepoints.json"
+
+    Returns:
+        str: The full path
     """
+    return path.join(path.dirname(__file__), filename)
 
-    def __init__(self):
-        """Loads the json database files into memory
-        """
-        self.__ucd_codepoints = self.__load_json(UCD_CODEPOINT_FILE)
-        self.__ucd_properties = self.__load_json(UCD_PROPERTY_NAME_FILE)
-        self.__ucd_property_values = self.__load_json(UCD_PROPERTY_VALUES_FILE)
 
-        self.__cldr_lng_terr = self.__load_json(CLDR_LANGUAGE_TERRITORY_FILE)
-        self.__cldr_char_exemplar = self.__load_json(CLDR_CHAR_EXEMPLAR_FILE)
+def load_json(filename):
+    """Reads a json file from disk. It's expected to be UTF-8
 
-        self.__uc_single_ref = ["bmg", "bpb", "suc", "slc", "stc", "scf", "EqUIdeo"]  # codepoint references
-        self.__uc_multi_ref = ["FC_NFKC", "uc", "lc", "tc", "cf", "dm", "NFKC_CF"]  # codepoint references
+    Args:
+        filename (str): Filename of the file to read, relative to the package
 
-    def __load_json(self, filename):
-        """Reads a json file from disk. It's expected to be UTF-8
+    Returns:
+        dict|list: The object that the json file contains
+    """
+    with open(package_path(filename), mode="r", encoding="utf-8") as fp:
+        return json.load(fp)
 
-        Args:
-            filename (str): Filename of the file to read
 
-        Returns:
-            dict|list: The object that the json file contains
-        """
-        # Get datafile-content from file relative to package install dir
-        raw_data = resource_string("unilyze", filename).decode("utf-8")
-        return json.loads(raw_data)
+class ReadOnlyDict(dict):
+    """A dict that can't be changed after it has been created. Used for the cached "ucd_info" records,
+    so callers can't modify the shared data. It is still a dict, so it can be json-serialized and printed as usual.
+    """
 
-    def __codepoint_reference(self, property, property_value):
-        """Some of the unicode characters refers to others. Eg upper, lower versions of a codepoint.
-        This method converts the XML value-format of Eg "0101 004A" into real unicode characters like "āJ"
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("The record is read-only. Make a copy with dict() to modify it")
 
-        Args:
-            property (str): The property (Eg: lc, uc - meaning lowercase and uppercase resp.)
-            property_value ([type]): Eg "0101 004A" from the xml property value.
+    __setitem__ = __delitem__ = __ior__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
 
-        Returns:
-            (bool, str|list): First value is True if the provided UCD property is member of "self._uc_ref".
-                              This means that we have done a character lookup. Otherwise first value is False.
+    def __reduce__(self):
+        return (ReadOnlyDict, (dict(self),))
+
+
+def load_codepoints(filename):
+    """Opens the binary codepoint database. Falls back to the json version if it hasn't been built.
+
+    Args:
+        filename (str): Filename of the json codepoint database
+
+    Returns:
+        UcdBinary|CompactUcdDb: The mmap'ed binary database, or the json database in its compact in-memory form
+    """
+    binary_filename = package_path(UCD_CODEPOINT_BINARY_FILE)
+    if path.exists(binary_filename):
+        return UcdBinary(binary_filename)
+    return CompactUcdDb(load_json(filename))
 
-                              Second value is the converted codepoints:
-                                1) string with one unicode char if property is found in self.__uc_single_ref
-                                2) list of unicode chars if property is found in self.__uc_multi_ref
-        """
-        if property in self.__uc_single_ref:  # Codepoint have single reference
-            codepoint_hex = re.findall(r"[0-9A-F]+", property_value)
-            codepoint = chr(int(codepoint_hex[0], 16)) if codepoint_hex else ""
-            return True, codepoint  # Return it as a string with one unicode character
 
-        if property in self.__uc_multi_ref:  # Codepoint have multiple references?
-            codepoints_hex = re.findall(r"[0-9A-F]+", property_value)
-            codepoints = []
-            for codepoint_hex in codepoints_hex:
-                codepoints.append(chr(int(codepoint_hex, 16)))
-            return True, codepoints  # Return a list of unicode characters
+def load_decoded(filename):
+    """Opens the decoded binary codepoint database, if it has been built
 
-        return False, None  # property does not have references
+    Args:
+        filename (str): Filename of the decoded database, relative to the package
 
-    def __property_value_lookup(self, property, property_value):
-        """Takes the raw VALUE of a provided UCD property and refines it:
-        "Y"/"N" is converted into True/False
-        Codepoint references like "004A" is converted into "J"
+    Returns:
+        DecodedUcdBinary: The mmap'ed database, or False if it hasn't been built
+    """
+    decoded_filename = package_path(filename)
+    return path.exists(decoded_filename) and DecodedUcdBinary(decoded_filename)
+
+
+def load_translator(name):
+    """Creates a translator from the property name and value databases
+
+    Args:
+        name (str): Registry name of the translator
+
+    Returns:
+        UcdTranslator: The translator
+    """
+    return UcdTranslator(
+        get_database(UCD_PROPERTY_NAME_FILE, load_json), get_database(UCD_PROPERTY_VALUES_FILE, load_json)
+    )
+
+
+def load_mappings(filename):
+    """Reads the case mapping and decomposition tables, and turns them into tables for "str.translate"
+
+    Args:
+        filename (str): Filename of the mapping database
+
+    Returns:
+        dict: {"uc": {97: "A", ...}, "lc": ..., "cf": ..., "canonical": ..., "compatibility": ..., "ccc": {768: 230},
+               "mark_runs": regex that finds runs of two or more combining marks}
+    """
+    mappings = {}
+    for name, table in load_json(filename).items():
+        mappings[name] = {int(codepoint): value for codepoint, value in table.items()}  # "str.translate" wants ints
+    marks = "".join(re.escape(chr(codepoint)) for codepoint in mappings["ccc"])
+    mappings["mark_runs"] = re.compile("[" + marks + "]{2,}") if marks else None
+    return mappings
+
+
+def load_char_locales(filename):
+    """Reads the locale bitset database, and adds a lookup table from locale to its bit
+
+    Args:
+        filename (str): Filename of the bitset database
+
+    Returns:
+        dict: {"locales": [...], "chars": {...}, "locale_ids": {"da": 0, "en": 1, ...}}
+    """
+    char_locales = load_json(filename)
+    char_locales["locale_ids"] = {lang_terr: idx for idx, lang_terr in enumerate(char_locales["locales"])}
+    return char_locales
+
+
+class Unichar:
+    """A class to get unicode information from characters.
+    All information is based on UCD-xml data from www.unicode.org
+    Field reference at https://www.unicode.org/reports/tr42/
 
+    The database files are loaded the first time a method needs them, and are shared by all
+    Unichar and Unistat instances in the process. Creating more instances is cheap.
+    """
+
+    __ucd_codepoints = shared_database(UCD_CODEPOINT_FILE, load_codepoints)
+    __ucd_decoded = shared_database(UCD_DECODED_FILE, load_decoded)
+    __ucd_properties = shared_database(UCD_PROPERTY_NAME_FILE, load_json)
+    __ucd_translator = shared_database(UCD_TRANSLATOR, load_translator)
+    __ucd_property_index = shared_database(UCD_PROPERTY_INDEX_FILE, load_json)
+    __ucd_mappings = shared_database(UCD_MAPPINGS_FILE, load_mappings)
+
+    __cldr_lng_terr = shared_database(CLDR_LANGUAGE_TERRITORY_FILE, load_json)
+    __cldr_char_exemplar = shared_database(CLDR_CHAR_EXEMPLAR_FILE, load_json)
+    __cldr_char_locales = shared_database(CLDR_CHAR_LOCALES_FILE, load_char_locales)
+
+    # Methods whose first argument is the text or characters they process, counted as "chars" by the instrumentation
+    TEXT_METHODS = frozenset([
+        "ucd_info_short", "ucd_info", "ucd_info_many", "to_upper", "to_lower", "casefold", "decompose",
+        "lng_usage_short", "lng_usage", "lng_usage_many", "in_lng", "lng_can_write",
+    ])
+
+    def __init__(self, cache_size=UCD_INFO_CACHE_SIZE):
+        """
         Args:
-            property (str): An UCD property. EG: age, uc, lc
-            property_value (str): Value of the UCD property. Eg: "1.1", "Y", "N", "004A"
+            cache_size (int, optional): Number of translated "ucd_info" records kept in the LRU cache.
+                                        0 disables the cache, None makes it unbounded. Defaults to 4096.
+        """
+        self.__cache_size = cache_size
+        self.__precomputed = {}  # Records from "precompute_ucd_info". They are never evicted
+        self.__short_names = None  # Long UCD property name -> short name. Built on first use
+        self.__lng_names = {}  # Cache of "lng_name_lookup" results
+        self.__cached_ucd_info = lru_cache(maxsize=cache_size)(self.__translated_info)
+        self.__instrumentation = None  # Set by "enable_instrumentation"
+
+    def __getstate__(self):
+        """Loaded databases, the LRU cache and the instrumentation are left out when pickling.
+        The databases are looked up in the registry again on first use.
+        """
+        state = self.__dict__.copy()
+        for name in self.__dict__:
+            if isinstance(getattr(type(self), name, None), shared_database):
+                del state[name]
+        del state["_Unichar__cached_ucd_info"]
+        if self.__instrumentation is not None:
+            for name in self.__instrumentation.methods:
+                state.pop(name, None)
+            state["_Unichar__instrumentation"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__cached_ucd_info = lru_cache(maxsize=self.__cache_size)(self.__translated_info)
+
+    def enable_instrumentation(self, callback=None, samples=LATENCY_SAMPLES):
+        """Starts timing the public methods of this instance. Call counts, latencies and the characters processed
+        are then reported by "stats". Instances without instrumentation run the plain methods, so it costs nothing
+        until it's enabled. Enabling it again starts over with zeroed counters.
 
-        Returns:
-            str|bool: The converted value. EG: "V1_1", True, False, "J"
+        Args:
+            callback (callable, optional): Called after every timed call with (method, seconds, chars).
+                                           Eg: to export the calls to a metrics system.
+            samples (int, optional): Number of recent latencies per method the percentiles are based on
+        """
+        self.disable_instrumentation()
+        self.__instrumentation = Instrumentation(callback, samples)
+        for name in dir(type(self)):
+            if name.startswith("_") or name in UNINSTRUMENTED_METHODS:
+                continue
+            method = getattr(self, name)
+            if callable(method):  # The timed method shadows the one of the class
+                self.__dict__[name] = self.__instrumentation.wrap(name, method, name in self.TEXT_METHODS)
+
+    def disable_instrumentation(self):
+        """Stops timing the methods. The counters of "stats" are dropped
         """
-        if property == "scx":  # Special case - scx is a list of sc
-            return self.__scx_lookup(property_value)
-
-        # If there is a codepoint reference in the UCD value, we return the converted reference (unicode str)
-        found, codepoint_ref = self.__codepoint_reference(property, property_value)
-        if found:
-            return codepoint_ref
-
-        # Get lookup table for an UCD property. Eg lookuptable for Eg "age" would be {"1.1": "V1_1",.....}
-        p_lookup = self.__ucd_property_values.get(property)
-        if p_lookup:
-            pv_lookup = p_lookup.get(property_value)  # Look up UCD value in our lookuptable.
-            if pv_lookup:
-                if "NFC_QC" not in property and "NFKC_QC" not in property:  # These has Y/N/M and cant be bool
-                    if pv_lookup == "Yes":
-                        return True
-                    if pv_lookup == "No":
-                        return False
-                return pv_lookup
-            else:  # Property is not in lookup table, just return it as-is.
-                return property_value
-        else:  # Value not in lookup table, just return it as-is.
-            return property_value
-
-    def __scx_lookup(self, property_value):
-        """UCD property scx is a list of sc. This generates a python list with each scx scripts
+        if self.__instrumentation is not None:
+            for name in self.__instrumentation.methods:
+                self.__dict__.pop(name, None)
+            self.__instrumentation = None
+
+    def stats(self, reset=False):
+        """Gets performance statistics of this instance. The "methods" are only counted while instrumentation
+        is enabled. Times are in seconds.
 
         Args:
-            property_value (str): The property value of the scx tag: Eg: "Latn Lana"
+            reset (bool, optional): Zero the method counters after reading them. Eg. when exporting them periodically
 
         Returns:
-            list: A list of scripts. EG: ["Latin", "Tai_Tham"]
+            dict: {"instrumented": True,
+                   "methods": {"ucd_info": {"calls": 3, "errors": 0, "seconds": 0.0002, "chars": 3, "mean": 0.00007,
+                                            "p50": 0.00001, "p90": 0.0002, "p99": 0.0002, "max": 0.0002}, ...},
+                   "ucd_info_cache": {"hits": 2, "misses": 1, "hit_rate": 0.67, "size": 1, "maxsize": 4096},
+                   "databases": {"db/ucd_codepoints.bin": 0.002, ...}}
+                  "databases" has the load time of each database loaded in the process so far.
         """
-        scx = []
-        scripts = property_value.split(" ")
-        p_lookup = self.__ucd_property_values.get("sc")  # scx uses same lookup table as sc
-        for script in scripts:
-            pv_lookup = p_lookup.get(script)
-            scx.append(pv_lookup)
-        return scx
+        methods = {}
+        if self.__instrumentation is not None:
+            methods = self.__instrumentation.summary()
+            if reset:
+                self.__instrumentation.reset()
+        cache = self.__cached_ucd_info.cache_info()
+        lookups = cache.hits + cache.misses
+        return {
+            "instrumented": self.__instrumentation is not None,
+            "methods": methods,
+            "ucd_info_cache": {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": cache.hits / lookups if lookups else 0.0,
+                "size": cache.currsize,
+                "maxsize": cache.maxsize,
+            },
+            "databases": load_times(),
+        }
 
     def ucd_info_short(self, char):
         """Gets info of a single unicode character. This is the lowlevel method that returns
@@ -147,39 +284,275 @@ class Unichar:
         if len(char) != 1:
             raise ValueError("Only one unicode character is considered valid. No more, no less.")
 
-        char_info = self.__ucd_codepoints["chars"].get(char)
+        return self.__ucd_codepoints.lookup(char)
 
-        if char_info:
-            group = char_info.get("group")
-            group_info = self.__ucd_codepoints["groups"][group]
+    def ucd_info(self, char, properties=None):
+        """Get raw info of a character and creates a new dict in human readable format.
+        Both keys and values (UCD properties and UCD property values) are looked up and translated.
+        Translated records are kept in an LRU cache, so repeated lookups of the same character are cheap.
+        When the decoded codepoint database has been built, the values are read from it already translated.
 
-            merged_info = {**group_info, **char_info}  # Tags from char takes precedence over the group tags.
-            merged_info.pop("group")  # Users dont need to see the group, Its for us to internally join data
-            return merged_info
-        else:
+        Args:
+            char (str): Single character to be looked up
+            properties (list, optional): Only look up and translate these UCD properties, long or short names.
+                                         Eg: ["General_Category", "sc"]. Defaults to all properties.
+
+        Returns:
+            ReadOnlyDict: A full dict with over 100 keys describing the character. All in readable format.
+                          The dict is shared with the cache, so it's read-only. Lists of characters are tuples.
+        """
+        projection = self.__projection(properties)
+        full_info = self.__precomputed.get(char)
+        if full_info is None:
+            return self.__cached_ucd_info(char, projection)
+        if projection is None:
+            return full_info
+        names = (self.__ucd_properties.get(property) or property for property in projection)
+        return ReadOnlyDict((name, full_info[name]) for name in names if name in full_info)
+
+    def __projection(self, properties):
+        """Resolves the properties of a projection to short names
+
+        Args:
+            properties (list): UCD properties, long or short names. Eg: ["General_Category", "sc"]. Can be None
+
+        Returns:
+            tuple: The distinct short names. Eg: ("gc", "sc"). None if properties is None
+        """
+        if properties is None:
             return None
+        return tuple(dict.fromkeys(self.ucd_short_name(property) for property in properties))
 
-    def ucd_info(self, char):
-        """Get raw info of a character and creates a new dict in human readable format.
-        Both keys and values (UCD properties and UCD property values) are looked up and translated.
+    def __char_list(self, chars):
+        """Converts the input of the batch methods into a list of characters
+
+        Args:
+            chars (str|iterable): A string, or an iterable of characters or codepoints. Eg: "abc", [97, 98, 99]
+                                  or a codepoint array
+
+        Raises:
+            ValueError: If an item is something other than one single unicode character
+
+        Returns:
+            list: The characters. Eg: ["a", "b", "c"]
+        """
+        if isinstance(chars, str):
+            return list(chars)
+        char_list = [char if isinstance(char, str) else chr(char) for char in chars]
+        if any(len(char) != 1 for char in char_list):
+            raise ValueError("Only one unicode character is considered valid. No more, no less.")
+        return char_list
+
+    def ucd_info_many(self, chars, properties=None):
+        """Batch version of "ucd_info". Each distinct character is only looked up once, and the result is columnar,
+        with a list per property. Eg: ucd_info_many("Hi!", ["Script", "gc"]) gives
+        {"Script": ["Latin", "Latin", "Common"], "gc": ["Uppercase_Letter", "Lowercase_Letter", "Other_Punctuation"]}
+
+        Args:
+            chars (str|iterable): A string, or an iterable of characters or codepoints. Eg: "abc", [97, 98, 99]
+                                  or a codepoint array
+            properties (list, optional): UCD properties to get, long or short names. Eg: ["Script", "gc"]
+                                         Defaults to every property of the characters.
+
+        Raises:
+            ValueError: If an item is something other than one single unicode character
+
+        Returns:
+            dict: Property -> list with a value per character, in the order of chars. The properties are keyed by the
+                  names they were asked for. Characters without the property, or not in the database, get None
+        """
+        char_list = self.__char_list(chars)
+        projection = self.__projection(properties)
+        records = {char: self.ucd_info(char, projection) for char in dict.fromkeys(char_list)}
+
+        if properties is None:
+            columns = {name: name for record in records.values() for name in record}
+        else:
+            columns = {}
+            for property, short_name in zip(properties, map(self.ucd_short_name, properties)):
+                columns[property] = self.__ucd_properties.get(short_name) or short_name  # The key in ucd_info
+
+        result = {}
+        for property, name in columns.items():
+            values = {char: record.get(name) for char, record in records.items()}
+            result[property] = [values[char] for char in char_list]
+        return result
+
+    def __translated_info(self, char, projection=None):
+        """Looks up and translates the info of a character. This is the uncached version of "ucd_info"
 
         Args:
             char (str): Single character to be looked up
+            projection (tuple, optional): Only translate these short UCD properties. Eg: ("gc", "sc")
 
         Returns:
-            dict: A full dict with over 100 keys describing the character. All in readable format.
+            ReadOnlyDict: The translated record
         """
+        if self.__ucd_decoded:  # The values are translated at build time
+            if len(char) != 1:
+                raise ValueError("Only one unicode character is considered valid. No more, no less.")
+            full_info = self.__ucd_decoded.lookup(char) or {}
+            if projection is not None:
+                names = (self.__ucd_properties.get(property) or property for property in projection)
+                full_info = {name: full_info[name] for name in names if name in full_info}
+            return ReadOnlyDict(full_info)
+
         full_info = {}
         ucd_info = self.ucd_info_short(char)  # Get raw info of char
         if ucd_info:
+            if projection is not None:
+                ucd_info = {k: ucd_info[k] for k in projection if k in ucd_info}
             for k, v in ucd_info.items():
-                looked_up_v = self.__property_value_lookup(k, v)  # convert the UCD property value to readable
-                looked_up_name = self.__ucd_properties.get(k)  # Lookup the UCD property name
-                if looked_up_name:
-                    full_info[looked_up_name] = looked_up_v
-                else:
-                    full_info[k] = looked_up_v
-        return full_info
+                looked_up_name, looked_up_v = self.ucd_translate(k, v)
+                full_info[looked_up_name] = tuple(looked_up_v) if isinstance(looked_up_v, list) else looked_up_v
+        return ReadOnlyDict(full_info)
+
+    def ucd_cache_info(self):
+        """Gets statistics of the "ucd_info" LRU cache
+
+        Returns:
+            functools._CacheInfo: Named tuple with hits, misses, maxsize and currsize
+        """
+        return self.__cached_ucd_info.cache_info()
+
+    def ucd_cache_clear(self):
+        """Empties the "ucd_info" LRU cache and resets its statistics. Precomputed records are kept
+        """
+        self.__cached_ucd_info.cache_clear()
+
+    def precompute_ucd_info(self, first, last):
+        """Translates the records of a whole range of characters up front, eg. a block or a plane.
+        The records are kept outside the LRU cache, so they are never evicted.
+
+        Args:
+            first (str|int): First character or codepoint of the range. Eg: "\u0000"
+            last (str|int): Last character or codepoint of the range (inclusive). Eg: "\u00ff"
+
+        Returns:
+            int: The number of characters in the range that were found in the database
+        """
+        first = ord(first) if isinstance(first, str) else first
+        last = ord(last) if isinstance(last, str) else last
+        found = 0
+        for codepoint in range(first, last + 1):
+            full_info = self.__translated_info(chr(codepoint))
+            if full_info:
+                self.__precomputed[chr(codepoint)] = full_info
+                found += 1
+        return found
+
+    def ucd_short_name(self, property):
+        """Finds the short name of a UCD property. Both long and short names are accepted
+
+        Args:
+            property (str): A UCD property. Eg: "General_Category" or "gc"
+
+        Returns:
+            str: The short name. Eg: "gc". Unknown properties are returned as-is
+        """
+        if self.__short_names is None:
+            self.__short_names = {name: short for short, name in self.__ucd_properties.items()}
+        return self.__short_names.get(property, property)
+
+    def chars_where(self, property, value):
+        """Finds all characters that have a certain property value, using the prebuilt property index.
+        Several values can be given in a list, and matches any of them. Results can be combined with
+        & (and), | (or) and - (except). Eg:
+            chars_where("Script", "Greek") & chars_where("Emoji_Presentation", True)
+
+        Args:
+            property (str): A UCD property, long or short name. Eg: "Script" or "sc"
+            value (str|bool|list): The value, readable or raw. Eg: "Greek" or "Grek", True or "Y".
+                                   For list properties like "Script_Extensions" a character matches if one of its
+                                   values matches.
+
+        Raises:
+            KeyError: If the property isn't in the index. Properties with unique values, like names, aren't indexed
+
+        Returns:
+            CodepointSet: The matching characters. Iterating over it yields them lazily
+        """
+        short_name = self.ucd_short_name(property)
+        if short_name not in self.__ucd_property_index:
+            raise KeyError("Property is not indexed: " + property)
+
+        wanted = value if isinstance(value, (list, tuple, set)) else [value]
+        ranges = []
+        for raw_value, flat_ranges in self.__ucd_property_index[short_name].items():
+            looked_up_v = self.__ucd_translator.translate_value(short_name, raw_value)
+            looked_up_values = looked_up_v if isinstance(looked_up_v, list) else [looked_up_v]
+            if raw_value in wanted or any(v in wanted for v in looked_up_values):
+                ranges.extend(zip(flat_ranges[::2], flat_ranges[1::2]))
+        return CodepointSet(ranges)
+
+    def ucd_translate(self, property, property_value):
+        """Translates a raw UCD property and its value into the readable form that "ucd_info" uses
+
+        Args:
+            property (str): A short UCD property. Eg: "gc"
+            property_value (str): The raw value of the property. Eg: "Lu"
+
+        Returns:
+            (str, str|bool|list): The property name and the converted value.
+                                  Eg: ("General_Category", "Uppercase_Letter")
+                                  Properties without a long name keep their short name.
+        """
+        return self.__ucd_translator.translate(property, property_value)
+
+    def to_upper(self, text):
+        """Converts a text to uppercase with the full case mappings of the bundled UCD, eg. "ß" becomes "SS".
+        The whole text is converted in one "str.translate" call
+
+        Args:
+            text (str): The text. Eg: "Straße"
+
+        Returns:
+            str: The uppercase text. Eg: "STRASSE"
+        """
+        return text.translate(self.__ucd_mappings["uc"])
+
+    def to_lower(self, text):
+        """Converts a text to lowercase with the full case mappings of the bundled UCD.
+        Context sensitive mappings, like the final sigma, are not applied
+
+        Args:
+            text (str): The text. Eg: "HELLO"
+
+        Returns:
+            str: The lowercase text. Eg: "hello"
+        """
+        return text.translate(self.__ucd_mappings["lc"])
+
+    def casefold(self, text):
+        """Case folds a text with the full case folding of the bundled UCD. Used for caseless matching
+
+        Args:
+            text (str): The text. Eg: "Straße"
+
+        Returns:
+            str: The case folded text. Eg: "strasse"
+        """
+        return text.translate(self.__ucd_mappings["cf"])
+
+    def decompose(self, text, compatibility=False):
+        """Fully decomposes a text, and puts the combining marks in canonical order. This is NFD, or NFKD with
+        compatibility, based on the bundled UCD. Eg. "Å" becomes "A" and a combining ring above.
+
+        Args:
+            text (str): The text. Eg: "Ångström"
+            compatibility (bool, optional): Also apply compatibility decompositions, eg. "ﬁ" becomes "fi".
+
+        Returns:
+            str: The decomposed text
+        """
+        mappings = self.__ucd_mappings
+        decomposed = text.translate(mappings["compatibility" if compatibility else "canonical"])
+        if mappings["mark_runs"] is None:
+            return decomposed
+        ccc = mappings["ccc"]
+        return mappings["mark_runs"].sub(
+            lambda run: "".join(sorted(run.group(), key=lambda mark: ccc[ord(mark)])), decomposed
+        )
 
     def lng_name_lookup(self, country):
         """Converts a short language/territory name to a long english name.
@@ -237,11 +610,41 @@ class Unichar:
             for group, countries in info.items():
                 full_info.setdefault(group, [])
                 for country in countries:
-                    conv_country = self.lng_name_lookup(country)
+                    conv_country = self.__lng_names.get(country)
+                    if conv_country is None:
+                        conv_country = self.__lng_names[country] = self.lng_name_lookup(country)
                     full_info[group].append(conv_country)
             return full_info
         return None
 
+    def lng_usage_many(self, chars, groups=None):
+        """Batch version of "lng_usage". Each distinct character is only looked up once, and the result is columnar,
+        with a list per exemplar group. Eg: lng_usage_many("æ!") gives {"main": [["Danish", ...], None], ...}
+
+        Args:
+            chars (str|iterable): A string, or an iterable of characters or codepoints. Eg: "abc", [97, 98, 99]
+                                  or a codepoint array
+            groups (list, optional): Exemplar groups to get. Eg: ["main", "auxiliary"]. Defaults to all groups
+                                     that the characters are used in.
+
+        Raises:
+            ValueError: If an item is something other than one single unicode character
+
+        Returns:
+            dict: Group -> list with the languages of each character, in the order of chars.
+                  Characters that aren't used in the group get None
+        """
+        char_list = self.__char_list(chars)
+        usages = {char: self.lng_usage(char) or {} for char in dict.fromkeys(char_list)}
+
+        if groups is None:
+            groups = dict.fromkeys(group for usage in usages.values() for group in usage)
+        result = {}
+        for group in groups:
+            values = {char: usage.get(group) for char, usage in usages.items()}
+            result[group] = [values[char] for char in char_list]
+        return result
+
     def in_lng(self, char, lng_short):
         """Checks if a character is part of a language.
 
@@ -258,10 +661,54 @@ class Unichar:
         languages = self.__cldr_lng_terr["language"]
         if lng_short not in languages.keys():
             raise KeyError("Language does not exist")
+        if len(char) != 1:
+            raise ValueError("Only one unicode character is considered valid. No more, no less.")
+
+        locale_id = self.__cldr_char_locales["locale_ids"].get(lng_short)
+        groups = self.__cldr_char_locales["chars"].get(char)
+        if locale_id is None or not groups:
+            return False
+        return any(bits >> locale_id & 1 for bits in groups.values())
+
+    def __locale_bits(self, char, groups):
+        """Gets the bitset of the locales that use a character
 
-        usage = self.lng_usage_short(char)
-        if usage:
-            for languages in usage.values():
-                if lng_short in languages:
-                    return True
-        return False
+        Args:
+            char (str): A single unicode character
+            groups (list): Exemplar groups to include. Eg: ["main", "auxiliary"]. None means all groups
+
+        Returns:
+            int: The bitset, or None if the character isn't used by any locale at all
+        """
+        char_groups = self.__cldr_char_locales["chars"].get(char)
+        if char_groups is None:
+            return None
+        bits = 0
+        for group, group_bits in char_groups.items():
+            if groups is None or group in groups:
+                bits |= group_bits
+        return bits
+
+    def lng_can_write(self, text, groups=None):
+        """Finds the locales that can write a whole text with their exemplar characters. Characters are
+        also accepted in their lowercase form, because most exemplars are lowercase.
+        Characters that no locale uses at all, like spaces and emoji, are ignored.
+
+        Args:
+            text (str): The text. Eg: "Rødgrød med fløde"
+            groups (list, optional): Exemplar groups to use. Eg: ["main", "auxiliary"]. Defaults to all groups.
+
+        Returns:
+            list: Short names of the locales that use every character of the text. Eg: ["da", "da_DK", "nb"]
+        """
+        locales = self.__cldr_char_locales["locales"]
+        mask = (1 << len(locales)) - 1  # Start with all locales, and remove those that miss a character
+        for char in set(text):
+            bits = self.__locale_bits(char, groups)
+            lower_bits = self.__locale_bits(char.lower(), groups) if char.lower() != char else None
+            if bits is None and lower_bits is None:
+                continue
+            mask &= (bits or 0) | (lower_bits or 0)
+            if not mask:
+                break
+        return [lang_terr for idx, lang_terr in enumerate(locales) if mask >> idx & 1]
@@ -1,15 +1,74 @@
-from unilyze.unichar import Unichar
+import codecs
+from collections import Counter, OrderedDict
+from unilyze.unichar import Unichar, UCD_INFO_CACHE_SIZE, CLDR_EXEMPLAR_CHAR_FILE, load_json
+from unilyze.database import shared_database
+from unilyze.segment import Segmenter, SEGMENT_RULES
+
+CHUNK_SIZE = 1 << 20  # Bytes (or characters for text streams) read at a time by "add_stream"
+AUXILIARY_WEIGHT = 0.5  # How much a character from the auxiliary exemplars counts in "lng_rank"
+PROJECTION_CACHE_SIZE = 8  # Projections of "unistat" kept up to date, besides all properties. Least recently used go
+
+
+def load_exemplar_sets(filename):
+    """Reads the exemplar database and turns the main and auxiliary exemplars of each locale into sets
+
+    Args:
+        filename (str): Filename of the exemplar database
+
+    Returns:
+        dict: {"main": {"da": frozenset(...)}, "auxiliary": {"da": frozenset(...)}, "known": frozenset(all chars)}
+    """
+    exemplar_sets = {"main": {}, "auxiliary": {}}
+    for lang_terr, groups in load_json(filename).items():
+        for group in exemplar_sets:
+            exemplar_sets[group][lang_terr] = frozenset(char for char in groups.get(group, []) if char)
+    exemplar_sets["known"] = frozenset().union(*exemplar_sets["main"].values(), *exemplar_sets["auxiliary"].values())
+    return exemplar_sets
 
 
 class Unistat(Unichar):
-    def __init__(self):
-        super().__init__()
+    __cldr_exemplar_sets = shared_database(CLDR_EXEMPLAR_CHAR_FILE, load_exemplar_sets)
+    TEXT_METHODS = Unichar.TEXT_METHODS | {"add_text"}
+
+    def __init__(self, cache_size=UCD_INFO_CACHE_SIZE, segments=(), sketch=None):
+        """
+        Args:
+            cache_size (int, optional): Size of the "ucd_info" LRU cache. See Unichar.
+            segments (iterable, optional): Also count these segments of the text: "grapheme" for extended grapheme
+                                           clusters and "word" for words, as defined by UAX #29. Off by default.
+                                           The added text is one continuous stream, so a segment may span
+                                           two calls to "add_text".
+            sketch (FrequencySketch, optional): Count approximately in fixed memory instead of exactly, with empty
+                                                copies of this sketch. "charstat", "segmentstat" and "unistat" then
+                                                cover the most frequent items only, with estimated counts.
+                                                See unilyze.sketch.FrequencySketch for the error bounds.
+
+        Raises:
+            ValueError: If a segment kind isn't known
+        """
+        unknown = [kind for kind in segments if kind not in SEGMENT_RULES]
+        if unknown:
+            raise ValueError("Unknown segment kind: {}. Use one of: {}".format(unknown[0], ", ".join(SEGMENT_RULES)))
+        self.__segment_kinds = tuple(dict.fromkeys(segments))
+        self.__sketch = sketch
+        super().__init__(cache_size)
         self.reset_stat()
 
     def reset_stat(self):
         """Clears whatever text that was previously added. All statistics are reset
         """
-        self.__char_stat = {}
+        self.__char_stat = self.__counter()
+        # The aggregates of all properties (None) and the PROJECTION_CACHE_SIZE last used projections of "unistat"
+        self.__aggregates = OrderedDict()
+        self.__segmenters = {kind: Segmenter(kind) for kind in self.__segment_kinds}
+        self.__segment_stat = {kind: self.__counter() for kind in self.__segment_kinds}
+
+    def __counter(self):
+        """
+        Returns:
+            Counter|FrequencySketch: An empty counter. An empty copy of the sketch in sketch mode
+        """
+        return Counter() if self.__sketch is None else self.__sketch.empty()
 
     def add_text(self, text):
         """Add text to be analysed. The provided text will just be added to the pool for statistics
@@ -17,12 +76,128 @@ class Unistat(Unichar):
         Args:
             text (str): Text to be added to statistics
         """
-        for char in text:
-            self.__char_stat.setdefault(char, 0)
-            self.__char_stat[char] += 1
+        counts = Counter(text)
+        self.__char_stat.update(counts)
+        for aggregate in self.__aggregates.values():
+            aggregate["pending"].update(counts)
+        for kind, segmenter in self.__segmenters.items():
+            self.__segment_stat[kind].update(segmenter.feed(text))
+
+    def add_stream(self, stream, encoding="utf-8", errors="strict", chunk_size=CHUNK_SIZE):
+        """Add text from a file-like object or an iterator to be analysed. The text is read and counted
+        in chunks, so memory use stays bounded no matter how large the input is.
+        Bytes are decoded incrementally, so a multi-byte character split between two chunks is counted correctly.
+
+        Args:
+            stream (file-like|iterable): An object with a "read" method (binary or text mode),
+                                         or an iterable of str or bytes chunks. Eg: open("x.txt", "rb")
+            encoding (str, optional): Encoding of byte input. Defaults to "utf-8".
+            errors (str, optional): Error handling of the decoder. Eg: "replace". Defaults to "strict".
+            chunk_size (int, optional): Size of each read from a file-like object.
+
+        Raises:
+            UnicodeDecodeError: If byte input isn't valid in the encoding, and errors is "strict"
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        for chunk in self.__chunks(stream, chunk_size):
+            if isinstance(chunk, str):
+                self.add_text(chunk)
+            else:
+                self.add_text(decoder.decode(chunk))
+        self.add_text(decoder.decode(b"", final=True))  # Fails on a truncated character at the end of the input
+
+    def add_file(self, filename, encoding="utf-8", errors="strict", chunk_size=CHUNK_SIZE):
+        """Add the content of a text file to be analysed. The file is read in chunks
+
+        Args:
+            filename (str): Filename of the file to read
+            encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+            errors (str, optional): Error handling of the decoder. Eg: "replace". Defaults to "strict".
+            chunk_size (int, optional): Number of bytes read at a time.
+        """
+        with open(filename, mode="rb") as fp:
+            self.add_stream(fp, encoding, errors, chunk_size)
 
-    def unistat(self):
-        """Sums up the number of characters on each UCD property and property value
+    def merge(self, other):
+        """Adds the character counts of another Unistat to this one. Used to combine partial results,
+        eg. from worker processes. Segment counts are merged for the segment kinds both instances count,
+        and the text of the other Unistat is taken to be complete. Two instances in sketch mode merge their
+        sketches, which need the same parameters.
+
+        Args:
+            other (Unistat|dict): Another Unistat, or a dict of character counts like the one from "charstat"
+
+        Returns:
+            Unistat: This instance, with the merged counts
+        """
+        counts = other.charstat() if isinstance(other, Unistat) else other
+        if self.__sketch is not None and isinstance(other, Unistat) and other.__sketch is not None:
+            counts = other.__char_stat
+        self.__char_stat.update(counts)
+        for aggregate in self.__aggregates.values():
+            aggregate["pending"].update(counts)
+        if isinstance(other, Unistat):
+            for kind in self.__segment_kinds:
+                if kind not in other.segment_kinds():
+                    continue
+                if self.__sketch is not None and other.__sketch is not None:
+                    self.__segment_stat[kind].update(other.__segment_stat[kind])
+                    self.__segment_stat[kind].update(other.__segmenters[kind].finish())
+                else:
+                    self.__segment_stat[kind].update(other.segmentstat(kind))
+        return self
+
+    def segment_kinds(self):
+        """
+        Returns:
+            tuple: The segment kinds this instance counts. Eg: ("grapheme", "word")
+        """
+        return self.__segment_kinds
+
+    def __add__(self, other):
+        if not isinstance(other, Unistat):
+            return NotImplemented
+        options = {}  # Only the options that are used, NumpyUnistat takes neither
+        if self.__segment_kinds:
+            options["segments"] = self.__segment_kinds
+        if self.__sketch is not None:
+            options["sketch"] = self.__sketch
+        return type(self)(**options).merge(self).merge(other)
+
+    def __iadd__(self, other):
+        if not isinstance(other, Unistat):
+            return NotImplemented
+        return self.merge(other)
+
+    def __chunks(self, stream, chunk_size):
+        """Iterates over the chunks of a file-like object or an iterable
+
+        Args:
+            stream (file-like|iterable): The input of "add_stream"
+            chunk_size (int): Size of each read from a file-like object
+
+        Yields:
+            str|bytes: The next chunk
+        """
+        if hasattr(stream, "read"):
+            chunk = stream.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = stream.read(chunk_size)
+        else:
+            yield from stream
+
+    def unistat(self, properties=None):
+        """Sums up the number of characters on each UCD property and property value.
+        The sums are kept up to date incrementally: characters that are new since the last call are looked up once,
+        and characters that were seen before only have their counts bumped. The result is a snapshot, that later
+        calls to "add_text" don't change.
+
+        Args:
+            properties (list, optional): Only sum up these UCD properties, long or short names.
+                                         Eg: ["General_Category", "sc"]. Defaults to all properties.
+                                         The last used projections are kept up to date on their own,
+                                         others are summed up again from the character counts.
 
         Returns:
             dict: Here is part of the structure as an example:
@@ -34,26 +209,108 @@ class Unistat(Unichar):
                                     },
             }
         """
+        projection = None if properties is None else tuple(dict.fromkeys(map(self.ucd_short_name, properties)))
+        aggregate = self.__aggregates.get(projection)
+        if aggregate is not None:
+            self.__aggregates.move_to_end(projection)
+        else:
+            # "pending" are the counts not yet in the aggregate, "stat" is property -> value -> cell
+            # and "char_cells" are the cells each character is counted in
+            aggregate = {"pending": Counter(self.charstat()), "stat": {}, "char_cells": {}}
+            if self.__sketch is None:  # The top characters of a sketch change, so they are aggregated every time
+                self.__aggregates[projection] = aggregate
+                projections = [key for key in self.__aggregates if key is not None]
+                if len(projections) > PROJECTION_CACHE_SIZE:  # Every kept aggregate slows down "add_text"
+                    del self.__aggregates[projections[0]]
+
+        for char, count in aggregate["pending"].items():
+            cells = aggregate["char_cells"].get(char)
+            if cells is None:  # First time we see the char. Find the cells it should be counted in
+                cells = aggregate["char_cells"][char] = []
+                info = self.ucd_info(char, projection)  # Get unicode information of char
+                for property, property_val in info.items():
+                    if property_val and not isinstance(property_val, (list, tuple)):
+                        aggregate["stat"].setdefault(property, {})
+                        cell = aggregate["stat"][property].setdefault(
+                            property_val, {"total-count": 0, "chars": set()}
+                        )
+                        cell["chars"].add(char)
+                        cells.append(cell)
+            for cell in cells:
+                cell["total-count"] += count
+        aggregate["pending"].clear()
+
         stat = {}
-        for char, count in self.__char_stat.items():
-            info = self.ucd_info(char)  # Get full unicode information of char
-            for property, property_val in info.items():
-                if property_val and not isinstance(property_val, list):
-                    stat.setdefault(property, {})
-                    stat[property].setdefault(property_val, {})
+        for property, values in aggregate["stat"].items():
+            stat[property] = {}
+            for property_val, cell in values.items():
+                stat[property][property_val] = {"total-count": cell["total-count"], "chars": set(cell["chars"])}
+        return stat
 
-                    stat[property][property_val].setdefault("total-count", 0)
-                    stat[property][property_val]["total-count"] += count
+    def lng_rank(self, top=None, auxiliary_weight=AUXILIARY_WEIGHT):
+        """Ranks the locales by how well the added text fits their exemplar characters.
+        The score of a locale is the share of the characters in the text, that are in its main exemplars.
+        Characters from the auxiliary exemplars count with auxiliary_weight. Characters are compared in lowercase,
+        and characters that no locale uses, like spaces and digits, are ignored.
 
-                    stat[property][property_val].setdefault("chars", set())
-                    stat[property][property_val]["chars"].add(char)
+        Args:
+            top (int, optional): Only return the best locales. Defaults to all locales.
+            auxiliary_weight (float, optional): Weight of auxiliary exemplar characters. Defaults to 0.5.
 
-        return stat
+        Returns:
+            list: (locale, score) tuples, best first. Scores are between 0 and 1. Eg: [("da", 0.98), ("nb", 0.95)]
+        """
+        exemplar_sets = self.__cldr_exemplar_sets
+        counts = Counter()
+        for char, count in self.charstat().items():
+            lower = char.lower()
+            if lower in exemplar_sets["known"]:
+                counts[lower] += count
+            elif char in exemplar_sets["known"]:
+                counts[char] += count
+        total = sum(counts.values())
+        if not total:
+            return []
+
+        chars = counts.keys()
+        ranking = []
+        for lang_terr, main in exemplar_sets["main"].items():
+            main_hits = chars & main
+            auxiliary_hits = (chars & exemplar_sets["auxiliary"][lang_terr]) - main_hits
+            score = sum(counts[char] for char in main_hits)
+            score += auxiliary_weight * sum(counts[char] for char in auxiliary_hits)
+            ranking.append((lang_terr, score / total))
+
+        ranking.sort(key=lambda rank: (-rank[1], rank[0]))
+        return ranking[:top] if top else ranking
 
     def charstat(self):
         """Get occurrences of each character in the text
 
         Returns:
             dict: Example: {'T': 18, 'h': 178, 'i': 212, ......}
+                  In sketch mode the most frequent characters with estimated counts, most frequent first
         """
+        if self.__sketch is not None:
+            return dict(self.__char_stat.most_common())
         return self.__char_stat
+
+    def segmentstat(self, kind="grapheme"):
+        """Get occurrences of each segment in the text. The last segment of the text so far is included,
+        as if no more text came.
+
+        Args:
+            kind (str, optional): "grapheme" or "word". Must be one of the segments given to the constructor.
+
+        Returns:
+            dict: For graphemes eg: {'e\u0301': 3, 'a': 12, '👩\u200d💻': 1, ......}
+                  For words only the word-like segments, eg: {'Hello': 2, 'world': 1, '42': 1, ......}
+
+        Raises:
+            ValueError: If the segment kind isn't counted
+        """
+        if kind not in self.__segment_kinds:
+            raise ValueError("Segments of kind {} are not counted. Use Unistat(segments=[{!r}])".format(kind, kind))
+        stat = Counter(self.__segment_stat[kind])
+        stat.update(self.__segmenters[kind].finish())  # In sketch mode these are added to the estimates
+        return stat
@@ -0,0 +1,276 @@
+from unilyze.unistat import Unistat
+from unilyze.unichar import UCD_CODEPOINT_FILE, UCD_INFO_CACHE_SIZE, load_codepoints
+from unilyze.ucd_binary import UcdBinary, expand_name
+from unilyze.database import get_database, CODEPOINT_COUNT
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency. Install with "pip install unilyze[numpy]"
+    np = None
+
+UCD_COLUMNS = UCD_CODEPOINT_FILE + "#columns"  # Registry name of the shared column view
+
+BINCOUNT_THRESHOLD = CODEPOINT_COUNT // 8  # Texts longer than this are counted with one dense bincount
+
+
+class UcdColumns:
+    """Vectorized view of the binary codepoint database. For every UCD property there is one small-int
+    column with an entry per codepoint and per codepoint range in the database. The columns are built on first use
+    from the record tables of the mmap'ed database, and shared by all NumpyUnistat instances.
+    """
+
+    def __init__(self, database):
+        """
+        Args:
+            database (UcdBinary): The binary codepoint database
+        """
+        self.__database = database
+        self.codepoints = self.__uint32(b"CPNT")
+        self.range_firsts = self.__uint32(b"RNGF")
+        self.range_lasts = self.__uint32(b"RNGL")
+
+        # Entries are the codepoints followed by the ranges
+        self.__entry_groups = np.concatenate([self.__uint32(b"CPGR"), self.__uint32(b"RNGG")])
+        self.__entry_overrides = np.concatenate([self.__uint32(b"CPOV"), self.__uint32(b"RNGO")])
+
+        record_offsets = self.__uint32(b"RECO").astype(np.int64)
+        self.__record_count = len(record_offsets) - 1
+        self.__pairs = self.__uint32(b"PAIR").reshape(-1, 2)
+        self.__pair_records = np.repeat(np.arange(self.__record_count), np.diff(record_offsets))
+
+        self.properties = {database.string(key): key for key in np.unique(self.__pairs[:, 0]).tolist()}
+        self.__columns = {}
+
+    def __uint32(self, name):
+        """Gets a uint32 section of the database as an array, without copying it
+
+        Args:
+            name (bytes): The section name. Eg: b"CPNT"
+
+        Returns:
+            numpy.ndarray: The section
+        """
+        return np.frombuffer(self.__database.section(name), dtype="<u4")
+
+    def __record_values(self, key):
+        """Gets the value of one property for every record
+
+        Args:
+            key (int): String ID of the property
+
+        Returns:
+            numpy.ndarray: String ID of the value of each record. -1 when the record doesn't have the property
+        """
+        values = np.full(self.__record_count, -1, dtype=np.int64)
+        mask = self.__pairs[:, 0] == key
+        values[self.__pair_records[mask]] = self.__pairs[mask, 1]
+        return values
+
+    def column(self, property):
+        """Gets the column of a property. Overrides of a codepoint take precedence over its group.
+
+        Args:
+            property (str): A short UCD property. Eg: "gc"
+
+        Returns:
+            (numpy.ndarray, list): The column with a small-int code per database entry, and the table
+                                   that maps each code to a raw value. None in the table means the property is missing.
+        """
+        column = self.__columns.get(property)
+        if column is None:
+            record_values = self.__record_values(self.properties[property])
+            override_values = record_values[self.__entry_overrides]
+            values = np.where(override_values >= 0, override_values, record_values[self.__entry_groups])
+            value_ids, codes = np.unique(values, return_inverse=True)
+            dtype = np.uint16 if len(value_ids) <= 0x10000 else np.uint32
+            table = [self.__database.string(value) if value >= 0 else None for value in value_ids.tolist()]
+            column = (codes.astype(dtype), table)
+            self.__columns[property] = column
+        return column
+
+    def entries(self, codepoints):
+        """Finds the database entries of an array of codepoints
+
+        Args:
+            codepoints (numpy.ndarray): Sorted array of distinct codepoints
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Boolean mask of the codepoints found in the database,
+                                            and the entry indexes of the found codepoints
+        """
+        entries = np.searchsorted(self.codepoints, codepoints)
+        entries[entries == len(self.codepoints)] = 0
+        found = self.codepoints[entries] == codepoints
+
+        # Codepoints without their own entry are looked up in the range table
+        ranges = np.searchsorted(self.range_firsts, codepoints, side="right") - 1
+        in_range = ~found & (ranges >= 0) & (codepoints <= self.range_lasts[np.maximum(ranges, 0)])
+        entries = np.where(found, entries, len(self.codepoints) + ranges)
+        found |= in_range
+        return found, entries[found]
+
+
+def load_columns(name):
+    """Builds the column view of the codepoint database
+
+    Args:
+        name (str): Registry name of the column view. The view is always built from the codepoint database
+
+    Raises:
+        FileNotFoundError: If the binary codepoint database hasn't been built
+
+    Returns:
+        UcdColumns: The column view
+    """
+    database = get_database(UCD_CODEPOINT_FILE, load_codepoints)
+    if not isinstance(database, UcdBinary):
+        raise FileNotFoundError("The numpy backend needs the binary codepoint database. Run create_ucd_dbs first")
+    return UcdColumns(database)
+
+
+class NumpyUnistat(Unistat):
+    """Same statistics as Unistat, computed with NumPy. Characters are counted in a dense array indexed
+    by codepoint, and the property statistics are histograms over the property columns of the
+    distinct characters, so the cost of "unistat" doesn't depend on the amount of text.
+    The dense array has an int64 per codepoint, about 9 MB per instance, allocated on creation and on every
+    "reset_stat". Merges and unpickling allocate one for the result too. Prefer Unistat for many small instances.
+    """
+
+    def __init__(self, cache_size=UCD_INFO_CACHE_SIZE):
+        """
+        Args:
+            cache_size (int, optional): Size of the "ucd_info" LRU cache. See Unichar.
+
+        Raises:
+            ImportError: If numpy isn't installed
+        """
+        if np is None:
+            raise ImportError("NumpyUnistat needs numpy. Install it with: pip install unilyze[numpy]")
+        super().__init__(cache_size)
+
+    def reset_stat(self):
+        """Clears whatever text that was previously added. All statistics are reset
+        """
+        super().reset_stat()
+        self.__counts = np.zeros(CODEPOINT_COUNT, dtype=np.int64)
+
+    def add_text(self, text):
+        """Add text to be analysed. The provided text will just be added to the pool for statistics
+
+        Args:
+            text (str): Text to be added to statistics
+        """
+        codepoints = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+        if len(codepoints) > BINCOUNT_THRESHOLD:
+            self.__counts += np.bincount(codepoints, minlength=CODEPOINT_COUNT)
+        else:
+            distinct, counts = np.unique(codepoints, return_counts=True)
+            self.__counts[distinct] += counts
+
+    def merge(self, other):
+        """Adds the character counts of another Unistat to this one
+
+        Args:
+            other (Unistat|dict): Another Unistat, or a dict of character counts like the one from "charstat"
+
+        Returns:
+            NumpyUnistat: This instance, with the merged counts
+        """
+        if isinstance(other, NumpyUnistat):
+            self.__counts += other.__counts
+        else:
+            charstat = other.charstat() if isinstance(other, Unistat) else other
+            codepoints = np.fromiter(map(ord, charstat), dtype=np.int64, count=len(charstat))
+            self.__counts[codepoints] += np.fromiter(charstat.values(), dtype=np.int64, count=len(charstat))
+        return self
+
+    def __getstate__(self):
+        """Pickles the counts sparsely, instead of the full array with a slot for every codepoint
+        """
+        state = super().__getstate__()
+        counts = state.pop("_NumpyUnistat__counts")
+        codepoints = np.flatnonzero(counts)
+        state["_NumpyUnistat__sparse_counts"] = (codepoints, counts[codepoints])
+        return state
+
+    def __setstate__(self, state):
+        codepoints, counts = state.pop("_NumpyUnistat__sparse_counts")
+        self.__dict__.update(state)
+        self.reset_stat()
+        self.__counts[codepoints] = counts
+
+    def charstat(self):
+        """Get occurrences of each character in the text
+
+        Returns:
+            dict: Example: {'T': 18, 'h': 178, 'i': 212, ......}. Ordered by codepoint
+        """
+        distinct = np.flatnonzero(self.__counts)
+        return dict(zip(map(chr, distinct.tolist()), self.__counts[distinct].tolist()))
+
+    def unistat(self, properties=None):
+        """Sums up the number of characters on each UCD property and property value.
+        The result has the same structure as "Unistat.unistat"
+
+        Args:
+            properties (list, optional): Only sum up these UCD properties, long or short names.
+                                         Eg: ["General_Category", "sc"]. Defaults to all properties.
+
+        Returns:
+            dict: Eg: {'General_Category': {'Decimal_Number': {'chars': {'1', '3', '2'}, 'total-count': 47}}}
+        """
+        columns = get_database(UCD_COLUMNS, load_columns)
+        distinct = np.flatnonzero(self.__counts)
+        found, entries = columns.entries(distinct)
+        distinct, counts = distinct[found], self.__counts[distinct[found]]
+
+        stat = {}
+        if not len(entries):
+            return stat
+        if properties is None:
+            properties = columns.properties
+        else:  # Properties that no character in the database has, are left out
+            properties = [short for short in map(self.ucd_short_name, properties) if short in columns.properties]
+        for property in dict.fromkeys(properties):
+            codes, table = columns.column(property)
+            char_codes = codes[entries]
+            order = np.argsort(char_codes, kind="stable")
+            sorted_codes = char_codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])  # One run per value
+            ends = np.r_[starts[1:], len(order)]
+            totals = np.add.reduceat(counts[order], starts)
+
+            for start, end, total in zip(starts.tolist(), ends.tolist(), totals.tolist()):
+                raw_value = table[sorted_codes[start]]
+                if raw_value is None:
+                    continue
+                chars = distinct[order[start:end]].tolist()
+                if property == "na" and "#" in raw_value:  # Range names contain the codepoint. Eg "CJK ... -4E00"
+                    for codepoint, count in zip(chars, counts[order[start:end]].tolist()):
+                        name = expand_name({"na": raw_value}, codepoint)["na"]
+                        self.__add_stat(stat, property, name, count, [codepoint])
+                else:
+                    self.__add_stat(stat, property, raw_value, total, chars)
+
+        return stat
+
+    def __add_stat(self, stat, property, raw_value, total, codepoints):
+        """Adds the count and characters of one property value to the statistics
+
+        Args:
+            stat (dict): The statistics being built by "unistat"
+            property (str): A short UCD property. Eg: "gc"
+            raw_value (str): The raw value of the property. Eg: "Lu"
+            total (int): Number of occurrences of characters with the value
+            codepoints (list): The distinct codepoints with the value
+        """
+        property_name, property_val = self.ucd_translate(property, raw_value)
+        if property_val and not isinstance(property_val, (list, tuple)):
+            stat.setdefault(property_name, {})
+            stat[property_name].setdefault(property_val, {})
+
+            stat[property_name][property_val].setdefault("total-count", 0)
+            stat[property_name][property_val]["total-count"] += total
+
+            stat[property_name][property_val].setdefault("chars", set())
+            stat[property_name][property_val]["chars"].update(map(chr, codepoints))